@@ -1,12 +1,14 @@
 #!/usr/bin/env python3
 """Kindle Page Capture - メインエントリーポイント"""
 
+import logging
 import sys
 from PyQt6.QtWidgets import QApplication
 from src.ui.main_window import MainWindow
 
 
 def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s: %(message)s")
     app = QApplication(sys.argv)
     app.setApplicationName("Kindle Page Capture")
     window = MainWindow()
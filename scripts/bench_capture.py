@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""キャプチャ処理のベンチマーク（macOS 以外でも動く）
+
+画面とキー送信の代わりにページ画像の再生（src.capture.replay）を使い、
+本物の MainWindow の状態遷移（撮影 → 保存依頼 → ページ送り → 待機）を
+最後のページまで動かす。ページ/分、工程ごとの平均時間、最大メモリを出す。
+
+    python scripts/bench_capture.py --pages 100 --latency 0.3 --adaptive
+    python scripts/bench_capture.py --book ~/captures/2026-01-01_kindle_capture/images
+"""
+
+import argparse
+import os
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+# 画面の無い環境でも Qt を動かす
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PIL import Image, ImageDraw  # noqa: E402
+from PyQt6.QtCore import QTimer  # noqa: E402
+from PyQt6.QtWidgets import QApplication  # noqa: E402
+
+from src.capture.replay import (  # noqa: E402
+    ReplayBook, ReplayNavigator, ReplaySource, ReplayWindowManager,
+)
+from src.ui.main_window import MainWindow  # noqa: E402
+
+
+class BenchWindow(MainWindow):
+    """完了時に章分割ダイアログを出さず、イベントループを抜ける"""
+
+    def _show_chapter_dialog(self):
+        QApplication.instance().quit()
+
+    def _finish_capture(self):
+        super()._finish_capture()
+        # 1ページも撮れなかったときや保存に失敗したときは章分割ダイアログを
+        # 通らないので、ここでも抜ける
+        QApplication.instance().quit()
+
+
+def make_pages(directory: Path, count: int, size: tuple[int, int]) -> list[Path]:
+    """ページごとに本文の位置と見出しの帯が違う画像を作る
+
+    ページ判定（page_hash）は 32x32 に縮めて比べるので、行の長さを変える程度では
+    同じページとみなされる。縮めても残るよう、太い帯の位置と本文ブロックの
+    上下位置をページごとにずらす。
+    """
+    width, height = size
+    slots = 6
+    paths = []
+    for i in range(count):
+        img = Image.new("RGB", size, "white")
+        draw = ImageDraw.Draw(img)
+        # 見出しに見立てた帯。隣のページとは必ず違う段に置く
+        band = height // (slots + 2)
+        top = band * (1 + i % slots)
+        draw.rectangle((0, top, width, top + band // 2), fill="black")
+        # 本文の行。ブロック全体をページごとに上下へずらす
+        offset = (i * 97) % (height // 6)
+        for line in range(30):
+            y = 40 + offset + line * (height - 80 - height // 6) // 30
+            length = width // 4 + (i * 37 + line * 53) % (width // 2)
+            draw.rectangle((40, y, 40 + length, y + 6), fill="black")
+        path = directory / f"page_{i + 1:04d}.png"
+        img.save(path)
+        paths.append(path)
+    return paths
+
+
+def peak_memory_mb() -> float:
+    """このプロセスの最大常駐メモリ（MB）"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux は KB、macOS はバイト単位
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--book", type=Path, help="再生するページ画像のディレクトリ（省略時は生成）")
+    parser.add_argument("--pages", type=int, default=50, help="生成するページ数")
+    parser.add_argument("--size", type=int, nargs=2, default=[1200, 1800], metavar=("W", "H"))
+    parser.add_argument("--latency", type=float, default=0.3, help="ページ送りから表示が変わるまでの秒数")
+    parser.add_argument("--interval", type=float, default=1.0, help="キャプチャ間隔（秒、0.5〜3.0）")
+    parser.add_argument("--adaptive", action="store_true", help="ページの切り替わりを検出して撮影する")
+    parser.add_argument("--timeout", type=float, default=600, help="これを超えたら失敗として終わる（秒）")
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication([])
+    with tempfile.TemporaryDirectory() as tmp:
+        tmpdir = Path(tmp)
+        if args.book:
+            book = ReplayBook.from_directory(args.book, turn_latency=args.latency)
+        else:
+            pages_dir = tmpdir / "book"
+            pages_dir.mkdir()
+            book = ReplayBook(
+                make_pages(pages_dir, args.pages, tuple(args.size)),
+                turn_latency=args.latency,
+            )
+
+        window = BenchWindow(
+            window_manager=ReplayWindowManager(book),
+            screenshot=ReplaySource(book),
+            page_navigator=ReplayNavigator(book),
+        )
+        window.path_edit.setText(str(tmpdir / "out"))
+        window.page_spin.setValue(window.page_spin.maximum())
+        window.interval_slider.setValue(round(args.interval * 10))
+        window.adaptive_check.setChecked(args.adaptive)
+
+        def on_timeout():
+            print(f"timeout    {args.timeout:.0f}s を超えました", file=sys.stderr)
+            # エラーダイアログの中で止まっていても、exit は入れ子のループごと抜ける
+            app.exit(1)
+
+        QTimer.singleShot(round(args.timeout * 1000), on_timeout)
+        start = time.perf_counter()
+        window._start_capture()
+        status = app.exec()
+        elapsed = time.perf_counter() - start
+
+        stats = window.capture_stats
+        pages = len(window.captured_images)
+        print(f"pages      {pages} / {len(book.pages)}  ({elapsed:.1f}s)")
+        print(f"throughput {pages / elapsed * 60:.1f} pages/min")
+        print(f"stages     {stats.stage_report()}")
+        if stats.summary():
+            print(f"summary    {stats.summary()}")
+        print(f"peak RSS   {peak_memory_mb():.0f} MB")
+        window.close()
+    if status != 0 or pages != len(book.pages):
+        # 撮れたページ数が本と違うなら、ページ/分も工程ごとの時間も当てにならない
+        sys.exit(status or 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""OCR並列化のベンチマーク（macOS 以外でも動く）
+
+Vision の代わりに、決まった量のCPU処理をして画像内容から決まったテキストを
+返すフェイクエンジンを使う。ワーカー数ごとに OCR 付き PDF 生成の時間を測る。
+
+    python scripts/bench_ocr.py --pages 300 --workers 1 2 4 8
+"""
+
+import argparse
+import hashlib
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from PIL import Image  # noqa: E402
+
+from src.export.ocr_cache import OcrCache  # noqa: E402
+from src.export.ocr_engine import TextBox  # noqa: E402
+from src.export.pdf_generator import PdfGenerator  # noqa: E402
+
+
+class DeterministicOcrEngine:
+    """ページごとに一定量のハッシュ計算をして、内容から決まる結果を返す"""
+
+    def __init__(self, rounds: int):
+        self.rounds = rounds
+
+    def recognize(self, image_path):
+        digest = Path(image_path).read_bytes()
+        for _ in range(self.rounds):
+            digest = hashlib.sha256(digest).digest()
+        return [
+            TextBox(f"line-{digest[:4].hex()}-{i}", 0.1, 0.9 - i * 0.05, 0.8, 0.03, 1.0)
+            for i in range(10)
+        ]
+
+
+def make_pages(directory: Path, count: int) -> list[Path]:
+    """中身の違うページ画像を作る（キャッシュが効かないよう全ページ別内容）"""
+    paths = []
+    for i in range(count):
+        path = directory / f"page_{i + 1:03d}.png"
+        Image.new("RGB", (600, 800), color=(i % 256, (i * 7) % 256, (i * 13) % 256)).save(path)
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--rounds", type=int, default=20000, help="1ページあたりの計算量")
+    args = parser.parse_args()
+
+    engine = DeterministicOcrEngine(args.rounds)
+    with tempfile.TemporaryDirectory() as tmp:
+        tmpdir = Path(tmp)
+        pages = make_pages(tmpdir, args.pages)
+        baseline = None
+        for workers in args.workers:
+            # ワーカー数ごとに空のキャッシュで測る
+            generator = PdfGenerator(ocr_cache=OcrCache(), ocr_workers=workers)
+            start = time.perf_counter()
+            generator.generate(pages, tmpdir / f"bench_{workers}.pdf", ocr=True, ocr_engine=engine)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(
+                f"workers={workers:2d}  {elapsed:7.2f}s  "
+                f"{args.pages / elapsed:7.1f} pages/s  speedup x{baseline / elapsed:.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""章分割（章PDFの書き出し）の並列化ベンチマーク（macOS 以外でも動く）
+
+本文の行が詰まった合成PDFを作って章に分け、ワーカー数ごとに分割時間を測る。
+出力の各章のページ数とテキストがワーカー1のときと一致することも確かめる。
+
+    python scripts/bench_split.py --pages 1000 --chapters 40 --workers 1 2 4 8
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pypdf import PdfReader  # noqa: E402
+from reportlab.pdfgen import canvas  # noqa: E402
+
+from src.export.pdf_splitter import PdfSplitter  # noqa: E402
+
+
+@dataclass
+class Chapter:
+    name: str
+    start: int
+    end: int
+
+
+def make_pdf(path: Path, pages: int, lines: int) -> Path:
+    """1ページに lines 行の本文がある PDF を作る"""
+    c = canvas.Canvas(str(path))
+    for page in range(pages):
+        c.setFont("Helvetica", 9)
+        for line in range(lines):
+            c.drawString(
+                72, 740 - line * 12,
+                f"{page + 1:04d}-{line:02d} The quick brown fox jumps over the lazy dog {page * line}",
+            )
+        c.showPage()
+    c.save()
+    return path
+
+
+def make_chapters(pages: int, count: int) -> list[Chapter]:
+    """pages をほぼ同じ長さの count 章に分ける"""
+    bounds = [pages * i // count for i in range(count + 1)]
+    return [
+        Chapter(f"第{i + 1}章", bounds[i], bounds[i + 1] - 1)
+        for i in range(count)
+    ]
+
+
+def fingerprint(paths: list[Path]) -> list[tuple[int, str]]:
+    """各章のページ数と先頭ページのテキスト"""
+    result = []
+    for path in paths:
+        reader = PdfReader(str(path))
+        result.append((len(reader.pages), reader.pages[0].extract_text()))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", type=int, default=1000)
+    parser.add_argument("--chapters", type=int, default=40)
+    parser.add_argument("--lines", type=int, default=50, help="1ページの行数")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf = make_pdf(Path(tmp) / "bench.pdf", args.pages, args.lines)
+        chapters = make_chapters(args.pages, args.chapters)
+        print(f"{pdf.stat().st_size / 1e6:.1f} MB, {args.pages} pages, {len(chapters)} chapters")
+        baseline = None
+        expected = None
+        for workers in args.workers:
+            out_dir = Path(tmp) / f"out_{workers}"
+            out_dir.mkdir()
+            # 毎回新しい PdfSplitter で、文書の読み込みも時間に含める
+            start = time.perf_counter()
+            paths = PdfSplitter().split(pdf, chapters, out_dir, workers=workers)
+            elapsed = time.perf_counter() - start
+            result = fingerprint(paths)
+            expected = expected or result
+            baseline = baseline or elapsed
+            same = "ok" if result == expected else "MISMATCH"
+            print(
+                f"workers={workers:2d}  {elapsed:7.2f}s  "
+                f"{args.pages / elapsed:7.1f} pages/s  speedup x{baseline / elapsed:.2f}  {same}"
+            )
+
+
+if __name__ == "__main__":
+    main()
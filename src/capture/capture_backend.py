@@ -0,0 +1,43 @@
+"""キャプチャの入出力（撮影・ページ送り・ウィンドウ操作）の取り決め
+
+MainWindow はこの形を満たすものなら何でも使える。実機では Screenshot /
+PageNavigator / WindowManager、macOS 以外での計測やテストでは
+src.capture.replay の再生用実装を渡す。
+"""
+
+from typing import Protocol
+
+from PIL import Image
+
+from src.capture.page_navigator import Direction
+from src.capture.window_manager import WindowBounds, WindowInfo
+
+
+class CaptureSource(Protocol):
+    """画面の指定領域を撮る"""
+
+    def capture_region(self, x: int, y: int, width: int, height: int) -> Image.Image:
+        ...
+
+
+class PageTurner(Protocol):
+    """次のページへ送る"""
+
+    def next_page(self) -> None:
+        ...
+
+    def set_direction(self, direction: Direction) -> None:
+        ...
+
+
+class WindowProvider(Protocol):
+    """撮影対象のウィンドウを列挙し、前面に出す"""
+
+    def get_window_list(self) -> list[WindowInfo]:
+        ...
+
+    def get_content_bounds(self, bounds: WindowBounds) -> WindowBounds:
+        ...
+
+    def bring_to_front(self, pid: int) -> bool:
+        ...
@@ -0,0 +1,70 @@
+"""キャプチャセッションの計測値"""
+
+from dataclasses import dataclass, field
+
+# 工程ごとの計測値の名前と表示名
+STAGE_LABELS = {
+    "grab": "撮影",
+    "fingerprint": "指紋計算",
+    "submit": "保存依頼",
+    "turn": "ページ送り",
+    "save": "PNG保存",
+}
+
+
+@dataclass
+class CaptureStats:
+    """1回のキャプチャで測った値
+
+    settle_times: ページ送りから撮影までに待った秒数（自動検出モードのみ）
+    stopped_at_end: 本の最後を検出して自動停止したか
+    dropped_duplicates: 末尾の重複として取り除いたページ数
+    turn_retries: ページが変わっていなかったためキーを送り直した回数
+    stage_times: 工程名（STAGE_LABELS のキー）→ 1回ごとの所要秒数
+    """
+
+    settle_times: list[float] = field(default_factory=list)
+    stopped_at_end: bool = False
+    dropped_duplicates: int = 0
+    turn_retries: int = 0
+    stage_times: dict[str, list[float]] = field(default_factory=dict)
+
+    @property
+    def average_settle(self) -> float | None:
+        """平均の待ち時間（秒）。計測していなければ None"""
+        if not self.settle_times:
+            return None
+        return sum(self.settle_times) / len(self.settle_times)
+
+    def record(self, stage: str, seconds: float) -> None:
+        """工程の所要時間を1回分記録する"""
+        self.stage_times.setdefault(stage, []).append(seconds)
+
+    def stage_average(self, stage: str) -> float | None:
+        """工程の平均所要時間（秒）。記録が無ければ None"""
+        times = self.stage_times.get(stage)
+        if not times:
+            return None
+        return sum(times) / len(times)
+
+    def stage_report(self) -> str:
+        """工程ごとの平均所要時間をミリ秒で並べた1行"""
+        parts = []
+        for stage, label in STAGE_LABELS.items():
+            average = self.stage_average(stage)
+            if average is not None:
+                parts.append(f"{label} {average * 1000:.1f}ms")
+        return " / ".join(parts)
+
+    def summary(self) -> str:
+        """通知やログに出す1行の要約"""
+        parts = []
+        if self.average_settle is not None:
+            parts.append(f"平均待ち時間 {self.average_settle:.2f}秒")
+        if self.turn_retries:
+            parts.append(f"ページ送り再試行 {self.turn_retries}回")
+        if self.stopped_at_end:
+            parts.append("最後のページを検出して停止")
+        if self.dropped_duplicates:
+            parts.append(f"重複 {self.dropped_duplicates}ページを削除")
+        return "、".join(parts)
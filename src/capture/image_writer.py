@@ -0,0 +1,140 @@
+"""キャプチャ画像の書き出し（GUIスレッドの外で PNG エンコードと保存を行う）"""
+
+import hashlib
+import io
+import logging
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Callable
+
+from PIL import Image
+
+from src.export.thumbnail_cache import ThumbnailCache
+from src.utils.file_hash import write_digest
+
+logger = logging.getLogger(__name__)
+
+# 書き出し待ちの上限（枚数）。ディスクが追いつかないときは submit が
+# ここで待つので、撮影がディスクの速さまで自然に減速する
+DEFAULT_MAX_PENDING = 8
+
+
+class ImageWriter:
+    """撮影画像を背景スレッドで PNG 保存するキュー
+
+    Retina サイズの PNG エンコードは数百ミリ秒かかることがあり、QTimer の
+    コールバック内で行うと次のページ送りが遅れる。撮影側は submit して
+    すぐ戻り、エンコードと fsync はこのスレッドが受け持つ。
+
+    保存に失敗したら以降の submit / close で例外を上げる。
+
+    thumbnail_cache を渡すと、保存した PNG の内容ハッシュで thumbnail_size の
+    サムネイルも作っておく。展開済みの画像から縮めるだけなので、後で大きな
+    PNG を開き直して縮小するより安い。ハッシュは PNG の隣に控えておき、
+    サムネイルを引くときに PNG を読み直さずに済むようにする。
+    サムネイルの失敗は撮影を止めない。
+    """
+
+    def __init__(
+        self,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        thumbnail_cache: ThumbnailCache | None = None,
+        thumbnail_size: tuple[int, int] = (100, 140),
+    ):
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self.thumbnail_cache = thumbnail_cache
+        self.thumbnail_size = thumbnail_size
+        self._thread: threading.Thread | None = None
+        self._error: Exception | None = None
+        self.write_times: list[float] = []  # 1枚ごとの保存（エンコード〜fsync）秒数
+
+    def start(self) -> None:
+        """書き出しスレッドを開始する（前回の失敗はリセットする）"""
+        if self._thread is not None:
+            return
+        self._error = None
+        self.write_times = []
+        self._thread = threading.Thread(
+            target=self._run, name="ImageWriter", daemon=True
+        )
+        self._thread.start()
+
+    def submit(
+        self,
+        image: Image.Image,
+        path: Path,
+        on_saved: Callable[[Path], None] | None = None,
+    ) -> None:
+        """保存を依頼する。待ちが上限に達していれば空くまで待つ
+
+        on_saved は保存（fsync まで）が終わった後に書き出しスレッドから呼ばれる。
+        """
+        self._raise_if_failed()
+        if self._thread is None:
+            self.start()
+        self._queue.put((image, path, on_saved))
+
+    def flush(self) -> None:
+        """依頼済みの保存がすべて終わるまで待つ"""
+        self._queue.join()
+        self._raise_if_failed()
+
+    def close(self) -> None:
+        """残りを書き出してスレッドを止める"""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+        self._raise_if_failed()
+
+    def _raise_if_failed(self) -> None:
+        if self._error is not None:
+            raise self._error
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                if self._error is not None:
+                    # 一度失敗したら残りは捨てる（欠番のまま続けない）
+                    continue
+                image, path, on_saved = item
+                started = time.perf_counter()
+                digest = self._write(image, path)
+                self.write_times.append(time.perf_counter() - started)
+                if self.thumbnail_cache is not None and digest is not None:
+                    self._write_thumbnail(image, digest, path)
+                if on_saved is not None:
+                    on_saved(path)
+            except Exception as e:
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+    def _write_thumbnail(self, image: Image.Image, digest: str, path: Path) -> None:
+        width, height = self.thumbnail_size
+        try:
+            self.thumbnail_cache.put_image_thumbnail(digest, image, width, height)
+            write_digest(path, digest)
+        except Exception:
+            # 章分割ダイアログで元の PNG から作り直せる
+            logger.warning("サムネイルを作れませんでした: %s", path, exc_info=True)
+
+    @staticmethod
+    def _write(image: Image.Image, path: Path) -> str:
+        """PNG で保存し、クラッシュしても残るよう fsync する。書いた内容の SHA-256 を返す"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # 一度メモリにエンコードし、書き込みと同じバイト列からハッシュを取る
+        buffer = io.BytesIO()
+        image.save(buffer, "PNG")
+        data = buffer.getbuffer()
+        with open(path, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        return hashlib.sha256(data).hexdigest()
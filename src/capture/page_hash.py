@@ -0,0 +1,35 @@
+"""ページ画像の指紋（ページが変わったかを安く判定する）
+
+撮影画像を小さなグレースケール画像に縮小したものを指紋にする。
+同じページを撮り直した画像はほぼ同じ指紋になり、ページが変われば
+本文の配置が変わるので平均輝度差が大きくなる。
+"""
+
+from PIL import Image
+
+# 指紋の一辺（ピクセル）。32x32 = 1024 バイト
+FINGERPRINT_SIZE = 32
+# 同じページとみなす平均輝度差（0..255）の上限。
+# カーソルや進捗表示などの小さな変化は吸収し、本文が変わるページ送りは弾く調整ノブ
+SAME_PAGE_MAX_DIFF = 2.0
+
+
+def page_fingerprint(image: Image.Image) -> bytes:
+    """画像を縮小したグレースケール画素列を返す"""
+    small = image.resize(
+        (FINGERPRINT_SIZE, FINGERPRINT_SIZE), Image.Resampling.BOX
+    ).convert("L")
+    return small.tobytes()
+
+
+def fingerprint_distance(a: bytes, b: bytes) -> float:
+    """2つの指紋の平均輝度差（0..255）"""
+    if len(a) != len(b):
+        # 領域サイズが違う画像は比較できないので「別ページ」扱い
+        return 255.0
+    return sum(abs(x - y) for x, y in zip(a, b)) / len(a)
+
+
+def is_same_page(a: bytes, b: bytes, max_diff: float = SAME_PAGE_MAX_DIFF) -> bool:
+    """2つの指紋が同じページを写したものか"""
+    return fingerprint_distance(a, b) <= max_diff
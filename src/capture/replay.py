@@ -0,0 +1,137 @@
+"""ページ画像を再生するキャプチャ実装（macOS 以外での計測・テスト用）
+
+ディレクトリに並んだページ画像を「画面に開いている本」に見立て、
+Screenshot / PageNavigator / WindowManager の代わりに MainWindow へ渡す。
+ページ送りからターン遅延が経つまでは前のページが写るので、
+待ち時間の自動検出や送り直しの処理もそのまま動く。
+"""
+
+import math
+import time
+from pathlib import Path
+from typing import Callable
+
+from PIL import Image
+
+from src.capture.page_navigator import Direction
+from src.capture.window_manager import WindowBounds, WindowInfo, WindowManager
+
+IMAGE_SUFFIXES = (".png", ".jpg", ".jpeg")
+
+
+class ReplayBook:
+    """ページ画像の並びを、1ページずつ表示する本として扱う
+
+    turn() してから turn_latency 秒経つまでは前のページが表示されたまま。
+    最後のページで turn() しても表示は変わらない（本の最後）。
+    """
+
+    def __init__(
+        self,
+        pages: list[Path],
+        turn_latency: float = 0.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if not pages:
+            raise ValueError("ページ画像がありません")
+        self.pages = list(pages)
+        self.turn_latency = turn_latency
+        self.turns = 0
+        self._clock = clock
+        self._index = 0
+        self._previous = 0
+        self._turned_at = -math.inf
+        self._decoded: tuple[int, Image.Image] | None = None
+
+    @classmethod
+    def from_directory(cls, directory: Path, **kwargs) -> "ReplayBook":
+        """ディレクトリ内の画像をファイル名順に並べた本を作る"""
+        pages = sorted(
+            p for p in Path(directory).iterdir() if p.suffix.lower() in IMAGE_SUFFIXES
+        )
+        return cls(pages, **kwargs)
+
+    @property
+    def displayed_index(self) -> int:
+        """いま画面に写っているページの位置（0始まり）"""
+        if self._clock() - self._turned_at < self.turn_latency:
+            return self._previous
+        return self._index
+
+    def turn(self) -> None:
+        """次のページへ送る"""
+        self._previous = self.displayed_index
+        self._index = min(self._index + 1, len(self.pages) - 1)
+        self._turned_at = self._clock()
+        self.turns += 1
+
+    def displayed_image(self) -> Image.Image:
+        """いま写っているページの画像（同じページは読み込み直さない）"""
+        index = self.displayed_index
+        if self._decoded is None or self._decoded[0] != index:
+            with Image.open(self.pages[index]) as img:
+                self._decoded = (index, img.convert("RGB"))
+        return self._decoded[1]
+
+    @property
+    def page_size(self) -> tuple[int, int]:
+        """1ページ目の大きさ (width, height)"""
+        with Image.open(self.pages[0]) as img:
+            return img.size
+
+
+class ReplaySource:
+    """ReplayBook の表示中ページを撮る（Screenshot の代わり）"""
+
+    def __init__(self, book: ReplayBook):
+        self.book = book
+
+    def capture_region(self, x: int, y: int, width: int, height: int) -> Image.Image:
+        """表示中ページを画面とみなし、指定領域を切り出す"""
+        return self.book.displayed_image().crop((x, y, x + width, y + height))
+
+
+class ReplayNavigator:
+    """ReplayBook のページを送る（PageNavigator の代わり）
+
+    方向は記録するだけで、どのキーでも次のページへ進む。
+    """
+
+    def __init__(self, book: ReplayBook, direction: Direction = Direction.RIGHT):
+        self.book = book
+        self.direction = direction
+
+    def next_page(self) -> None:
+        """次のページへ移動"""
+        self.book.turn()
+
+    def set_direction(self, direction: Direction) -> None:
+        """ページ送り方向を設定"""
+        self.direction = direction
+
+
+class ReplayWindowManager(WindowManager):
+    """ReplayBook を表示している1枚だけのウィンドウを返す（WindowManager の代わり）"""
+
+    def __init__(self, book: ReplayBook):
+        self.book = book
+
+    def get_window_list(self) -> list[WindowInfo]:
+        """本のページがちょうど収まるウィンドウを1つ返す"""
+        width, height = self.book.page_size
+        return [WindowInfo(
+            id=1,
+            name=self.book.pages[0].parent.name,
+            owner="Replay",
+            pid=0,
+            bounds=WindowBounds(
+                x=0,
+                y=-self.TITLEBAR_HEIGHT,
+                width=width,
+                height=height + self.TITLEBAR_HEIGHT,
+            ),
+        )]
+
+    def bring_to_front(self, pid: int) -> bool:
+        """前面に出す操作は無い"""
+        return True
@@ -0,0 +1,23 @@
+"""ページ送り後の画面の落ち着き（描画完了）の判定"""
+
+from src.capture.page_hash import is_same_page
+
+
+class SettleDetector:
+    """ページ送り直後から撮った確認用フレームを順に受け取り、撮影してよいかを返す
+
+    直前のページと異なり、かつ連続する2枚が一致したら「次のページの描画が
+    終わった」とみなす。固定の待ち時間を安全側に長く取らなくて済む。
+    """
+
+    def __init__(self, previous_page: bytes | None):
+        self._previous_page = previous_page
+        self._last_probe: bytes | None = None
+
+    def feed(self, probe: bytes) -> bool:
+        """確認用フレームの指紋を渡し、落ち着いていれば True を返す"""
+        last, self._last_probe = self._last_probe, probe
+        if last is None or not is_same_page(last, probe):
+            return False
+        # 直前のページのまま（まだ切り替わっていない）なら待ち続ける
+        return self._previous_page is None or not is_same_page(probe, self._previous_page)
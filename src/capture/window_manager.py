@@ -2,8 +2,6 @@
 """macOSのウィンドウ一覧取得と管理"""
 
 from typing import TypedDict
-import Quartz
-from AppKit import NSWorkspace, NSApplicationActivateIgnoringOtherApps
 
 
 class WindowBounds(TypedDict):
@@ -28,6 +26,9 @@ class WindowManager:
 
     def get_window_list(self) -> list[WindowInfo]:
         """表示中のウィンドウ一覧を取得"""
+        # macOS 以外でもモジュールを読み込めるよう遅延 import
+        import Quartz
+
         windows = []
         window_list = Quartz.CGWindowListCopyWindowInfo(
             Quartz.kCGWindowListOptionOnScreenOnly | Quartz.kCGWindowListExcludeDesktopElements,
@@ -74,6 +75,8 @@ class WindowManager:
 
     def bring_to_front(self, pid: int) -> bool:
         """指定PIDのアプリをフォアグラウンドに移動"""
+        from AppKit import NSWorkspace, NSApplicationActivateIgnoringOtherApps
+
         apps = NSWorkspace.sharedWorkspace().runningApplications()
         for app in apps:
             if app.processIdentifier() == pid:
@@ -0,0 +1,138 @@
+"""キャプチャの記録（クラッシュしても途中から再開できるようにする）
+
+出力ディレクトリの session.jsonl に1行1件で追記していく。
+
+    {"type": "session", ...}   撮影設定（領域・方向・間隔・ページ数など）
+    {"type": "page", ...}      保存が終わったページ（番号・ファイル名・指紋）
+    {"type": "end", ...}       正常に完了した（再開の対象外）
+
+ページの行は PNG の fsync が済んでから書くので、記録にあるページの画像は
+必ずディスクにある。記録自体の fsync は数ページごとにまとめて行う。
+"""
+
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+
+# 記録の形式が変わったら上げる（古い形式は再開しない）
+JOURNAL_VERSION = 1
+# この件数ごとに fsync する（クラッシュで失うのは最大でこの件数の記録だけ）
+DEFAULT_SYNC_EVERY = 8
+
+
+@dataclass
+class JournalPage:
+    """保存済みの1ページ"""
+
+    page: int
+    path: Path
+    fingerprint: bytes | None
+
+
+@dataclass
+class CaptureSession:
+    """記録から読み戻したキャプチャの状態"""
+
+    settings: dict
+    pages: list[JournalPage] = field(default_factory=list)
+    finished: bool = False
+
+    @property
+    def next_page(self) -> int:
+        """次に撮るページ番号（1始まり）"""
+        return len(self.pages) + 1
+
+
+class CaptureJournal:
+    """session.jsonl への追記
+
+    撮影設定は開始時に GUI スレッドから、ページは ImageWriter のスレッドから、
+    完了は書き出しスレッドを止めた後に書く。同時に書かれることは無い。
+    """
+
+    def __init__(self, path: Path, sync_every: int = DEFAULT_SYNC_EVERY):
+        self.path = path
+        self.sync_every = sync_every
+        self._file = open(path, "a", encoding="utf-8")
+        self._unsynced = 0
+
+    def write_session(self, settings: dict) -> None:
+        """撮影設定を書く（新しいキャプチャの最初に1回）"""
+        self._append({"type": "session", "version": JOURNAL_VERSION, **settings}, sync=True)
+
+    def record_page(self, page: int, path: Path, fingerprint: bytes | None) -> None:
+        """保存が終わったページを書く"""
+        self._append({
+            "type": "page",
+            "page": page,
+            "file": path.name,
+            "fingerprint": fingerprint.hex() if fingerprint is not None else None,
+        })
+
+    def finish(self, page_count: int) -> None:
+        """正常に完了したことを書いて閉じる"""
+        self._append({"type": "end", "pages": page_count}, sync=True)
+        self.close()
+
+    def close(self) -> None:
+        """残りを fsync して閉じる"""
+        if self._file.closed:
+            return
+        self._sync()
+        self._file.close()
+
+    def _append(self, record: dict, sync: bool = False) -> None:
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self._unsynced += 1
+        if sync or self._unsynced >= self.sync_every:
+            self._sync()
+
+    def _sync(self) -> None:
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+
+def load_journal(path: Path, images_dir: Path) -> CaptureSession | None:
+    """記録を読み戻す。無い・設定行が読めない・形式違いなら None
+
+    書きかけの最終行（クラッシュ時）は読み飛ばす。ページは1から連続して
+    画像が残っている分だけを採る。
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            lines = f.readlines()
+    except OSError:
+        return None
+
+    session: CaptureSession | None = None
+    pages: dict[int, JournalPage] = {}
+    for line in lines:
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        kind = record.get("type")
+        if kind == "session":
+            if record.get("version") != JOURNAL_VERSION:
+                return None
+            settings = {k: v for k, v in record.items() if k not in ("type", "version")}
+            session = CaptureSession(settings=settings)
+        elif kind == "page" and session is not None:
+            fingerprint = record.get("fingerprint")
+            pages[record["page"]] = JournalPage(
+                page=record["page"],
+                path=images_dir / record["file"],
+                fingerprint=bytes.fromhex(fingerprint) if fingerprint else None,
+            )
+        elif kind == "end" and session is not None:
+            session.finished = True
+
+    if session is None:
+        return None
+    number = 1
+    while number in pages and pages[number].path.exists():
+        session.pages.append(pages[number])
+        number += 1
+    return session
@@ -0,0 +1,137 @@
+"""章PDFの書き出し（プロセスプールでの並列化つき）
+
+PdfWriter.write は純 Python のシリアライズで、章どうしは独立している。
+workers が2以上なら章ごとにワーカープロセスへ振り分ける。ワーカーは
+それぞれ自分で PDF を開き（reader はプロセス間で受け渡せない）、
+自分の章のページ範囲だけを書く。
+
+どの章もまず一時ファイル（.part）に書き、全章を書き終えてから commit_parts で
+出力先に置き換える。途中で止まったときは一時ファイルだけを消すので、同じ名前の
+前回の出力は残る。
+
+ワーカーが読み込むので、このモジュールは Qt や Quartz を import しない。
+"""
+
+import os
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+from pypdf import PdfReader, PdfWriter
+
+# これより少ないページ数なら並列にしない（プロセス起動と PDF の読み直しの方が高くつく）
+MIN_PARALLEL_PAGES = 200
+# 並列に書いている間、キャンセルを確かめる間隔（秒）
+_POLL_SECONDS = 0.1
+
+# ワーカープロセスごとに1回だけ開いた reader
+_worker_reader: PdfReader | None = None
+
+# (開始ページ, 終了ページ, 出力先)。ページは0始まり・終了を含む
+ChapterJob = tuple[int, int, Path]
+
+
+class SplitCancelled(Exception):
+    """章分割のキャンセル"""
+
+
+def part_path(out_path: Path) -> Path:
+    """out_path に置き換える前の一時ファイル"""
+    return out_path.with_name(out_path.name + ".part")
+
+
+def write_chapter_part(
+    reader: PdfReader,
+    start: int,
+    end: int,
+    out_path: Path,
+    is_cancelled: Callable[[], bool] | None = None,
+) -> None:
+    """start〜end ページを out_path の一時ファイル（.part）に書く
+
+    is_cancelled が真を返したら、ページの区切りで SplitCancelled を上げる。
+    書き損じた一時ファイルは消す。出力先への置き換えは commit_parts で行う。
+    """
+    writer = PdfWriter()
+    for page_index in range(start, end + 1):
+        if is_cancelled is not None and is_cancelled():
+            raise SplitCancelled()
+        writer.add_page(reader.pages[page_index])
+    tmp_path = part_path(out_path)
+    try:
+        with open(tmp_path, "wb") as f:
+            writer.write(f)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def commit_parts(out_paths: list[Path]) -> None:
+    """書き終えた全章の一時ファイルを、それぞれの出力先に置き換える"""
+    for out_path in out_paths:
+        os.replace(part_path(out_path), out_path)
+
+
+def discard_parts(out_paths: list[Path]) -> None:
+    """一時ファイルだけを消す（出力先にある前回の出力には触れない）"""
+    for out_path in out_paths:
+        part_path(out_path).unlink(missing_ok=True)
+
+
+def _open_worker_reader(pdf_path: str) -> None:
+    global _worker_reader
+    _worker_reader = PdfReader(pdf_path)
+
+
+def _write_chapter_in_worker(start: int, end: int, out_path: str) -> None:
+    write_chapter_part(_worker_reader, start, end, Path(out_path))
+
+
+def write_chapters_parallel(
+    pdf_path: Path,
+    jobs: list[ChapterJob],
+    workers: int,
+    progress: Callable[[int, int], None] | None = None,
+    is_cancelled: Callable[[], bool] | None = None,
+    commit: bool = True,
+) -> list[Path]:
+    """章をワーカープロセスで並列に書き、出力先を jobs の順に返す
+
+    progress は章が書き終わった順に (書いたページ数, 全ページ数) で呼ぶ。
+    全章を書き終えてから出力先に置き換える（commit が偽なら一時ファイルのまま残す）。
+    中止（SplitCancelled）や失敗のときは、始まっていない章を取り消し、
+    書いている章が終わるのを待ってから一時ファイルを消す。
+    """
+    total = sum(end - start + 1 for start, end, _ in jobs)
+    done = 0
+    pool = ProcessPoolExecutor(
+        max_workers=min(workers, len(jobs)),
+        initializer=_open_worker_reader,
+        initargs=(str(pdf_path),),
+    )
+    futures = {
+        pool.submit(_write_chapter_in_worker, start, end, str(out_path)): (start, end, out_path)
+        for start, end, out_path in jobs
+    }
+    pending = set(futures)
+    try:
+        while pending:
+            if is_cancelled is not None and is_cancelled():
+                raise SplitCancelled()
+            finished, pending = wait(pending, timeout=_POLL_SECONDS, return_when=FIRST_COMPLETED)
+            for future in finished:
+                future.result()  # ワーカーでの失敗はここで上がる
+                start, end, _ = futures[future]
+                done += end - start + 1
+                if progress is not None:
+                    progress(done, total)
+        pool.shutdown()
+        out_paths = [out_path for _, _, out_path in jobs]
+        if commit:
+            commit_parts(out_paths)
+    except BaseException:
+        pool.shutdown(wait=True, cancel_futures=True)
+        # 書き終えた章も、ワーカーごと落ちて残った書きかけも一時ファイルのまま
+        discard_parts([out_path for _, _, out_path in jobs])
+        raise
+    return out_paths
@@ -5,6 +5,8 @@ from pathlib import Path
 from datetime import datetime
 import shutil
 
+from src.export.capture_journal import CaptureJournal, CaptureSession, load_journal
+
 
 class FileManager:
     """出力ファイルの管理を行うクラス"""
@@ -26,6 +28,21 @@ class FileManager:
         images_dir.mkdir(parents=True, exist_ok=True)
         return images_dir / f"page_{page_number:03d}.png"
 
+    def get_ocr_cache_path(self, output_dir: Path) -> Path:
+        """OCR結果キャッシュ（サイドカー）のパスを取得
+
+        画像と同じ images/ に置き、画像を削除するときに一緒に消えるようにする。
+        """
+        return output_dir / "images" / "ocr_cache.json"
+
+    def get_stream_pages_dir(self, output_dir: Path) -> Path:
+        """撮影中に作る1ページPDFの置き場所（画像と一緒に削除される）"""
+        return output_dir / "images" / "pdf_pages"
+
+    def get_stream_pdf_path(self, output_dir: Path) -> Path:
+        """撮影中に作ったページをつなげたPDFのパス（出力時に merged.pdf へ移す）"""
+        return output_dir / "images" / "stream.pdf"
+
     def cleanup_images(self, output_dir: Path) -> None:
         """画像ディレクトリを削除"""
         images_dir = output_dir / "images"
@@ -48,3 +65,22 @@ class FileManager:
         output_dir = parent_dir / f"{now}_{safe_name}"
         output_dir.mkdir(parents=True, exist_ok=True)
         return output_dir
+
+    def get_journal_path(self, output_dir: Path) -> Path:
+        """キャプチャ記録（session.jsonl）のパスを取得"""
+        return output_dir / "session.jsonl"
+
+    def open_journal(self, output_dir: Path, settings: dict | None = None) -> CaptureJournal:
+        """キャプチャ記録を追記用に開く
+
+        settings を渡すと新しいキャプチャとして撮影設定を最初に書く。
+        再開するときは渡さずに、既存の記録へ続けて書く。
+        """
+        journal = CaptureJournal(self.get_journal_path(output_dir))
+        if settings is not None:
+            journal.write_session(settings)
+        return journal
+
+    def load_journal(self, output_dir: Path) -> CaptureSession | None:
+        """キャプチャ記録を読み戻す（無ければ None）"""
+        return load_journal(self.get_journal_path(output_dir), output_dir / "images")
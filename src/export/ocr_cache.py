@@ -0,0 +1,111 @@
+"""OCR結果のキャッシュ（画像の内容ハッシュをキーにする）
+
+結合PDFと章別PDFを両方出力すると、同じページを2回OCRすることになる。
+1回目の認識結果を覚えておき、2回目以降はOCRエンジンを呼ばずに返す。
+"""
+
+import json
+import os
+from dataclasses import asdict
+from pathlib import Path
+from typing import Iterator
+
+from src.export.ocr_engine import TextBox, recognize_many
+from src.utils.file_hash import file_sha256
+
+# サイドカーの形式が変わったら上げる（古い形式は読み捨てる）
+_FORMAT_VERSION = 1
+
+
+class OcrCache:
+    """画像の内容ハッシュ → 認識結果 のキャッシュ
+
+    既定ではセッション中のメモリだけに持つ。sidecar_path を渡すと、
+    起動時にそこから読み込み、save() でそこへ書き出す。
+    hits / misses で効き具合を確認できる。
+    """
+
+    def __init__(self, sidecar_path: Path | None = None):
+        self.sidecar_path = sidecar_path
+        self.hits = 0
+        self.misses = 0
+        self._entries: dict[str, list[TextBox]] = {}
+        if sidecar_path is not None:
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def recognize(self, image_path: Path, ocr_engine) -> list[TextBox]:
+        """キャッシュにあればそれを、無ければ ocr_engine で認識して覚える"""
+        key = file_sha256(image_path)
+        boxes = self._entries.get(key)
+        if boxes is not None:
+            self.hits += 1
+            return boxes
+        self.misses += 1
+        boxes = ocr_engine.recognize(image_path)
+        self._entries[key] = boxes
+        return boxes
+
+    def recognize_many(
+        self, image_paths: list[Path], ocr_engine, workers: int = 1
+    ) -> Iterator[list[TextBox]]:
+        """複数ページをページ順に返す。キャッシュに無いページだけ並列で認識する"""
+        keys = [file_sha256(path) for path in image_paths]
+        # 同じ内容のページが並んでいても認識は1回にする
+        pending: dict[str, Path] = {}
+        for key, path in zip(keys, image_paths):
+            if key not in self._entries and key not in pending:
+                pending[key] = path
+        results = recognize_many(ocr_engine, list(pending.values()), workers=workers)
+
+        try:
+            for key in keys:
+                boxes = self._entries.get(key)
+                if boxes is not None:
+                    self.hits += 1
+                else:
+                    # pending は初出順なので、未登録のキーは次に届く結果と一致する
+                    self.misses += 1
+                    boxes = next(results)
+                    self._entries[key] = boxes
+                yield boxes
+        finally:
+            # 途中で打ち切られたらワーカーの残りの仕事も捨てる
+            results.close()
+
+    def save(self) -> None:
+        """サイドカーへ書き出す（sidecar_path が無ければ何もしない）
+
+        書き込み途中で落ちても壊れたファイルを残さないよう、一時ファイルに
+        書いてから置き換える。
+        """
+        if self.sidecar_path is None:
+            return
+        data = {
+            "version": _FORMAT_VERSION,
+            "entries": {
+                key: [asdict(box) for box in boxes]
+                for key, boxes in self._entries.items()
+            },
+        }
+        self.sidecar_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.sidecar_path.with_name(self.sidecar_path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.sidecar_path)
+
+    def _load(self) -> None:
+        """サイドカーを読み込む。無い・壊れている・形式違いなら空のまま"""
+        try:
+            with open(self.sidecar_path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != _FORMAT_VERSION:
+                return
+            self._entries = {
+                key: [TextBox(**box) for box in boxes]
+                for key, boxes in data["entries"].items()
+            }
+        except (OSError, ValueError, KeyError, TypeError, AttributeError):
+            self._entries = {}
@@ -1,8 +1,10 @@
 # src/export/ocr_engine.py
 """OCRエンジン: 画像から文字とその位置を認識する"""
 
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Iterator, Protocol
 
 
 @dataclass
@@ -17,6 +19,40 @@ class TextBox:
     confidence: float
 
 
+class OcrEngine(Protocol):
+    """OCRエンジンの差し替え口
+
+    recognize_many でワーカープロセスに渡すため、実装は pickle できること
+    （状態を持たないか、持つなら pickle 可能な値だけにする）。
+    """
+
+    def recognize(self, image_path: Path) -> list[TextBox]: ...
+
+
+def recognize_many(
+    engine: OcrEngine, image_paths: list[Path], workers: int = 1
+) -> Iterator[list[TextBox]]:
+    """複数ページを認識し、結果をページ順に1つずつ返す
+
+    workers が2以上ならプロセスプールに振り分ける。結果は届いた順ではなく
+    ページ順に返すので、呼び出し側は先頭から順にPDFへ書き込める。
+    途中で打ち切られた（ジェネレータが閉じられた）ら未着手のページは捨てる。
+    """
+    if workers <= 1 or len(image_paths) <= 1:
+        for image_path in image_paths:
+            yield engine.recognize(image_path)
+        return
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(image_paths))) as pool:
+        futures = [pool.submit(engine.recognize, path) for path in image_paths]
+        try:
+            for future in futures:
+                yield future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+
+
 class VisionOcrEngine:
     """macOS Vision を用いたOCRエンジン"""
 
@@ -0,0 +1,247 @@
+"""PDFページの描画（開いた文書と描画先を使い回し、結果を覚えておく）
+
+目次解析・章扉検出・サムネイル表示は同じページを何度も描く。描くたびに
+文書を開き直し、ビットマップを作り直すのは無駄なので、PageRenderer が
+描画元（backend）を持ち続け、描いたページを (ページ, 大きさ) ごとに
+容量つきの LRU で覚えておく。サムネイルの大きさのものはディスクにも残し
+（ThumbnailCache）、同じPDFを開き直したときは描かずに読む。
+
+実機では Quartz で描く QuartzRenderBackend を使う。macOS 以外での計測や
+テストには、同じ入力から毎回同じ画像を作る PillowRenderBackend を渡す。
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from typing import Callable, Protocol
+
+from PyQt6.QtGui import QImage
+
+from src.export.thumbnail_cache import MAX_CACHED_SIDE, ThumbnailCache
+
+logger = logging.getLogger(__name__)
+
+# 覚えておく描画結果の合計（バイト）
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+# Quartz の描画先（ビットマップ）を大きさごとに残しておく数
+_MAX_CONTEXTS = 4
+
+
+class RenderBackend(Protocol):
+    """ページを指定の大きさの画像に描く"""
+
+    @property
+    def page_count(self) -> int:
+        ...
+
+    def page_size(self, page_index: int) -> tuple[float, float]:
+        """ページの幅・高さ（ポイント）"""
+        ...
+
+    def render(self, page_index: int, width: int, height: int) -> QImage:
+        ...
+
+
+def fit_size(
+    page_width: float, page_height: float,
+    max_width: int | None = None, max_height: int | None = None,
+) -> tuple[int, int]:
+    """縦横比を保って max_width × max_height に収まる大きさ（指定の無い辺は制限しない）"""
+    if page_width <= 0 or page_height <= 0:
+        raise ValueError(f"ページのサイズが不正です: {page_width}x{page_height}")
+    scales = []
+    if max_width is not None:
+        scales.append(max_width / page_width)
+    if max_height is not None:
+        scales.append(max_height / page_height)
+    scale = min(scales) if scales else 1.0
+    return max(1, int(page_width * scale)), max(1, int(page_height * scale))
+
+
+class PageRenderer:
+    """1つのPDFのページを描き、描いた結果を覚えておく
+
+    render はどのスレッドから呼んでもよい（描画は1つずつ行う）。返す QImage は
+    呼び出し側と共有するので書き換えないこと。
+
+    disk_cache と source_hash（PDF の内容ハッシュを返す関数。初めてディスクを
+    引くときに呼ぶ）を渡すと、MAX_CACHED_SIDE 以下の描画結果をディスクにも残す。
+    """
+
+    def __init__(
+        self,
+        backend: RenderBackend,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        disk_cache: ThumbnailCache | None = None,
+        source_hash: Callable[[], str] | None = None,
+    ):
+        self.backend = backend
+        self.max_bytes = max_bytes
+        self.disk_cache = disk_cache
+        self._source_hash = source_hash
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self._images: "OrderedDict[tuple, QImage]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def page_count(self) -> int:
+        return self.backend.page_count
+
+    def render(
+        self, page_index: int, max_width: int | None = None, max_height: int | None = None
+    ) -> QImage:
+        """page_index（0始まり）を max_width × max_height に収まる大きさで描く"""
+        key = (page_index, max_width, max_height)
+        with self._lock:
+            image = self._images.get(key)
+            if image is not None:
+                self._images.move_to_end(key)
+                self.hits += 1
+                return image
+            self.misses += 1
+            if not 0 <= page_index < self.backend.page_count:
+                raise IndexError(f"ページ {page_index + 1} はありません")
+            width, height = fit_size(
+                *self.backend.page_size(page_index), max_width, max_height
+            )
+            image = self._render_or_load(page_index, width, height)
+            self._remember(key, image)
+            return image
+
+    def _render_or_load(self, page_index: int, width: int, height: int) -> QImage:
+        use_disk = (
+            self.disk_cache is not None and self._source_hash is not None
+            and max(width, height) <= MAX_CACHED_SIDE
+        )
+        if not use_disk:
+            return self.backend.render(page_index, width, height)
+        source_hash = self._source_hash()
+        image = self.disk_cache.get(source_hash, page_index, width, height)
+        if image is not None:
+            self.disk_hits += 1
+            return image
+        image = self.backend.render(page_index, width, height)
+        try:
+            self.disk_cache.put(source_hash, page_index, width, height, image)
+        except OSError:
+            # 保存できなくても描いた画像はそのまま使える
+            logger.warning("サムネイルをキャッシュできませんでした (page %d)", page_index + 1)
+        return image
+
+    def clear(self) -> None:
+        """覚えた描画結果を捨てる"""
+        with self._lock:
+            self._images.clear()
+            self._bytes = 0
+
+    def _remember(self, key: tuple, image: QImage) -> None:
+        size = image.sizeInBytes()
+        if size > self.max_bytes:
+            return
+        self._images[key] = image
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _, evicted = self._images.popitem(last=False)
+            self._bytes -= evicted.sizeInBytes()
+
+
+class QuartzRenderBackend:
+    """macOS Quartz で描く。文書は PdfDocument の CGPDFDocument を使い回す"""
+
+    def __init__(self, document):
+        import Quartz
+
+        self._quartz = Quartz
+        self._document = document
+        self._cg_document = document.cg_document()
+        self._color_space = Quartz.CGColorSpaceCreateDeviceRGB()
+        self._contexts: "OrderedDict[tuple[int, int], object]" = OrderedDict()
+
+    @property
+    def page_count(self) -> int:
+        return self._quartz.CGPDFDocumentGetNumberOfPages(self._cg_document)
+
+    def _page(self, page_index: int):
+        # CGPDFDocument のページ番号は 1-indexed
+        page = self._quartz.CGPDFDocumentGetPage(self._cg_document, page_index + 1)
+        if page is None:
+            raise RuntimeError(f"PDFページを読み込めませんでした (page {page_index + 1})")
+        return page
+
+    def page_size(self, page_index: int) -> tuple[float, float]:
+        rect = self._quartz.CGPDFPageGetBoxRect(self._page(page_index), self._quartz.kCGPDFMediaBox)
+        return rect.size.width, rect.size.height
+
+    def _context(self, width: int, height: int):
+        """同じ大きさの描画先は作り直さずに使う"""
+        Quartz = self._quartz
+        key = (width, height)
+        context = self._contexts.get(key)
+        if context is not None:
+            self._contexts.move_to_end(key)
+            return context
+        context = Quartz.CGBitmapContextCreate(
+            None, width, height, 8, width * 4,
+            self._color_space, Quartz.kCGImageAlphaPremultipliedFirst
+        )
+        if context is None:
+            raise RuntimeError(f"描画先の作成に失敗しました（{width}x{height}）")
+        self._contexts[key] = context
+        while len(self._contexts) > _MAX_CONTEXTS:
+            self._contexts.popitem(last=False)
+        return context
+
+    def render(self, page_index: int, width: int, height: int) -> QImage:
+        Quartz = self._quartz
+        page = self._page(page_index)
+        page_width, page_height = self.page_size(page_index)
+        context = self._context(width, height)
+
+        Quartz.CGContextSaveGState(context)
+        # 前に描いたページを消して背景を白に
+        Quartz.CGContextSetRGBFillColor(context, 1.0, 1.0, 1.0, 1.0)
+        Quartz.CGContextFillRect(context, Quartz.CGRectMake(0, 0, width, height))
+        scale = min(width / page_width, height / page_height)
+        Quartz.CGContextScaleCTM(context, scale, scale)
+        Quartz.CGContextDrawPDFPage(context, page)
+        Quartz.CGContextRestoreGState(context)
+
+        # CGImage → QImage（描画先は次のページで上書きするのでコピーして持つ）
+        cg_image = Quartz.CGBitmapContextCreateImage(context)
+        bytes_per_row = Quartz.CGImageGetBytesPerRow(cg_image)
+        data = Quartz.CGDataProviderCopyData(Quartz.CGImageGetDataProvider(cg_image))
+        image = QImage(data, width, height, bytes_per_row, QImage.Format.Format_ARGB32_Premultiplied)
+        return image.copy()
+
+
+class PillowRenderBackend:
+    """Quartz の代わりに使う描画（macOS 以外での計測・テスト用）
+
+    本文は描かず、白いページに枠とページ番号を入れる。同じページ・大きさなら
+    毎回同じ画像になる。ページの大きさは pypdf で読む。
+    """
+
+    def __init__(self, document):
+        self._document = document
+
+    @property
+    def page_count(self) -> int:
+        return self._document.page_count
+
+    def page_size(self, page_index: int) -> tuple[float, float]:
+        with self._document.lock:
+            box = self._document.reader.pages[page_index].mediabox
+            return float(box.width), float(box.height)
+
+    def render(self, page_index: int, width: int, height: int) -> QImage:
+        from PIL import Image, ImageDraw
+
+        image = Image.new("RGB", (width, height), "white")
+        draw = ImageDraw.Draw(image)
+        draw.rectangle((0, 0, width - 1, height - 1), outline=(128, 128, 128))
+        draw.text((4, 4), str(page_index + 1), fill=(0, 0, 0))
+        data = image.convert("RGBA").tobytes("raw", "BGRA")
+        return QImage(data, width, height, width * 4, QImage.Format.Format_ARGB32).copy()
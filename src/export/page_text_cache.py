@@ -0,0 +1,104 @@
+"""PDFから抽出したページテキストのディスクキャッシュ
+
+「テキストから検出」を押すたびに全ページを extract_text し直すと、
+大きな本では数十秒かかる。抽出結果を PDF の内容ハッシュごとに1ファイルへ
+保存し、2回目以降はそこから読む。
+
+ファイルの形式（リトルエンディアン）:
+
+    ヘッダ   magic "PTXT", 版数 (u16), ページ数 (u32)
+    索引     ページごとに (本文の位置 u64, 長さ u32)
+    本文     ページごとに zlib 圧縮した UTF-8
+
+索引があるので、1ページだけ読むときに他のページを展開しなくてよい。
+"""
+
+import struct
+import zlib
+from pathlib import Path
+
+from src.utils.cache_dir import size_budget, touch, user_cache_dir
+
+_MAGIC = b"PTXT"
+_VERSION = 1
+_HEADER = struct.Struct("<4sHI")
+_INDEX_ENTRY = struct.Struct("<QI")
+_SUFFIX = ".ptxt"
+
+# キャッシュ全体の上限。超えたら長く使っていない本から消す
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+
+class PageTextCache:
+    """内容ハッシュ → ページテキスト のディスクキャッシュ
+
+    壊れたファイルや形式違いのファイルは無いものとして扱う（次の put で
+    上書きされる）。
+    """
+
+    def __init__(self, directory: Path | None = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory if directory is not None else user_cache_dir("page_texts")
+        self.max_bytes = max_bytes
+        self._budget = size_budget(self.directory, f"*{_SUFFIX}")
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}{_SUFFIX}"
+
+    def put(self, key: str, texts: list[str]) -> None:
+        """ページテキストを保存し、上限を超えた分を古いものから消す"""
+        blobs = [zlib.compress(text.encode("utf-8")) for text in texts]
+        offset = _HEADER.size + _INDEX_ENTRY.size * len(blobs)
+        index = []
+        for blob in blobs:
+            index.append(_INDEX_ENTRY.pack(offset, len(blob)))
+            offset += len(blob)
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, _VERSION, len(blobs)))
+            f.write(b"".join(index))
+            f.write(b"".join(blobs))
+        self._budget.replace(tmp_path, path, self.max_bytes)
+
+    def get(self, key: str) -> list[str] | None:
+        """全ページのテキスト。無ければ None"""
+        try:
+            with open(self._path(key), "rb") as f:
+                index = self._read_index(f)
+                if index is None:
+                    return None
+                texts = []
+                for offset, length in index:
+                    f.seek(offset)
+                    texts.append(zlib.decompress(f.read(length)).decode("utf-8"))
+        except (OSError, zlib.error, UnicodeDecodeError, struct.error):
+            return None
+        touch(self._path(key))
+        return texts
+
+    def get_page(self, key: str, page_index: int) -> str | None:
+        """1ページ分のテキスト（0始まり）。無い・範囲外なら None"""
+        try:
+            with open(self._path(key), "rb") as f:
+                index = self._read_index(f)
+                if index is None or not 0 <= page_index < len(index):
+                    return None
+                offset, length = index[page_index]
+                f.seek(offset)
+                text = zlib.decompress(f.read(length)).decode("utf-8")
+        except (OSError, zlib.error, UnicodeDecodeError, struct.error):
+            return None
+        touch(self._path(key))
+        return text
+
+    @staticmethod
+    def _read_index(f) -> list[tuple[int, int]] | None:
+        magic, version, count = _HEADER.unpack(f.read(_HEADER.size))
+        if magic != _MAGIC or version != _VERSION:
+            return None
+        raw = f.read(_INDEX_ENTRY.size * count)
+        return [
+            _INDEX_ENTRY.unpack_from(raw, i * _INDEX_ENTRY.size) for i in range(count)
+        ]
@@ -0,0 +1,210 @@
+"""開いたPDFの共有（同じファイルを何度もパースしない）
+
+ページ数・しおり・ページごとのテキスト・描画用ドキュメント・ページ描画を、必要になった
+ときに1回だけ作って持っておく。PdfDocument.open は同じファイル（パス・
+更新日時・サイズが同じ）なら同じオブジェクトを返すので、分割ダイアログと
+目次解析ダイアログが別々に開いてもパースは1回で済む。
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from collections.abc import Iterator
+from pathlib import Path
+
+from pypdf import PdfReader
+
+from src.export.page_text_cache import PageTextCache
+from src.export.text_extract import iter_page_texts, page_text
+from src.utils.file_hash import file_sha256
+
+logger = logging.getLogger(__name__)
+
+# 開いたままにしておく文書の数。PdfReader はファイル全体をメモリに読むので少なめ
+_MAX_OPEN_DOCUMENTS = 2
+
+_cache: "OrderedDict[tuple, PdfDocument]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+class PdfDocument:
+    """1つのPDFファイルを開いた状態
+
+    pypdf の reader は複数スレッドから同時に使えないので、reader に触る処理は
+    lock を取ってから行う（このクラスのメソッドは自分で取る）。
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.lock = threading.RLock()
+        self._reader: PdfReader | None = None
+        self._page_texts: list[str] | None = None
+        self._content_hash: str | None = None
+        self._cg_document = None
+        self._renderer = None
+
+    @classmethod
+    def open(cls, path: Path) -> "PdfDocument":
+        """path の文書を返す。開いたことがあり、ファイルが変わっていなければ使い回す"""
+        path = Path(path)
+        stat = path.stat()
+        key = (str(path.resolve()), stat.st_mtime_ns, stat.st_size)
+        with _cache_lock:
+            document = _cache.get(key)
+            if document is not None:
+                _cache.move_to_end(key)
+                return document
+            document = cls(path)
+            _cache[key] = document
+            while len(_cache) > _MAX_OPEN_DOCUMENTS:
+                _cache.popitem(last=False)
+            return document
+
+    @property
+    def reader(self) -> PdfReader:
+        """pypdf の reader（最初に使うときにパースする）"""
+        with self.lock:
+            if self._reader is None:
+                self._reader = PdfReader(str(self.path))
+            return self._reader
+
+    @property
+    def page_count(self) -> int:
+        """ページ数"""
+        with self.lock:
+            return len(self.reader.pages)
+
+    def outline_chapters(self) -> list[tuple[str, int]]:
+        """しおりのトップレベル項目を (タイトル, 開始ページ 1-indexed) でページ順に返す"""
+        with self.lock:
+            reader = self.reader
+            outlines = reader.outline
+            if not outlines:
+                return []
+            chapters = []
+            for item in outlines:
+                # ネストされたブックマーク（リスト）はスキップ（トップレベルのみ）
+                if isinstance(item, list):
+                    continue
+                title = str(item.get("/Title", "")).strip()
+                if not title:
+                    continue
+                page_num = reader.get_destination_page_number(item)
+                chapters.append((title, page_num + 1))  # 1-indexed
+        chapters.sort(key=lambda c: c[1])
+        return chapters
+
+    @property
+    def content_hash(self) -> str:
+        """ファイル内容の SHA-256（ディスクキャッシュのキー）"""
+        with self.lock:
+            if self._content_hash is None:
+                self._content_hash = file_sha256(self.path)
+            return self._content_hash
+
+    def page_texts(
+        self, text_cache: PageTextCache | None = None, workers: int = 1
+    ) -> list[str]:
+        """各ページのテキスト（index 0 が p.1）。2回目以降は抽出し直さない
+
+        テキストを持たないページや抽出に失敗したページは空文字にする。
+        抽出結果はディスクにも保存し、同じ内容のPDFなら次に開いたときも使う。
+        workers が2以上なら、ページ範囲ごとにワーカープロセスで抽出する。
+        """
+        with self.lock:
+            if self._page_texts is None:
+                self._page_texts = list(self.iter_page_texts(text_cache, workers))
+            return self._page_texts
+
+    def iter_page_texts(
+        self, text_cache: PageTextCache | None = None, workers: int = 1
+    ) -> Iterator[str]:
+        """page_texts と同じ内容を、抽出できたページから順に返す
+
+        抽出済み（メモリかディスクにある）ならそれを返す。最後まで読み切ったときだけ
+        結果を覚え、ディスクにも保存する。
+        """
+        cache = text_cache
+        if cache is None:
+            try:
+                cache = PageTextCache()
+            except OSError:
+                # キャッシュ置き場を作れなくても、抽出はキャッシュなしでできる
+                logger.warning("ページテキストのキャッシュを使えません: %s", self.path)
+        with self.lock:
+            texts = self._page_texts
+            if texts is None and cache is not None:
+                texts = cache.get(self.content_hash)
+                self._page_texts = texts
+        if texts is not None:
+            yield from texts
+            return
+
+        texts = []
+        for text in self._extract_page_texts(workers):
+            texts.append(text)
+            yield text
+        with self.lock:
+            self._page_texts = texts
+        if cache is None:
+            return
+        try:
+            cache.put(self.content_hash, texts)
+        except OSError:
+            # 保存できなくても抽出結果はそのまま使える
+            logger.warning("ページテキストをキャッシュできませんでした: %s", self.path)
+
+    def page_text(self, index: int) -> str:
+        """1ページ分のテキスト（0始まり）。全ページ抽出済みならその結果を使う"""
+        with self.lock:
+            if self._page_texts is not None:
+                return self._page_texts[index]
+            return page_text(self.reader.pages[index])
+
+    def _extract_page_texts(self, workers: int = 1) -> Iterator[str]:
+        if workers <= 1:
+            # 開いてある reader をそのまま使う（他のスレッドと交互に使えるようページごとに lock）
+            return (self.page_text(i) for i in range(self.page_count))
+        return iter_page_texts(self.path, self.page_count, workers=workers)
+
+    def cg_document(self):
+        """描画用の Quartz CGPDFDocument（macOS のみ。最初に使うときに開く）"""
+        with self.lock:
+            if self._cg_document is None:
+                import Quartz
+                from CoreFoundation import (
+                    CFURLCreateWithFileSystemPath, kCFAllocatorDefault, kCFURLPOSIXPathStyle,
+                )
+
+                url = CFURLCreateWithFileSystemPath(
+                    kCFAllocatorDefault, str(self.path), kCFURLPOSIXPathStyle, False
+                )
+                document = Quartz.CGPDFDocumentCreateWithURL(url)
+                if document is None:
+                    raise RuntimeError(f"PDF を開けません: {self.path}")
+                self._cg_document = document
+            return self._cg_document
+
+    def renderer(self):
+        """この文書のページ描画（PageRenderer）。最初に使うときに作る
+
+        描画元は Quartz。描いたページは文書を開いている間覚えておき、
+        サムネイルの大きさのものは内容ハッシュをキーにディスクにも残す。
+        """
+        with self.lock:
+            if self._renderer is None:
+                from src.export.page_renderer import PageRenderer, QuartzRenderBackend
+                from src.export.thumbnail_cache import ThumbnailCache
+
+                try:
+                    disk_cache = ThumbnailCache()
+                except OSError:
+                    # キャッシュ置き場を作れなくても、描画はメモリ上のキャッシュだけでできる
+                    logger.warning("サムネイルのキャッシュを使えません: %s", self.path)
+                    disk_cache = None
+                self._renderer = PageRenderer(
+                    QuartzRenderBackend(self),
+                    disk_cache=disk_cache,
+                    source_hash=lambda: self.content_hash,
+                )
+            return self._renderer
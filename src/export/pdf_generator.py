@@ -1,17 +1,26 @@
 # src/export/pdf_generator.py
 """PDF生成機能"""
 
+import os
 from pathlib import Path
+from typing import Callable
 import img2pdf
 from PIL import Image
 from reportlab.pdfgen import canvas
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.cidfonts import UnicodeCIDFont
 
+from src.export.ocr_cache import OcrCache
+from src.export.ocr_engine import TextBox
+
 _CJK_FONT = "HeiseiKakuGo-W5"
 _font_registered = False
 
 
+class GenerationCancelled(Exception):
+    """PDF生成のキャンセル"""
+
+
 def _ensure_font():
     """日本語出力用CIDフォントを一度だけ登録"""
     global _font_registered
@@ -23,55 +32,119 @@ def _ensure_font():
 class PdfGenerator:
     """画像からPDFを生成するクラス"""
 
+    def __init__(self, ocr_cache: OcrCache | None = None, ocr_workers: int = 1):
+        # 同じ生成器で結合PDFと章別PDFを作るとき、OCR結果を使い回す
+        self.ocr_cache = ocr_cache if ocr_cache is not None else OcrCache()
+        # 2以上ならOCRをプロセスプールで並列に走らせる
+        self.ocr_workers = ocr_workers
+
     def generate(
         self,
         image_paths: list[Path],
         output_path: Path,
         ocr: bool = False,
         ocr_engine=None,
+        progress: Callable[[int, int], None] | None = None,
+        is_cancelled: Callable[[], bool] | None = None,
     ) -> None:
         """画像リストからPDFを生成。
 
         ocr=Trueのとき、各ページに見えないテキストレイヤーを重ねた
         検索可能PDFを生成する。ocr=Falseのときは従来通りの画像PDF。
+
+        progress(済んだページ数, 全ページ数) はページごとに呼ぶ。is_cancelled() が
+        真になったらページの区切りで GenerationCancelled を上げる。一時ファイルに
+        書いてから置き換えるので、途中で終わっても書きかけの PDF は残らない。
         """
         output_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = output_path.with_name(output_path.name + ".part")
+        pages = _PageProgress(len(image_paths), progress, is_cancelled)
+        try:
+            if not ocr:
+                # img2pdf は read_bytes() で1枚ずつ読むので、そこで進捗と中止を見る
+                data = img2pdf.convert([_ImageSource(p, pages) for p in image_paths])
+                with open(tmp_path, "wb") as f:
+                    f.write(data)
+            else:
+                if ocr_engine is None:
+                    from src.export.ocr_engine import VisionOcrEngine
+                    ocr_engine = VisionOcrEngine()
+                self._generate_with_ocr(image_paths, tmp_path, ocr_engine, pages)
+            os.replace(tmp_path, output_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
 
-        if not ocr:
-            paths_str = [str(p) for p in image_paths]
-            with open(output_path, "wb") as f:
-                f.write(img2pdf.convert(paths_str))
-            return
+    def _generate_with_ocr(self, image_paths, output_path, ocr_engine, pages) -> None:
+        c = canvas.Canvas(str(output_path))
+        # 認識はワーカーで先行させ、結果はページ順に受け取って描き込む
+        page_boxes = self.ocr_cache.recognize_many(
+            image_paths, ocr_engine, workers=self.ocr_workers
+        )
+        try:
+            for image_path, boxes in zip(image_paths, page_boxes):
+                pages.check()
+                draw_ocr_page(c, image_path, boxes)
+                pages.advance()
+        finally:
+            # 中止したらワーカーの残りの認識も捨てる
+            page_boxes.close()
+        c.save()
 
-        if ocr_engine is None:
-            from src.export.ocr_engine import VisionOcrEngine
-            ocr_engine = VisionOcrEngine()
 
-        self._generate_with_ocr(image_paths, output_path, ocr_engine)
+class _PageProgress:
+    """ページごとの進捗通知と中止の確認"""
 
-    def _generate_with_ocr(self, image_paths, output_path, ocr_engine) -> None:
-        _ensure_font()
-        c = canvas.Canvas(str(output_path))
-        for image_path in image_paths:
-            with Image.open(image_path) as im:
-                width, height = im.size
-            c.setPageSize((width, height))
-            c.drawImage(str(image_path), 0, 0, width=width, height=height)
-
-            for box in ocr_engine.recognize(image_path):
-                # Vision の boundingBox は正規化(0..1)・左下原点。reportlab の
-                # canvas も左下原点なので、Y反転なしで座標がそのまま対応する。
-                # テキストは不可視(render mode 3)で描画するため、正確な
-                # ベースライン位置はテキスト選択時のハイライト形状に影響する
-                # だけで、抽出されるテキスト自体には影響しない。
-                x = box.x * width
-                y = box.y * height
-                font_size = max(box.h * height, 1.0)
-                text_obj = c.beginText(x, y)
-                text_obj.setFont(_CJK_FONT, font_size)
-                text_obj.setTextRenderMode(3)  # 不可視(見た目は画像のまま)
-                text_obj.textOut(box.text)
-                c.drawText(text_obj)
-
-            c.showPage()
-        c.save()
+    def __init__(self, total: int, progress, is_cancelled):
+        self.total = total
+        self.done = 0
+        self._progress = progress
+        self._is_cancelled = is_cancelled
+
+    def check(self) -> None:
+        if self._is_cancelled is not None and self._is_cancelled():
+            raise GenerationCancelled()
+
+    def advance(self) -> None:
+        self.done += 1
+        if self._progress is not None:
+            self._progress(self.done, self.total)
+
+
+class _ImageSource:
+    """img2pdf に渡す画像。読まれたら1ページ進んだことにする"""
+
+    def __init__(self, path: Path, pages: _PageProgress):
+        self.path = path
+        self._pages = pages
+
+    def read_bytes(self) -> bytes:
+        self._pages.check()
+        data = self.path.read_bytes()
+        self._pages.advance()
+        return data
+
+
+def draw_ocr_page(c: canvas.Canvas, image_path: Path, boxes: list[TextBox]) -> None:
+    """画像1枚を1ページとして描き、認識テキストを不可視で重ねる"""
+    _ensure_font()
+    with Image.open(image_path) as im:
+        width, height = im.size
+    c.setPageSize((width, height))
+    c.drawImage(str(image_path), 0, 0, width=width, height=height)
+
+    for box in boxes:
+        # Vision の boundingBox は正規化(0..1)・左下原点。reportlab の
+        # canvas も左下原点なので、Y反転なしで座標がそのまま対応する。
+        # テキストは不可視(render mode 3)で描画するため、正確な
+        # ベースライン位置はテキスト選択時のハイライト形状に影響する
+        # だけで、抽出されるテキスト自体には影響しない。
+        x = box.x * width
+        y = box.y * height
+        font_size = max(box.h * height, 1.0)
+        text_obj = c.beginText(x, y)
+        text_obj.setFont(_CJK_FONT, font_size)
+        text_obj.setTextRenderMode(3)  # 不可視(見た目は画像のまま)
+        text_obj.textOut(box.text)
+        c.drawText(text_obj)
+
+    c.showPage()
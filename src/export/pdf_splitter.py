@@ -1,18 +1,23 @@
 # src/export/pdf_splitter.py
 """既存PDFの読み込み・サムネイルレンダリング・章分割"""
 
+from collections.abc import Callable, Iterator
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Literal
 
-from pypdf import PdfReader, PdfWriter
 from PyQt6.QtGui import QImage, QPixmap
 
-import Quartz
-from CoreFoundation import CFURLCreateWithFileSystemPath, kCFAllocatorDefault, kCFURLPOSIXPathStyle
-
+from src.export.chapter_writer import (
+    MIN_PARALLEL_PAGES, SplitCancelled, commit_parts, discard_parts, write_chapter_part,
+    write_chapters_parallel,
+)
 from src.export.file_manager import FileManager
-from src.export.toc_detector import detect_chapters_from_text, has_text_layer
+from src.export.pdf_document import PdfDocument
+from src.export.toc_detector import (
+    StreamingChapterDetector, detect_chapters_from_text, probe_text_layer,
+)
+from src.utils.workers import default_workers
 
 # OCR向け後処理のコントラスト強調係数。淡色の目次を確実に読ませるための調整ノブ。
 _OCR_CONTRAST_FACTOR = 4.0
@@ -39,18 +44,25 @@ class DetectionResult:
     chapters: (章名, 開始ページ 1-indexed) のリスト
     source: "bookmark"=しおり / "heading"=本文見出し / "toc"=目次の印字ページ / "none"=検出なし
     has_text_layer: PDF がテキスト層を持つか（False はスキャン PDF の可能性）
+    provisional: 途中までのページから求めた暫定の結果か
     """
 
     chapters: list[tuple[str, int]]
     source: Literal["bookmark", "heading", "toc", "none"]
     has_text_layer: bool
+    provisional: bool = False
 
 
 class PdfSplitter:
-    """既存PDFの読み込み・分割を行うクラス"""
+    """既存PDFの読み込み・分割を行うクラス
+
+    ファイルのパースは PdfDocument に任せ、同じPDFへの呼び出しでは使い回す。
+    """
 
-    def __init__(self):
+    def __init__(self, text_workers: int | None = None):
         self.file_manager = FileManager()
+        # ページテキスト抽出に使うワーカープロセス数（1なら並列化しない）
+        self.text_workers = text_workers if text_workers is not None else default_workers()
 
     def detect_bookmark_chapters(self, pdf_path: Path) -> list[tuple[str, int]]:
         """PDFのブックマーク（アウトライン）から章情報を取得
@@ -59,39 +71,19 @@ class PdfSplitter:
             (章名, 開始ページ番号(1-indexed)) のリスト。ページ番号順。
             検出できない場合は空リスト。
         """
-        reader = PdfReader(str(pdf_path))
-        outlines = reader.outline
-        if not outlines:
-            return []
-
-        chapters = []
-        for item in outlines:
-            # ネストされたブックマーク（リスト）はスキップ（トップレベルのみ）
-            if isinstance(item, list):
-                continue
-            title = str(item.get("/Title", "")).strip()
-            if not title:
-                continue
-            page_num = reader.get_destination_page_number(item)
-            chapters.append((title, page_num + 1))  # 1-indexed
-
-        chapters.sort(key=lambda c: c[1])
-        return chapters
+        return PdfDocument.open(pdf_path).outline_chapters()
 
     def extract_page_texts(self, pdf_path: Path) -> list[str]:
         """各ページのテキストを取得（index 0 が p.1）
 
         テキストを持たないページや抽出に失敗したページは空文字にする。
         """
-        reader = PdfReader(str(pdf_path))
-        texts = []
-        for page in reader.pages:
-            try:
-                text = page.extract_text() or ""
-            except Exception:
-                text = ""
-            texts.append(text)
-        return texts
+        document = PdfDocument.open(pdf_path)
+        return list(document.page_texts(workers=self.text_workers))
+
+    def extract_page_text(self, pdf_path: Path, page_index: int) -> str:
+        """1ページ分のテキストを取得（page_index は0始まり）"""
+        return PdfDocument.open(pdf_path).page_text(page_index)
 
     def detect_chapters_auto(self, pdf_path: Path) -> DetectionResult:
         """claude を使わずに章を検出する（ブックマーク優先、無ければ本文テキスト）"""
@@ -99,66 +91,72 @@ class PdfSplitter:
         if bookmarks:
             return DetectionResult(bookmarks, "bookmark", True)
 
-        page_texts = self.extract_page_texts(pdf_path)
-        if not has_text_layer(page_texts):
+        # スキャン PDF は数ページ覗くだけで判定し、全ページの抽出はしない
+        page_count = self.get_page_count(pdf_path)
+        if not probe_text_layer(page_count, lambda i: self.extract_page_text(pdf_path, i)):
             return DetectionResult([], "none", False)
 
+        page_texts = self.extract_page_texts(pdf_path)
+
         text_result = detect_chapters_from_text(page_texts)
         return DetectionResult(text_result.chapters, text_result.source, True)
 
+    def iter_chapters_auto(
+        self, pdf_path: Path, on_page: Callable[[int, int], None] | None = None
+    ) -> Iterator[DetectionResult]:
+        """detect_chapters_auto の逐次版。本文テキストを抽出しながら章を検出する
+
+        暫定の章が変わるたびに provisional=True の結果を返し、最後に確定した
+        結果を1つ返す。on_page(読んだページ数, 総ページ数) で進み具合を知らせる。
+        on_page が例外を上げたら（キャンセルなど）、テキスト抽出も止めてそのまま上げる。
+        """
+        bookmarks = self.detect_bookmark_chapters(pdf_path)
+        if bookmarks:
+            yield DetectionResult(bookmarks, "bookmark", True)
+            return
+
+        page_count = self.get_page_count(pdf_path)
+        if not probe_text_layer(page_count, lambda i: self.extract_page_text(pdf_path, i)):
+            yield DetectionResult([], "none", False)
+            return
+
+        detector = StreamingChapterDetector(page_count)
+        texts = self.iter_page_texts(pdf_path)
+        try:
+            for text in texts:
+                if detector.feed(text):
+                    partial = detector.result()
+                    yield DetectionResult(partial.chapters, partial.source, True, provisional=True)
+                if on_page:
+                    on_page(detector.pages_seen, page_count)
+        finally:
+            # 途中でやめたときは抽出（プロセスプール）も止める
+            close = getattr(texts, "close", None)
+            if close is not None:
+                close()
+        text_result = detector.result()
+        yield DetectionResult(text_result.chapters, text_result.source, True)
+
+    def iter_page_texts(self, pdf_path: Path) -> Iterator[str]:
+        """extract_page_texts と同じ内容を、抽出できたページから順に返す"""
+        document = PdfDocument.open(pdf_path)
+        return document.iter_page_texts(workers=self.text_workers)
+
     def get_page_count(self, pdf_path: Path) -> int:
         """PDFのページ数を取得"""
-        reader = PdfReader(str(pdf_path))
-        return len(reader.pages)
+        return PdfDocument.open(pdf_path).page_count
 
     def render_page_thumbnail(self, pdf_path: Path, page_index: int, max_height: int = 140) -> QPixmap:
-        """PDFページをサムネイル画像としてレンダリング（macOS Quartz使用）"""
-        url = CFURLCreateWithFileSystemPath(
-            kCFAllocatorDefault, str(pdf_path), kCFURLPOSIXPathStyle, False
-        )
-        pdf_doc = Quartz.CGPDFDocumentCreateWithURL(url)
-        if pdf_doc is None:
-            raise RuntimeError(f"PDFを読み込めませんでした: {pdf_path}")
-        # CGPDFDocument のページ番号は 1-indexed
-        page = Quartz.CGPDFDocumentGetPage(pdf_doc, page_index + 1)
-        if page is None:
-            raise RuntimeError(f"PDFページを読み込めませんでした (page {page_index + 1})")
-
-        page_rect = Quartz.CGPDFPageGetBoxRect(page, Quartz.kCGPDFMediaBox)
-        page_width = page_rect.size.width
-        page_height = page_rect.size.height
-
-        # max_height に収まるようスケーリング
-        scale = max_height / page_height
-        render_width = int(page_width * scale)
-        render_height = int(page_height * scale)
-
-        # ビットマップコンテキストを作成
-        color_space = Quartz.CGColorSpaceCreateDeviceRGB()
-        context = Quartz.CGBitmapContextCreate(
-            None, render_width, render_height, 8, render_width * 4,
-            color_space, Quartz.kCGImageAlphaPremultipliedFirst
-        )
-
-        # 背景を白に
-        Quartz.CGContextSetRGBFillColor(context, 1.0, 1.0, 1.0, 1.0)
-        Quartz.CGContextFillRect(context, Quartz.CGRectMake(0, 0, render_width, render_height))
-
-        # PDFページを描画
-        Quartz.CGContextScaleCTM(context, scale, scale)
-        Quartz.CGContextDrawPDFPage(context, page)
-
-        # CGImage → QPixmap
-        cg_image = Quartz.CGBitmapContextCreateImage(context)
-        width = Quartz.CGImageGetWidth(cg_image)
-        height = Quartz.CGImageGetHeight(cg_image)
-        bytes_per_row = Quartz.CGImageGetBytesPerRow(cg_image)
-        data_provider = Quartz.CGImageGetDataProvider(cg_image)
-        data = Quartz.CGDataProviderCopyData(data_provider)
-
-        qimage = QImage(data, width, height, bytes_per_row, QImage.Format.Format_ARGB32_Premultiplied)
-        pixmap = QPixmap.fromImage(qimage.copy())
-        return pixmap
+        """PDFページをサムネイル画像としてレンダリング（macOS Quartz使用）
+
+        描いたページは文書ごとの PageRenderer が覚えているので、同じページ・
+        大きさなら描き直さない。QPixmap を作るので GUI スレッドから呼ぶこと。
+        """
+        return QPixmap.fromImage(self.render_page(pdf_path, page_index, max_height=max_height))
+
+    def render_page(self, pdf_path: Path, page_index: int, max_height: int = 140) -> QImage:
+        """PDFページを高さ max_height に収めて描く（どのスレッドからでも呼べる）"""
+        return PdfDocument.open(pdf_path).renderer().render(page_index, max_height=max_height)
 
     def render_page_image(
         self, pdf_path: Path, page_index: int, output_path: Path, max_height: int = 2000
@@ -169,37 +167,71 @@ class PdfSplitter:
         claude が確実に読めるよう、グレースケール化してコントラストを
         強調してから保存する。
         """
-        pixmap = self.render_page_thumbnail(pdf_path, page_index, max_height=max_height)
-        if not pixmap.save(str(output_path), "PNG"):
+        image = self.render_page(pdf_path, page_index, max_height=max_height)
+        if not image.save(str(output_path), "PNG"):
             raise RuntimeError(f"PDFページ画像の保存に失敗しました: {output_path}")
         # OCR向けの後処理: グレースケール + コントラスト強調
         _enhance_for_ocr(output_path)
         return output_path
 
-    def split(self, pdf_path: Path, chapters: list, output_dir: Path) -> list[Path]:
+    def split(
+        self,
+        pdf_path: Path,
+        chapters: list,
+        output_dir: Path,
+        progress: Callable[[int, int], None] | None = None,
+        is_cancelled: Callable[[], bool] | None = None,
+        workers: int = 1,
+        commit: bool = True,
+    ) -> list[Path]:
         """PDFを章ごとに分割して保存
 
+        各章は一時ファイル（.part）に書き、全章を書き終えてから出力先に置き換える。
+        中止や失敗のときは一時ファイルだけを消すので、同じ名前の前回の出力は残る。
+        workers が2以上で章が複数あり、MIN_PARALLEL_PAGES ページ以上を書くときは、
+        章をワーカープロセスで並列に書く。
+
         Args:
             pdf_path: 元PDFのパス
             chapters: Chapter オブジェクトのリスト（start, end, name属性を持つ）
             output_dir: 出力ディレクトリ
+            progress: 章を書き終えるたびに (書いたページ数, 全ページ数) で呼ぶ
+            is_cancelled: 真を返したらページの区切りで SplitCancelled を上げる
+                （並列に書くときは章の区切り）
+            workers: 章を並列に書くプロセス数
+            commit: 偽なら全章を一時ファイルのまま残す（呼び出し側が
+                ほかの出力と一緒に commit_parts で置き換える）
 
         Returns:
             生成されたPDFファイルパスのリスト
         """
-        reader = PdfReader(str(pdf_path))
-        output_paths = []
-
-        for i, chapter in enumerate(chapters):
-            writer = PdfWriter()
-            for page_idx in range(chapter.start, chapter.end + 1):
-                writer.add_page(reader.pages[page_idx])
-
-            pdf_out = self.file_manager.get_chapter_pdf_path(
-                output_dir, i + 1, chapter.name
+        jobs = [
+            (chapter.start, chapter.end,
+             self.file_manager.get_chapter_pdf_path(output_dir, i + 1, chapter.name))
+            for i, chapter in enumerate(chapters)
+        ]
+        total = sum(end - start + 1 for start, end, _ in jobs)
+        if workers >= 2 and len(jobs) >= 2 and total >= MIN_PARALLEL_PAGES:
+            return write_chapters_parallel(
+                pdf_path, jobs, workers,
+                progress=progress, is_cancelled=is_cancelled, commit=commit,
             )
-            with open(pdf_out, "wb") as f:
-                writer.write(f)
-            output_paths.append(pdf_out)
+
+        document = PdfDocument.open(pdf_path)
+        output_paths = [pdf_out for _, _, pdf_out in jobs]
+        done = 0
+        try:
+            # 書き出しは元の reader からページを読むので、終わるまで lock を持つ
+            with document.lock:
+                for start, end, pdf_out in jobs:
+                    write_chapter_part(document.reader, start, end, pdf_out, is_cancelled)
+                    done += end - start + 1
+                    if progress is not None:
+                        progress(done, total)
+            if commit:
+                commit_parts(output_paths)
+        except BaseException:
+            discard_parts(output_paths)
+            raise
 
         return output_paths
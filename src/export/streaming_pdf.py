@@ -0,0 +1,115 @@
+"""撮影と並行してPDFを作る（撮影完了から出力までの待ちをなくす）
+
+保存済みのページ画像を受け取るたびに、背景スレッドでOCRして1ページ分の
+PDF（images/pdf_pages/page_NNN.pdf）を書く。撮影が終わったら、それらを
+再エンコードせずにページのコピーだけでつなげる。ページ単位のファイルに
+しておくので、末尾の重複ページを捨てたり、中断から再開したりしても
+作り直すのは足りないページだけで済む。
+"""
+
+import logging
+import os
+import queue
+import threading
+from pathlib import Path
+
+from pypdf import PdfReader, PdfWriter
+from reportlab.pdfgen import canvas
+
+from src.export.ocr_cache import OcrCache
+from src.export.pdf_generator import draw_ocr_page
+
+logger = logging.getLogger(__name__)
+
+
+class StreamingPdfWriter:
+    """ページ画像を届いた順に1ページずつPDFにしていく
+
+    add_page は撮影側（ImageWriter のスレッド）から呼ばれ、すぐ戻る。
+    OCRと描画はこのクラスのスレッドが受け持つ。
+    """
+
+    def __init__(self, pages_dir: Path, ocr_cache: OcrCache | None = None, ocr_engine=None):
+        self.pages_dir = pages_dir
+        self.ocr_cache = ocr_cache if ocr_cache is not None else OcrCache()
+        self.ocr_engine = ocr_engine
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """描画スレッドを開始する"""
+        if self._thread is not None:
+            return
+        self._ensure_engine()
+        self._thread = threading.Thread(
+            target=self._run, name="StreamingPdfWriter", daemon=True
+        )
+        self._thread.start()
+
+    def add_page(self, image_path: Path) -> None:
+        """保存済みのページ画像を受け取る"""
+        if self._thread is None:
+            self.start()
+        self._queue.put(image_path)
+
+    def page_path(self, image_path: Path) -> Path:
+        """ページ画像に対応する1ページPDFのパス"""
+        return self.pages_dir / f"{image_path.stem}.pdf"
+
+    def finish(self, image_paths: list[Path], output_path: Path) -> Path:
+        """受け取り済みのページを描き終えてから、image_paths の順につなげる
+
+        描けていないページ（途中で失敗した・再開前に撮った）はここで描く。
+        書き込み途中で落ちても壊れたPDFを残さないよう、一時ファイルに
+        書いてから置き換える。
+        """
+        self.close()
+        self._ensure_engine()
+        writer = PdfWriter()
+        for image_path in image_paths:
+            page_path = self.page_path(image_path)
+            if not page_path.exists():
+                self._write_page(image_path)
+            for page in PdfReader(str(page_path)).pages:
+                writer.add_page(page)
+
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = output_path.with_name(output_path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            writer.write(f)
+        os.replace(tmp_path, output_path)
+        self.ocr_cache.save()
+        return output_path
+
+    def close(self) -> None:
+        """受け取り済みのページを描き終えるまで待ってスレッドを止める"""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def _ensure_engine(self) -> None:
+        if self.ocr_engine is None:
+            from src.export.ocr_engine import VisionOcrEngine
+            self.ocr_engine = VisionOcrEngine()
+
+    def _run(self) -> None:
+        while True:
+            image_path = self._queue.get()
+            if image_path is None:
+                return
+            try:
+                self._write_page(image_path)
+            except Exception:
+                # 撮影は止めない。finish で描き直す
+                logger.exception("ページのPDF化に失敗: %s", image_path)
+
+    def _write_page(self, image_path: Path) -> None:
+        boxes = self.ocr_cache.recognize(image_path, self.ocr_engine)
+        page_path = self.page_path(image_path)
+        page_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = page_path.with_name(page_path.name + ".tmp")
+        c = canvas.Canvas(str(tmp_path))
+        draw_ocr_page(c, image_path, boxes)
+        c.save()
+        os.replace(tmp_path, page_path)
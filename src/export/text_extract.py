@@ -0,0 +1,83 @@
+"""PDFのページテキスト抽出（プロセスプールでの並列化つき）
+
+pypdf の extract_text は純 Python の CPU 処理なので、スレッドでは1コアしか
+使えない。ページ範囲ごとにワーカープロセスへ振り分け、結果をページ順に
+並べ直す。ワーカーはそれぞれ自分で PDF を開く（reader はプロセス間で
+受け渡せない）。
+
+ワーカーが読み込むので、このモジュールは Qt や Quartz を import しない。
+"""
+
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from pypdf import PdfReader
+
+# 1回の仕事で抽出するページ数。小さいほどワーカー間の偏りが減る
+DEFAULT_CHUNK_SIZE = 32
+
+# ワーカープロセスごとに1回だけ開いた reader
+_worker_reader: PdfReader | None = None
+
+
+def page_text(page) -> str:
+    """1ページのテキスト。テキストが無い・抽出に失敗したときは空文字"""
+    try:
+        return page.extract_text() or ""
+    except Exception:
+        return ""
+
+
+def _open_worker_reader(pdf_path: str) -> None:
+    global _worker_reader
+    _worker_reader = PdfReader(pdf_path)
+
+
+def _extract_chunk(start: int, stop: int) -> list[str]:
+    return [page_text(_worker_reader.pages[i]) for i in range(start, stop)]
+
+
+def iter_page_texts(
+    pdf_path: Path,
+    page_count: int,
+    workers: int = 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[str]:
+    """全ページのテキストを、抽出できたところからページ順に返す
+
+    workers が2以上で、ページ数が1チャンクを超えるときだけプロセスプールを使う
+    （小さなPDFではプロセス起動の方が高くつく）。途中でやめたときは、
+    まだ始まっていないチャンクを取り消す。
+    """
+    if workers <= 1 or page_count <= chunk_size:
+        reader = PdfReader(str(pdf_path))
+        for page in reader.pages:
+            yield page_text(page)
+        return
+
+    chunks = [
+        (start, min(start + chunk_size, page_count))
+        for start in range(0, page_count, chunk_size)
+    ]
+    pool = ProcessPoolExecutor(
+        max_workers=min(workers, len(chunks)),
+        initializer=_open_worker_reader,
+        initargs=(str(pdf_path),),
+    )
+    try:
+        futures = [pool.submit(_extract_chunk, start, stop) for start, stop in chunks]
+        for future in futures:
+            yield from future.result()
+    finally:
+        pool.shutdown(cancel_futures=True)
+
+
+def extract_page_texts(
+    pdf_path: Path,
+    page_count: int,
+    workers: int = 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> list[str]:
+    """全ページのテキストをページ順に返す（index 0 が p.1）"""
+    return list(iter_page_texts(pdf_path, page_count, workers=workers, chunk_size=chunk_size))
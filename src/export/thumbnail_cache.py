@@ -0,0 +1,130 @@
+"""サムネイルのディスクキャッシュ
+
+同じ撮影フォルダやPDFを開き直すたびに、全ページを読み込んで縮小し直すと
+数百ページの本では表示まで待たされる。縮小済みの画像を元ファイルの内容
+ハッシュ・ページ・大きさごとに PNG で保存し、次からはそれを読む。
+
+撮影画像（Retina だと 3000x4000 にもなる）は全画素を展開せず、読み込み時に
+縮小する（QImageReader.setScaledSize。JPEG なら展開そのものが縮小される）。
+撮影中は ImageWriter が手元の画像から put_image_thumbnail で作り、PNG の隣に
+内容ハッシュの控えも置く（write_digest）。章分割ダイアログでは控えからハッシュを
+引くので、元の PNG を読まずにサムネイルを出せる。
+"""
+
+import logging
+from pathlib import Path
+from typing import Callable
+
+from PIL import Image
+from PyQt6.QtCore import QSize, Qt
+from PyQt6.QtGui import QImage, QImageReader
+
+from src.utils.cache_dir import size_budget, touch, user_cache_dir
+from src.utils.file_hash import cached_file_sha256
+
+logger = logging.getLogger(__name__)
+
+_SUFFIX = ".png"
+
+# キャッシュ全体の上限。超えたら長く使っていないサムネイルから消す
+DEFAULT_MAX_BYTES = 100 * 1024 * 1024
+# ディスクに残すのはこの大きさまで（OCR 用の大きな描画は残さない）
+MAX_CACHED_SIDE = 480
+
+
+def thumbnail_size(width: int, height: int, max_width: int, max_height: int) -> tuple[int, int]:
+    """縦横比を保って max_width × max_height に収まる大きさ（QImage.scaled と同じ丸め）"""
+    size = QSize(width, height).scaled(max_width, max_height, Qt.AspectRatioMode.KeepAspectRatio)
+    return max(1, size.width()), max(1, size.height())
+
+
+class ThumbnailCache:
+    """(内容ハッシュ, ページ, 大きさ) → 縮小画像 のディスクキャッシュ
+
+    大きさは要求した枠（幅×高さ）で、実際の画像は縦横比を保ってその内側に収まる。
+    読めないファイルは無いものとして扱う（次の put で上書きされる）。
+    """
+
+    def __init__(self, directory: Path | None = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory if directory is not None else user_cache_dir("thumbnails")
+        self.max_bytes = max_bytes
+        self._budget = size_budget(self.directory, f"*{_SUFFIX}")
+
+    def _path(self, source_hash: str, page: int, width: int, height: int) -> Path:
+        return self.directory / f"{source_hash}-{page}-{width}x{height}{_SUFFIX}"
+
+    def get(self, source_hash: str, page: int, width: int, height: int) -> QImage | None:
+        """保存したサムネイル。無ければ None"""
+        path = self._path(source_hash, page, width, height)
+        if not path.exists():
+            return None
+        image = QImage(str(path))
+        if image.isNull():
+            return None
+        touch(path)
+        return image
+
+    def put(self, source_hash: str, page: int, width: int, height: int, image: QImage) -> None:
+        """サムネイルを保存し、上限を超えた分を古いものから消す"""
+
+        def save(tmp_path: Path) -> None:
+            if not image.save(str(tmp_path), "PNG"):
+                raise OSError(f"サムネイルを保存できません: {tmp_path}")
+
+        self._store(self._path(source_hash, page, width, height), save)
+
+    def put_image_thumbnail(
+        self, source_hash: str, image: Image.Image, width: int, height: int
+    ) -> None:
+        """展開済みの画像（Pillow）を縮小して、image_thumbnail が読む場所に保存する
+
+        撮影した画像ファイルの内容ハッシュを source_hash に渡す。縮小と保存は
+        Pillow で行うので、書き出しスレッドから呼んでよい。
+        """
+        size = thumbnail_size(image.width, image.height, width, height)
+        # reducing_gap: 先に整数分の1へ縮めてから仕上げるので、大きな画像でも速い
+        thumbnail = image.resize(size, Image.Resampling.LANCZOS, reducing_gap=3.0)
+        self._store(
+            self._path(source_hash, 0, width, height),
+            lambda tmp_path: thumbnail.save(tmp_path, "PNG"),
+        )
+
+    def _store(self, path: Path, save: Callable[[Path], None]) -> None:
+        """一時ファイルに書いてから置き換える（読みかけの壊れた PNG を残さない）"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        save(tmp_path)
+        self._budget.replace(tmp_path, path, self.max_bytes)
+
+    def image_thumbnail(self, image_path: Path, width: int, height: int) -> QImage:
+        """画像ファイルを width × height に収まるよう縮小したもの（保存済みなら読むだけ）
+
+        内容ハッシュは控えか前に求めた値を使い、ファイルが変わったときだけ読み直す。
+        """
+        source_hash = cached_file_sha256(image_path)
+        cached = self.get(source_hash, 0, width, height)
+        if cached is not None:
+            return cached
+        thumbnail = read_scaled(image_path, width, height)
+        if thumbnail.isNull():
+            return thumbnail
+        try:
+            self.put(source_hash, 0, width, height, thumbnail)
+        except OSError:
+            # 保存できなくても縮小した画像はそのまま使える
+            logger.warning("サムネイルをキャッシュできませんでした: %s", image_path)
+        return thumbnail
+
+
+def read_scaled(image_path: Path, max_width: int, max_height: int) -> QImage:
+    """画像ファイルを max_width × max_height に収まる大きさで読む（読めなければ null）
+
+    元の大きさは先頭のヘッダだけで分かるので、縮小後の大きさを決めてから読む。
+    """
+    reader = QImageReader(str(image_path))
+    size = reader.size()
+    if size.isValid():
+        reader.setScaledSize(
+            QSize(*thumbnail_size(size.width(), size.height(), max_width, max_height))
+        )
+    return reader.read()
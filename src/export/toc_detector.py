@@ -7,13 +7,22 @@
 
 import re
 import unicodedata
-from dataclasses import dataclass
-from typing import Literal
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Iterator, Literal
 
 # 見出しとみなす行の最大長（本文の文章を弾くため）
 MAX_HEADING_LEN = 40
 # 目次ページを探す範囲（先頭からのページ数）
 _TOC_SEARCH_PAGES = 30
+# テキスト層ありとみなす文字数（空白を除く）
+TEXT_LAYER_MIN_CHARS = 100
+# テキスト層の有無を調べるときに見るページ数（全体から等間隔に選ぶ）
+TEXT_PROBE_SAMPLES = 24
+# 章番号を持つ行がこのページ数以上に出てきたら、本全体のつめ見出しかどうかを調べる
+RUNNING_LINE_MIN_PAGES = 10
+# 出てくる範囲の中で、これだけの数の他の章が始まっていたら本全体のつめ見出しとみなす
+# （章ごとの柱は次の章が始まる前に終わるので、どれだけ長い章でも数えられない）
+RUNNING_LINE_MIN_CROSSINGS = 2
 
 _JP_CHAPTER_RE = re.compile(r"^第\s*([0-9]+|[一二三四五六七八九十]+)\s*章")
 _EN_CHAPTER_RE = re.compile(r"^chapter\s+([0-9]+)\b", re.IGNORECASE)
@@ -39,7 +48,34 @@ class TextDetectionResult:
 def has_text_layer(page_texts: list[str]) -> bool:
     """テキスト層を持つ PDF かどうか（スキャン画像のみの PDF を除外する）"""
     total = sum(len("".join(text.split())) for text in page_texts)
-    return total >= 100
+    return total >= TEXT_LAYER_MIN_CHARS
+
+
+def sample_page_indices(page_count: int, samples: int = TEXT_PROBE_SAMPLES) -> list[int]:
+    """0..page_count-1 から、先頭と末尾を含めて等間隔に最大 samples 個選ぶ"""
+    if page_count <= samples:
+        return list(range(page_count))
+    step = (page_count - 1) / (samples - 1)
+    return sorted({round(k * step) for k in range(samples)})
+
+
+def probe_text_layer(
+    page_count: int,
+    get_page_text: Callable[[int], str],
+    samples: int = TEXT_PROBE_SAMPLES,
+) -> bool:
+    """全ページを抽出せずにテキスト層の有無を判定する
+
+    全体から等間隔に選んだページだけを順に読み、文字数が
+    TEXT_LAYER_MIN_CHARS に届いた時点でやめる。スキャン PDF は
+    samples ページ読んだだけで False になる。
+    """
+    total = 0
+    for index in sample_page_indices(page_count, samples):
+        total += len("".join(get_page_text(index).split()))
+        if total >= TEXT_LAYER_MIN_CHARS:
+            return True
+    return False
 
 
 def _normalize(text: str) -> str:
@@ -96,47 +132,6 @@ def _parse_toc_entries(text: str) -> list[tuple[str, int]]:
     return entries
 
 
-def _find_toc_pages(page_texts: list[str]) -> set[int]:
-    """目次ページのインデックス集合を返す
-
-    起点はページ先頭付近に「目次」等の短い見出し行を持つページ。
-    そこから連続してエントリ行を2行以上持つページも目次の続きとみなす。
-    """
-    toc_pages: set[int] = set()
-    for index in range(min(len(page_texts), _TOC_SEARCH_PAGES)):
-        text = page_texts[index]
-        if index in toc_pages or not _looks_like_toc_page(text):
-            continue
-        toc_pages.add(index)
-        # 続きのページ: エントリ行が2行以上あれば継続。
-        # 最終ページはエントリ1行だけのこともあるので、その1ページ分も取り込む。
-        follower = index + 1
-        while follower < len(page_texts):
-            entries = len(_parse_toc_entries(page_texts[follower]))
-            if entries >= 2:
-                toc_pages.add(follower)
-                follower += 1
-                continue
-            if entries == 1 and follower - 1 in toc_pages and follower - 1 != index:
-                toc_pages.add(follower)
-            break
-    return toc_pages
-
-
-def _parse_toc(
-    page_texts: list[str], toc_pages: set[int]
-) -> dict[int, tuple[str, int]]:
-    """目次の章エントリを {章番号: (タイトル, 印字ページ)} で返す"""
-    entries: dict[int, tuple[str, int]] = {}
-    for index in sorted(toc_pages):
-        for title, printed in _parse_toc_entries(page_texts[index]):
-            number = _chapter_number(title)
-            if number is None or number in entries:
-                continue
-            entries[number] = (title, printed)
-    return entries
-
-
 def _looks_like_toc_page(text: str) -> bool:
     """目次ページかどうか（ページ先頭付近に目次見出しがあるか）"""
     lines = [line.strip() for line in _normalize(text).splitlines() if line.strip()]
@@ -148,50 +143,311 @@ def _looks_like_toc_page(text: str) -> bool:
     return False
 
 
-def _scan_body_headings(page_texts: list[str], skip: set[int]) -> dict[int, tuple[int, str]]:
-    """本文から章見出しを検出し {章番号: (物理ページ, 見出し行)} を返す
+@dataclass
+class _LineSpan:
+    """章番号を持つ行が出てきた範囲（つめ見出しの判定用）"""
+
+    number: int
+    first_page: int
+    last_page: int
+    pages: int = 1
+    # 範囲の中（初出より後）で始まった、他の章番号
+    crossed: set[int] = field(default_factory=set)
+    # 初出と同じページで始まった、他の章番号の行
+    peers: list[str] = field(default_factory=list)
+    # 見出し候補 _candidates のうち、crossed に数え終えた数
+    scanned: int = 0
+
 
-    各章番号について最初に出現したページを採用する（柱＝実行ヘッダは
-    章の初出ページから始まるため、初出採用で正しい結果になる）。
+class StreamingChapterDetector:
+    """ページテキストを先頭から1ページずつ受け取り、章の候補を更新していく
+
+    目次ページ・本文見出しの判定はそのページまでの内容だけで決まるので、
+    抽出が終わったページから順に feed すれば、途中でも暫定の結果を出せる。
+    全ページ feed したあとの result() は detect_chapters_from_text と同じ。
+
+    page_count を渡すと、目次の印字ページが範囲内かをその総ページ数で判定する
+    （渡さなければ受け取り済みのページ数で判定する）。
     """
-    headings: dict[int, tuple[int, str]] = {}
-    for index, text in enumerate(page_texts):
-        if index in skip:
-            continue
+
+    def __init__(self, page_count: int | None = None):
+        self.page_count = page_count
+        self.pages_seen = 0
+        self._toc_pages: set[int] = set()
+        # 続きのページを探している目次の起点ページ
+        self._toc_start: int | None = None
+        # {章番号: (タイトル, 印字ページ)}
+        self._toc_entries: dict[int, tuple[str, int]] = {}
+        # 本文見出し (物理ページ, 章番号, 見出し行)。章番号ごとの初出だけ。見つけた順＝ページ順
+        self._headings: list[tuple[int, int, str]] = []
+        self._heading_numbers: set[int] = set()
+        # 章番号を持つ行すべて（同じ章番号の2つめ以降も含む）。柱を除いたときの代わりに使う
+        self._candidates: list[tuple[int, int, str]] = []
+        # 章番号を持つ行ごとの、出てきた範囲
+        self._line_spans: dict[str, _LineSpan] = {}
+        # 本全体に出てくるつめ見出しとみなした行（一度決まったら変わらない）
+        self._running: set[str] = set()
+        # 本文で一度見た見出し候補の行（柱＝実行ヘッダは何百ページも同じ行が続く）
+        self._seen_lines: set[str] = set()
+        self._heading_chain = _IncreasingChain()
+        # 柱を除いて選び直した結果（除いた行と候補数が同じなら使い回す）
+        self._filtered_key: tuple[frozenset[str], int] | None = None
+        self._filtered: list[tuple[int, int, str]] = []
+        self._last_result = TextDetectionResult([], "none")
+
+    def feed(self, text: str) -> bool:
+        """次のページのテキストを渡す。暫定の結果が変わったら True"""
+        index = self.pages_seen
+        self.pages_seen += 1
+        entries = _parse_toc_entries(text)
+        if self._is_toc_page(index, text, len(entries)):
+            self._toc_pages.add(index)
+            for title, printed in entries:
+                number = _chapter_number(title)
+                if number is not None and number not in self._toc_entries:
+                    self._toc_entries[number] = (title, printed)
+        else:
+            self._scan_headings(index, text)
+
+        result = self.result()
+        changed = result != self._last_result
+        self._last_result = result
+        return changed
+
+    def _is_toc_page(self, index: int, text: str, entry_count: int) -> bool:
+        """目次ページかどうか
+
+        起点はページ先頭付近に「目次」等の短い見出し行を持つページ。
+        そこから連続してエントリ行を2行以上持つページも目次の続きとみなす。
+        """
+        if self._toc_start is not None:
+            start = self._toc_start
+            if entry_count >= 2:
+                return True
+            self._toc_start = None
+            # 最終ページはエントリ1行だけのこともあるので、その1ページ分も取り込む
+            if entry_count == 1 and index - 1 in self._toc_pages and index - 1 != start:
+                return True
+            # 続きが途切れたページ自身が、新しい目次の起点になることはある
+        if index < _TOC_SEARCH_PAGES and _looks_like_toc_page(text):
+            self._toc_start = index
+            return True
+        return False
+
+    def _scan_headings(self, index: int, text: str) -> None:
+        """本文から章見出しを拾う
+
+        各章番号について最初に出現したページを採用する（柱＝実行ヘッダは
+        章の初出ページから始まるため、初出採用で正しい結果になる）。
+        2回目以降に出てきた同じ行は、初出で見出しとして拾ったか見出しでなかったかの
+        どちらかなので、照合し直さずに飛ばす。章番号を持つ行だけは出てきた範囲を
+        覚え、本全体に出てくるつめ見出し（_update_running）を result で除けるようにする。
+        """
+        found: list[tuple[int, str]] = []
+        page_lines: set[str] = set()
+        frequent: list[str] = []
         for raw_line in _normalize(text).splitlines():
             line = raw_line.strip()
-            if not line or not _is_heading_line(line):
+            if not line or line in page_lines:
+                continue
+            page_lines.add(line)
+            span = self._line_spans.get(line)
+            if span is not None:
+                span.pages += 1
+                span.last_page = index + 1
+                if span.pages >= RUNNING_LINE_MIN_PAGES and line not in self._running:
+                    frequent.append(line)
+                continue
+            if line in self._seen_lines or not _is_heading_line(line):
                 continue
+            self._seen_lines.add(line)
             number = _chapter_number(line)
-            if number is None or number in headings:
+            if number is None:
                 continue
-            headings[number] = (index + 1, line)
-    return headings
+            self._line_spans[line] = _LineSpan(number, index + 1, index + 1)
+            found.append((number, line))
+        # 同じページの候補は章番号順に足す（一括処理で候補をソートした順と揃える）
+        for number, line in sorted(found):
+            self._candidates.append((index + 1, number, line))
+            if number in self._heading_numbers:
+                continue
+            self._heading_numbers.add(number)
+            self._headings.append((index + 1, number, line))
+            self._heading_chain.add(index + 1, number)
+        self._update_running(frequent)
+
+    def _update_running(self, lines: list[str]) -> None:
+        """このページにも出てきた、よく出る行がつめ見出しかどうかを調べ直す
+
+        行はこのページまで続いているので、初出より後に始まった候補はすべて範囲の中。
+        初出と同じページで始まった候補は、この行より先に途切れたものだけ範囲の中と
+        数える（1ページ目から並ぶつめ見出しどうしや、それと章の柱を数えないため）。
+        範囲の中で RUNNING_LINE_MIN_CROSSINGS 個以上の他の章が始まっていれば、
+        章をまたいで出続けるつめ見出し（章の一覧など）とみなす。
+        """
+        for line in lines:
+            span = self._line_spans[line]
+            for page, number, other in self._candidates[span.scanned:]:
+                if number == span.number:
+                    continue
+                if page > span.first_page:
+                    span.crossed.add(number)
+                elif page == span.first_page:
+                    span.peers.append(other)
+            span.scanned = len(self._candidates)
+            crossed = span.crossed | {
+                self._line_spans[other].number
+                for other in span.peers
+                if self._line_spans[other].last_page < span.last_page
+            }
+            if len(crossed) >= RUNNING_LINE_MIN_CROSSINGS:
+                self._running.add(line)
+
+    def _chosen_headings(self) -> list[tuple[int, int, str]]:
+        """章として採用する本文見出し（ページ順）"""
+        running = frozenset(self._running)
+        if not running:
+            return [self._headings[i] for i in self._heading_chain.best()]
+        key = (running, len(self._candidates))
+        if key != self._filtered_key:
+            # 柱を除いた残りから、章番号ごとの初出を選び直す
+            headings = []
+            numbers: set[int] = set()
+            for page, number, line in self._candidates:
+                if line in running or number in numbers:
+                    continue
+                numbers.add(number)
+                headings.append((page, number, line))
+            chain = _IncreasingChain()
+            for page, number, _ in headings:
+                chain.add(page, number)
+            self._filtered = [headings[i] for i in chain.best()]
+            self._filtered_key = key
+        return self._filtered
+
+    def result(self) -> TextDetectionResult:
+        """ここまでのページから求めた章の開始ページ"""
+        headings = self._chosen_headings() if self._headings else []
+        if not headings:
+            # 本文見出しが取れない場合は目次の印字ページ番号で代替する
+            # （物理ページとズレ得るため、UI 側で確認を促す）
+            limit = self.page_count if self.page_count is not None else self.pages_seen
+            printed = sorted(
+                (page, number, title) for number, (title, page) in self._toc_entries.items()
+            )
+            chapters = _enforce_invariants(
+                [(page, number, title) for page, number, title in printed if 1 <= page <= limit]
+            )
+            if chapters:
+                return TextDetectionResult(chapters, "toc")
+            return TextDetectionResult([], "none")
+        chapters = []
+        for page, number, line in headings:
+            chapters.append((self._toc_entries.get(number, (None, None))[0] or line, page))
+        return TextDetectionResult(chapters, "heading")
+
+
+def iter_chapters_from_text(
+    page_texts: Iterable[str], page_count: int | None = None
+) -> Iterator[TextDetectionResult]:
+    """ページテキストを順に読みながら、暫定の検出結果が変わるたびに返す
+
+    最後に返した結果が全ページを読んだときの結果になる（一度も変わらなければ
+    何も返さない＝検出なし）。
+    """
+    detector = StreamingChapterDetector(page_count)
+    for text in page_texts:
+        if detector.feed(text):
+            yield detector.result()
 
 
 def detect_chapters_from_text(page_texts: list[str]) -> TextDetectionResult:
     """ページテキストから章の開始ページを検出する"""
-    toc_pages = _find_toc_pages(page_texts)
-    headings = _scan_body_headings(page_texts, skip=toc_pages)
-    toc_entries = _parse_toc(page_texts, toc_pages)
-    if not headings:
-        # 本文見出しが取れない場合は目次の印字ページ番号で代替する
-        # （物理ページとズレ得るため、UI 側で確認を促す）
-        printed = sorted(
-            (page, number, title) for number, (title, page) in toc_entries.items()
-        )
-        chapters = _enforce_invariants(
-            [(page, number, title) for page, number, title in printed
-             if 1 <= page <= len(page_texts)]
-        )
-        if chapters:
-            return TextDetectionResult(chapters, "toc")
-        return TextDetectionResult([], "none")
-    candidates = sorted(
-        (page, number, toc_entries.get(number, (None, None))[0] or line)
-        for number, (page, line) in headings.items()
-    )
-    return TextDetectionResult(_enforce_invariants(candidates), "heading")
+    detector = StreamingChapterDetector()
+    for text in page_texts:
+        detector.feed(text)
+    return detector.result()
+
+
+class _IncreasingChain:
+    """ページと章番号がともに厳密増加する最長列（候補を足しながら保つ）
+
+    ページ順に並べた候補から最長列を選ぶ。貪欲に先頭から採ると、前方に紛れた
+    外れ値（例: 前付けの「第10章 付録」）1件で以降の本物の章が全滅するため。
+    候補はページの昇順（同じページ内は章番号の昇順）で足すこと。
+
+    章番号ごとの「そこで終わる最長列」を Fenwick 木（区間最大）に持ち、
+    1件あたり O(log 章番号) で伸ばす。柱（実行ヘッダ）の誤検出で候補が
+    数千件になっても二重ループにならない。
+    """
+
+    def __init__(self):
+        self._pages: list[int] = []
+        self._length: list[int] = []
+        self._previous: list[int] = []
+        # 添字 = 章番号 + 1。値 = (列の長さ, -終わりの候補番号) の最大値
+        self._tree: dict[int, tuple[int, int]] = {}
+        self._size = 1
+        # 同じページの候補は互いにつながらないので、ページが進んでから木に入れる
+        self._pending: list[tuple[int, tuple[int, int]]] = []
+        self._best_end = -1
+
+    def add(self, page: int, number: int) -> None:
+        if self._pages and page < self._pages[-1]:
+            raise ValueError("候補はページの昇順で足すこと")
+        if self._pages and page > self._pages[-1]:
+            for pending_number, key in self._pending:
+                self._update(pending_number + 1, key)
+            self._pending.clear()
+
+        # 章番号が小さい候補のうち最長の列（同じ長さなら先に現れた候補）につなぐ
+        best = self._query(number)
+        if best is None:
+            length, previous = 1, -1
+        else:
+            length, previous = best[0] + 1, -best[1]
+        index = len(self._pages)
+        self._pages.append(page)
+        self._length.append(length)
+        self._previous.append(previous)
+        self._pending.append((number, (length, -index)))
+        # 同じ長さなら先に現れる列を選ぶ
+        if self._best_end == -1 or length > self._length[self._best_end]:
+            self._best_end = index
+
+    def best(self) -> list[int]:
+        """最長列をなす候補の番号（足した順の0始まり）"""
+        indices = []
+        end = self._best_end
+        while end != -1:
+            indices.append(end)
+            end = self._previous[end]
+        indices.reverse()
+        return indices
+
+    def _update(self, position: int, key: tuple[int, int]) -> None:
+        while position > self._size:
+            # 木を倍に広げる。新しい根はそれまでの全区間を覆う
+            root = self._tree.get(self._size)
+            self._size *= 2
+            if root is not None:
+                self._tree[self._size] = root
+        while position <= self._size:
+            current = self._tree.get(position)
+            if current is None or key > current:
+                self._tree[position] = key
+            position += position & -position
+
+    def _query(self, position: int) -> tuple[int, int] | None:
+        """添字 1..position（章番号 0..position-1）の最大値"""
+        position = min(position, self._size)
+        best = None
+        while position > 0:
+            current = self._tree.get(position)
+            if current is not None and (best is None or current > best):
+                best = current
+            position -= position & -position
+        return best
 
 
 def _enforce_invariants(
@@ -202,27 +458,7 @@ def _enforce_invariants(
     ページを送るにつれ章番号は増えるはずなので、それを崩す候補（誤検出）は捨てる。
     間違ったページを出すより出さない方針。
     """
-    # ページ順に並べた候補から、章番号とページがともに厳密増加する最長列を選ぶ。
-    # 貪欲に先頭から採ると、前方に紛れた外れ値（例: 前付けの「第10章 付録」）1件で
-    # 以降の本物の章が全滅するため、最長列を採用する。
-    best_length = [1] * len(candidates)
-    previous = [-1] * len(candidates)
-    for i, (page_i, number_i, _) in enumerate(candidates):
-        for j in range(i):
-            page_j, number_j, _ = candidates[j]
-            if number_j < number_i and page_j < page_i and best_length[j] + 1 > best_length[i]:
-                best_length[i] = best_length[j] + 1
-                previous[i] = j
-
-    if not candidates:
-        return []
-
-    # 同じ長さなら先に現れる列を選ぶ（max は最初の最大値を返す）
-    end = max(range(len(candidates)), key=lambda i: (best_length[i], -i))
-    indices = []
-    while end != -1:
-        indices.append(end)
-        end = previous[end]
-    indices.reverse()
-
-    return [(candidates[i][2], candidates[i][0]) for i in indices]
+    chain = _IncreasingChain()
+    for page, number, _ in candidates:
+        chain.add(page, number)
+    return [(candidates[i][2], candidates[i][0]) for i in chain.best()]
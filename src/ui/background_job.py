@@ -0,0 +1,149 @@
+"""時間のかかる処理を GUI スレッドの外で走らせ、進捗ダイアログで待つ
+
+PDF の出力や分割を GUI スレッドで行うと、終わるまで画面が固まり
+（macOS ではレインボーカーソルが回り続け）、途中でやめることもできない。
+処理は progress(done, total) と is_cancelled() を受け取る関数として書き、
+run_with_progress で実行する。ダイアログには処理済み数・速さ・残り時間を出す。
+途中結果を画面に出したい処理は、3つめの引数 partial(結果) も受け取る。
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from PyQt6.QtCore import QThread, pyqtSignal
+from PyQt6.QtWidgets import QProgressDialog
+
+ProgressCallback = Callable[[int, int], None]
+CancelCheck = Callable[[], bool]
+PartialCallback = Callable[[Any], None]
+# work(progress, is_cancelled) -> 結果
+# （途中結果を出すときは work(progress, is_cancelled, partial) -> 結果）
+JobFunction = Callable[..., Any]
+
+
+@dataclass
+class JobOutcome:
+    """ジョブの結末（成功なら result、失敗なら error、中止なら cancelled）"""
+    result: Any = None
+    error: str | None = None
+    cancelled: bool = False
+
+
+class BackgroundJob(QThread):
+    """work をワーカースレッドで実行する
+
+    キャンセルは要求を覚えるだけで、work が is_cancelled() を見て打ち切る。
+    キャンセル後に work が例外で終わっても、失敗ではなく中止として扱う。
+    結果は終了後に outcome でも読める（シグナルが届く前に待ち終えたとき用）。
+    partial_results が True なら、work に partial を渡し、途中結果を partial で知らせる。
+    """
+
+    progress = pyqtSignal(int, int)
+    partial = pyqtSignal(object)
+    finished_ok = pyqtSignal(object)
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+    def __init__(self, work: JobFunction, parent=None, partial_results: bool = False):
+        super().__init__(parent)
+        self._work = work
+        self._partial_results = partial_results
+        self._cancelled = False
+        self.outcome = JobOutcome()
+
+    def cancel(self):
+        self._cancelled = True
+
+    def is_cancelled(self) -> bool:
+        return self._cancelled
+
+    def run(self):
+        args = [self.progress.emit, self.is_cancelled]
+        if self._partial_results:
+            args.append(self.partial.emit)
+        try:
+            result = self._work(*args)
+        except Exception as e:
+            if self._cancelled:
+                self.outcome = JobOutcome(cancelled=True)
+                self.cancelled.emit()
+            else:
+                self.outcome = JobOutcome(error=str(e))
+                self.failed.emit(str(e))
+            return
+        if self._cancelled:
+            self.outcome = JobOutcome(cancelled=True)
+            self.cancelled.emit()
+        else:
+            self.outcome = JobOutcome(result=result)
+            self.finished_ok.emit(result)
+
+
+def format_duration(seconds: float) -> str:
+    """残り時間の表示（例: 45秒, 3分05秒, 1時間12分）"""
+    seconds = max(0, int(round(seconds)))
+    if seconds < 60:
+        return f"{seconds}秒"
+    if seconds < 3600:
+        return f"{seconds // 60}分{seconds % 60:02d}秒"
+    return f"{seconds // 3600}時間{seconds % 3600 // 60}分"
+
+
+def format_rate(done: int, total: int, elapsed: float) -> str:
+    """進捗の表示（例: 120/400 ページ ・ 3.2 ページ/秒 ・ 残り約1分27秒）"""
+    text = f"{done}/{total} ページ"
+    if done <= 0 or elapsed <= 0:
+        return text
+    rate = done / elapsed
+    text += f" ・ {rate:.1f} ページ/秒"
+    if done < total:
+        text += f" ・ 残り約{format_duration((total - done) / rate)}"
+    return text
+
+
+def run_with_progress(
+    parent,
+    title: str,
+    label: str,
+    work: JobFunction,
+    on_partial: PartialCallback | None = None,
+) -> JobOutcome:
+    """work をワーカースレッドで実行し、終わるまで進捗ダイアログで待つ
+
+    キャンセルボタンを押すと work に中止を伝え、work が後始末を終えて
+    戻るまで待ってから返す。on_partial を渡すと work は partial も受け取り、
+    途中結果は待っている間に GUI スレッドで on_partial に届く。
+    """
+    job = BackgroundJob(work, parent, partial_results=on_partial is not None)
+    dialog = QProgressDialog(label, "キャンセル", 0, 0, parent)
+    dialog.setWindowTitle(title)
+    dialog.setMinimumDuration(0)
+    dialog.setAutoClose(False)
+    dialog.setAutoReset(False)
+    started = time.monotonic()
+    waiting = True
+
+    def on_progress(done: int, total: int):
+        if dialog.maximum() != total:
+            dialog.setRange(0, total)
+        dialog.setValue(done)
+        dialog.setLabelText(f"{label}\n{format_rate(done, total, time.monotonic() - started)}")
+
+    job.progress.connect(on_progress)
+    if on_partial is not None:
+        # 待ち終えたあとに届いた途中結果は捨てる（キャンセルした後に表を書き換えない）
+        job.partial.connect(lambda result: on_partial(result) if waiting else None)
+    job.finished_ok.connect(lambda _result: dialog.close())
+    job.failed.connect(lambda _message: dialog.close())
+    job.cancelled.connect(dialog.close)
+    dialog.canceled.connect(job.cancel)
+
+    job.start()
+    dialog.exec()
+    waiting = False
+
+    if job.isRunning():
+        job.cancel()
+        job.wait()
+    return job.outcome
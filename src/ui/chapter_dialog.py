@@ -1,20 +1,32 @@
 # src/ui/chapter_dialog.py
 """章分割ダイアログUI"""
 
+import logging
+import os
 import subprocess
 from dataclasses import dataclass
 from pathlib import Path
 from PyQt6.QtWidgets import (
-    QDialog, QVBoxLayout, QHBoxLayout, QScrollArea, QWidget,
+    QDialog, QVBoxLayout, QHBoxLayout, QWidget,
     QLabel, QLineEdit, QPushButton, QCheckBox, QListWidget,
-    QListWidgetItem, QFrame, QMessageBox, QGroupBox, QSplitter,
-    QApplication,
+    QListWidgetItem, QMessageBox, QGroupBox, QSplitter,
 )
-from PyQt6.QtCore import Qt, pyqtSignal
-from PyQt6.QtGui import QPixmap
-from src.export.pdf_generator import PdfGenerator
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QImage
+from src.export.chapter_writer import commit_parts, discard_parts, part_path
+from src.export.pdf_generator import GenerationCancelled, PdfGenerator
+from src.export.ocr_cache import OcrCache
+from src.export.pdf_splitter import PdfSplitter
 from src.export.file_manager import FileManager
+from src.export.thumbnail_cache import ThumbnailCache, read_scaled
 from src.export.toc_analyzer import ChapterRange
+from src.ui.background_job import run_with_progress
+from src.ui.thumbnail_strip import (
+    THUMB_HEIGHT, THUMB_WIDTH, PageThumbnailModel, ThumbnailStrip,
+)
+from src.utils.workers import default_workers
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass
@@ -25,86 +37,6 @@ class Chapter:
     end: int    # 0-indexed, inclusive
 
 
-class ThumbnailWidget(QFrame):
-    """サムネイル表示ウィジェット"""
-
-    clicked = pyqtSignal(int)
-
-    def __init__(self, image_path: Path | None, index: int, *, pixmap: QPixmap | None = None, parent=None):
-        super().__init__(parent)
-        self.index = index
-        self.image_path = image_path
-        self._source_pixmap = pixmap
-        self._is_chapter_start = False
-
-        self._init_ui()
-
-    def _init_ui(self):
-        """UIを初期化"""
-        self.setFrameStyle(QFrame.Shape.Box | QFrame.Shadow.Plain)
-        self.setLineWidth(2)
-        self.setCursor(Qt.CursorShape.PointingHandCursor)
-
-        layout = QVBoxLayout(self)
-        layout.setContentsMargins(4, 4, 4, 4)
-        layout.setSpacing(2)
-
-        # サムネイル画像
-        self.image_label = QLabel()
-        if self._source_pixmap is not None:
-            pixmap = self._source_pixmap
-        else:
-            pixmap = QPixmap(str(self.image_path))
-        scaled = pixmap.scaled(
-            100, 140,
-            Qt.AspectRatioMode.KeepAspectRatio,
-            Qt.TransformationMode.SmoothTransformation
-        )
-        self.image_label.setPixmap(scaled)
-        self.image_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        layout.addWidget(self.image_label)
-
-        # ページ番号
-        self.page_label = QLabel(f"p.{self.index + 1}")
-        self.page_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.page_label.setStyleSheet("font-size: 11px;")
-        layout.addWidget(self.page_label)
-
-        self._update_style()
-
-    def _update_style(self):
-        """スタイルを更新"""
-        if self._is_chapter_start:
-            self.setStyleSheet("""
-                ThumbnailWidget {
-                    background-color: #e3f2fd;
-                    border: 2px solid #1976d2;
-                }
-            """)
-        else:
-            self.setStyleSheet("""
-                ThumbnailWidget {
-                    background-color: #ffffff;
-                    border: 1px solid #cccccc;
-                }
-                ThumbnailWidget:hover {
-                    background-color: #f5f5f5;
-                    border: 1px solid #999999;
-                }
-            """)
-
-    def set_chapter_start(self, is_start: bool):
-        """章の開始位置かどうかを設定"""
-        self._is_chapter_start = is_start
-        self._update_style()
-
-    def mousePressEvent(self, event):
-        """クリックイベント"""
-        if event.button() == Qt.MouseButton.LeftButton:
-            self.clicked.emit(self.index)
-        super().mousePressEvent(event)
-
-
 class ChapterDialog(QDialog):
     """章分割ダイアログ"""
 
@@ -113,17 +45,32 @@ class ChapterDialog(QDialog):
         image_paths: list[Path],
         output_dir: Path,
         keep_images: bool,
-        parent=None
+        parent=None,
+        prebuilt_pdf: Path | None = None,
     ):
         super().__init__(parent)
         self.image_paths = image_paths
         self.output_dir = output_dir
         self.keep_images = keep_images
-        self.pdf_generator = PdfGenerator()
+        # 撮影しながら作った全ページのPDF（OCR付き）。あれば画像から作り直さない
+        self.prebuilt_pdf = prebuilt_pdf
         self.file_manager = FileManager()
+        # 結合PDFと章別PDFで同じページを再OCRしないよう、結果をキャッシュする
+        self.pdf_generator = PdfGenerator(
+            ocr_cache=OcrCache(self.file_manager.get_ocr_cache_path(output_dir)),
+            ocr_workers=default_workers(),
+        )
+        self.pdf_splitter = PdfSplitter()
+        # 縮小済みのサムネイルはディスクに残し、開き直したときは読むだけにする
+        try:
+            self.thumbnail_cache: ThumbnailCache | None = ThumbnailCache()
+        except OSError:
+            # キャッシュ置き場を作れなくても、サムネイルは毎回縮小すれば出せる
+            logger.warning("サムネイルのキャッシュを使えません")
+            self.thumbnail_cache = None
+        self.thumbnail_model = PageThumbnailModel(image_paths, self._load_thumbnail, self)
 
         self.chapters: list[Chapter] = []
-        self.thumbnails: list[ThumbnailWidget] = []
         self._current_chapter_row = -1
 
         # 初期章を作成（全ページを1章として）
@@ -164,26 +111,11 @@ class ChapterDialog(QDialog):
         thumbnail_group = QGroupBox("ページ一覧")
         thumbnail_layout = QVBoxLayout(thumbnail_group)
 
-        # スクロールエリア
-        self.scroll_area = QScrollArea()
-        self.scroll_area.setWidgetResizable(True)
-        self.scroll_area.setHorizontalScrollBarPolicy(
-            Qt.ScrollBarPolicy.ScrollBarAlwaysOn
-        )
-        self.scroll_area.setVerticalScrollBarPolicy(
-            Qt.ScrollBarPolicy.ScrollBarAlwaysOff
-        )
-        self.scroll_area.setMinimumHeight(200)
-
-        # サムネイルコンテナ
-        self.thumbnail_container = QWidget()
-        self.thumbnail_layout = QHBoxLayout(self.thumbnail_container)
-        self.thumbnail_layout.setContentsMargins(8, 8, 8, 8)
-        self.thumbnail_layout.setSpacing(8)
-        self.thumbnail_layout.setAlignment(Qt.AlignmentFlag.AlignLeft)
-
-        self.scroll_area.setWidget(self.thumbnail_container)
-        thumbnail_layout.addWidget(self.scroll_area)
+        # 見えているページのサムネイルだけを読み込んで描く
+        self.thumbnail_strip = ThumbnailStrip()
+        self.thumbnail_strip.setModel(self.thumbnail_model)
+        self.thumbnail_strip.page_clicked.connect(self._on_thumbnail_clicked)
+        thumbnail_layout.addWidget(self.thumbnail_strip)
 
         splitter.addWidget(thumbnail_group)
 
@@ -314,22 +246,22 @@ class ChapterDialog(QDialog):
             self.chapter_list.addItem(item)
 
     def _update_thumbnails(self):
-        """サムネイル表示を更新"""
-        # 既存のサムネイルをクリア
-        for thumb in self.thumbnails:
-            thumb.deleteLater()
-        self.thumbnails.clear()
-
-        # 章の開始位置を集める
-        chapter_starts = {chapter.start for chapter in self.chapters}
-
-        # サムネイルを作成
-        for i, path in enumerate(self.image_paths):
-            thumb = ThumbnailWidget(path, i)
-            thumb.set_chapter_start(i in chapter_starts)
-            thumb.clicked.connect(self._on_thumbnail_clicked)
-            self.thumbnail_layout.addWidget(thumb)
-            self.thumbnails.append(thumb)
+        """サムネイルの章開始の印を更新（変わったページだけ描き直す）"""
+        self.thumbnail_model.set_chapter_starts({chapter.start for chapter in self.chapters})
+
+    def _load_thumbnail(self, path: Path) -> QImage:
+        """ページのサムネイルを作る（ディスクに縮小済みがあれば読むだけ）
+
+        サムネイル一覧のスレッドプールから呼ばれる。
+        """
+        if self.thumbnail_cache is None:
+            return read_scaled(path, THUMB_WIDTH, THUMB_HEIGHT)
+        return self.thumbnail_cache.image_thumbnail(path, THUMB_WIDTH, THUMB_HEIGHT)
+
+    def done(self, result: int):
+        # 閉じた後に見えないサムネイルを読み続けない
+        self.thumbnail_model.cancel_pending()
+        super().done(result)
 
     def _on_chapter_selected(self, row: int):
         """章が選択された"""
@@ -342,9 +274,7 @@ class ChapterDialog(QDialog):
             self.delete_btn.setEnabled(row > 0)
 
             # 対応するサムネイルにスクロール
-            if chapter.start < len(self.thumbnails):
-                thumb = self.thumbnails[chapter.start]
-                self.scroll_area.ensureWidgetVisible(thumb)
+            self.thumbnail_strip.scroll_to_page(chapter.start)
         else:
             self.name_edit.setEnabled(False)
             self.name_edit.clear()
@@ -398,8 +328,12 @@ class ChapterDialog(QDialog):
         self._update_thumbnails()
 
     def _export_pdfs(self):
-        """PDFを出力"""
-        if not self.merge_check.isChecked() and not self.chapter_pdf_check.isChecked():
+        """PDFを出力（書き出しはワーカースレッドで行い、進捗ダイアログで待つ）"""
+        # チェックボックスは GUI スレッドで読み、値だけをワーカーに渡す
+        ocr = self.ocr_check.isChecked()
+        merge = self.merge_check.isChecked()
+        chapter_pdfs = self.chapter_pdf_check.isChecked()
+        if not merge and not chapter_pdfs:
             QMessageBox.warning(
                 self,
                 "エラー",
@@ -407,29 +341,29 @@ class ChapterDialog(QDialog):
             )
             return
 
-        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
-        try:
-            exported_files = []
-            ocr = self.ocr_check.isChecked()
-
-            # 全ページを1つのPDFにまとめる
-            if self.merge_check.isChecked():
-                merged_path = self.output_dir / "merged.pdf"
-                self.pdf_generator.generate(self.image_paths, merged_path, ocr=ocr)
-                exported_files.append(merged_path)
-
-            # 章ごとにPDFを作成
-            if self.chapter_pdf_check.isChecked():
-                for i, chapter in enumerate(self.chapters):
-                    chapter_images = self.image_paths[chapter.start:chapter.end + 1]
-                    pdf_path = self.file_manager.get_chapter_pdf_path(
-                        self.output_dir, i + 1, chapter.name
-                    )
-                    self.pdf_generator.generate(chapter_images, pdf_path, ocr=ocr)
-                    exported_files.append(pdf_path)
+        outcome = run_with_progress(
+            self, "PDF出力", "PDFを出力しています…",
+            lambda progress, is_cancelled: self._write_pdfs(
+                progress, is_cancelled, ocr=ocr, merge=merge, chapter_pdfs=chapter_pdfs
+            ),
+        )
+        if outcome.cancelled:
+            # 書きかけのファイルは _write_pdfs が消している
+            return
+        if outcome.error is not None:
+            QMessageBox.critical(
+                self,
+                "エラー",
+                f"PDF出力中にエラーが発生しました:\n{outcome.error}"
+            )
+            return
+        exported_files = outcome.result
 
-            # 元画像を削除
-            if not self.keep_images:
+        try:
+            # 元画像を削除（残す場合は次回の出力用にOCR結果も残す）
+            if self.keep_images:
+                self.pdf_generator.ocr_cache.save()
+            else:
                 self.file_manager.cleanup_images(self.output_dir)
 
             # 完了メッセージ
@@ -459,5 +393,77 @@ class ChapterDialog(QDialog):
                 f"PDF出力中にエラーが発生しました:\n{str(e)}"
             )
 
-        finally:
-            QApplication.restoreOverrideCursor()
+    def _write_pdfs(
+        self, progress, is_cancelled, ocr: bool, merge: bool, chapter_pdfs: bool
+    ) -> list[Path]:
+        """結合PDF・章別PDFを書き出す（ワーカースレッドで実行される）
+
+        進捗は全出力を通したページ数で知らせる。どの出力もまず一時ファイル
+        （.part）に書き、全部そろってから出力先に置き換える。中止や失敗のときは
+        一時ファイルだけを消して例外を上げるので、前回の出力はそのまま残る。
+        ウィジェットには触れないので、出力の選択は引数で受け取る。
+        """
+        # 撮影中に作ったPDFはOCR付きなので、OCRする出力にだけ使う
+        prebuilt = self.prebuilt_pdf
+        if prebuilt is not None and not (ocr and prebuilt.exists()):
+            prebuilt = None
+
+        merged_path = self.output_dir / "merged.pdf" if merge else None
+        generate_merged = merged_path is not None and prebuilt is None
+        chapter_pages = sum(c.end - c.start + 1 for c in self.chapters) if chapter_pdfs else 0
+        total = (len(self.image_paths) if generate_merged else 0) + chapter_pages
+        done = 0
+
+        def step_progress(done_in_step: int, _total_in_step: int):
+            progress(done + done_in_step, total)
+
+        def check_cancelled():
+            if is_cancelled():
+                raise GenerationCancelled()
+
+        # 書き出す出力先（置き換えるまでは part_path の一時ファイルにある）
+        written: list[Path] = []
+        try:
+            # 全ページを1つのPDFにまとめる
+            if generate_merged:
+                written.append(merged_path)
+                self.pdf_generator.generate(
+                    self.image_paths, part_path(merged_path), ocr=ocr,
+                    progress=step_progress, is_cancelled=is_cancelled,
+                )
+                done += len(self.image_paths)
+            source_pdf = part_path(merged_path) if generate_merged else prebuilt
+
+            # 章ごとにPDFを作成
+            if chapter_pdfs and source_pdf is not None:
+                # 全ページのPDFからページをコピーして切り出す。画像の再エンコードや
+                # テキストレイヤーの描き直しをしないので、出力時間はページ数に比例する
+                written.extend(self.pdf_splitter.split(
+                    source_pdf, self.chapters, self.output_dir,
+                    progress=step_progress, is_cancelled=is_cancelled,
+                    workers=default_workers(), commit=False,
+                ))
+                done += chapter_pages
+            elif chapter_pdfs:
+                for i, chapter in enumerate(self.chapters):
+                    chapter_images = self.image_paths[chapter.start:chapter.end + 1]
+                    pdf_path = self.file_manager.get_chapter_pdf_path(
+                        self.output_dir, i + 1, chapter.name
+                    )
+                    written.append(pdf_path)
+                    self.pdf_generator.generate(
+                        chapter_images, part_path(pdf_path), ocr=ocr,
+                        progress=step_progress, is_cancelled=is_cancelled,
+                    )
+                    done += len(chapter_images)
+            check_cancelled()
+            commit_parts(written)
+        except BaseException:
+            discard_parts(written)
+            raise
+
+        # 撮影中のPDFは最後に結合PDFへ移す（中止したときは元の場所に残る）
+        if merged_path is not None and prebuilt is not None:
+            os.replace(prebuilt, merged_path)
+        exported = [merged_path] if merged_path is not None else []
+        return exported + [p for p in written if p != merged_path]
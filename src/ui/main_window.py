@@ -1,6 +1,9 @@
 # src/ui/main_window.py
 """メイン画面UI"""
 
+import functools
+import logging
+import time
 from pathlib import Path
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
@@ -11,19 +14,55 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import Qt, QTimer, QRect
 from src.capture.window_manager import WindowManager, WindowInfo
 from src.capture.screenshot import Screenshot
+from src.capture.capture_backend import CaptureSource, PageTurner, WindowProvider
+from src.capture.image_writer import ImageWriter
+from src.capture.capture_stats import CaptureStats
+from src.capture.page_hash import is_same_page, page_fingerprint
+from src.capture.settle_detector import SettleDetector
 from src.capture.page_navigator import PageNavigator, Direction
+from src.export.capture_journal import CaptureJournal
 from src.export.file_manager import FileManager
+from src.export.ocr_cache import OcrCache
+from src.export.streaming_pdf import StreamingPdfWriter
+from src.export.thumbnail_cache import ThumbnailCache
+from src.ui.thumbnail_strip import THUMB_HEIGHT, THUMB_WIDTH
+from src.utils.file_hash import discard_digest
+
+logger = logging.getLogger(__name__)
+
+# ページ送り後、画面の落ち着きを確認するフレームを撮る間隔（ミリ秒）
+_SETTLE_PROBE_MS = 100
+# 同じページがこの枚数続いたら、ページ送りが効かない＝本の最後とみなす
+END_OF_BOOK_REPEATS = 3
+# ページ送り後も同じページだったときに、キーを送り直す回数の上限
+MAX_TURN_RETRIES = 2
 
 
 class MainWindow(QMainWindow):
     """メインウィンドウ"""
 
-    def __init__(self):
+    def __init__(
+        self,
+        window_manager: WindowProvider | None = None,
+        screenshot: CaptureSource | None = None,
+        page_navigator: PageTurner | None = None,
+    ):
+        """撮影・ページ送り・ウィンドウ操作は差し替えられる（既定は macOS の実機用）"""
         super().__init__()
-        self.window_manager = WindowManager()
-        self.screenshot = Screenshot()
-        self.page_navigator = PageNavigator()
+        self.window_manager = window_manager or WindowManager()
+        self.screenshot = screenshot or Screenshot()
+        self.page_navigator = page_navigator or PageNavigator()
         self.file_manager = FileManager()
+        # 章分割ダイアログで使うサムネイルは撮影しながら作っておく
+        try:
+            thumbnail_cache = ThumbnailCache()
+        except OSError:
+            # キャッシュ置き場を作れなくても、撮影はサムネイルなしでできる
+            logger.warning("サムネイルのキャッシュを使えません")
+            thumbnail_cache = None
+        self.image_writer = ImageWriter(
+            thumbnail_cache=thumbnail_cache, thumbnail_size=(THUMB_WIDTH, THUMB_HEIGHT)
+        )
 
         self.windows: list[WindowInfo] = []
         self.captured_images: list[Path] = []
@@ -32,6 +71,15 @@ class MainWindow(QMainWindow):
         self.total_pages = 0
         self.output_dir: Path | None = None
         self.custom_region: QRect | None = None  # カスタム領域
+        self.capture_stats = CaptureStats()
+        self._last_fingerprint: bytes | None = None  # 直前に撮ったページの指紋
+        self._trailing_duplicates: list[Path] = []  # 末尾で続いている同一ページ
+        self._turn_retries = 0  # 現在のページで送り直した回数
+        self._settle: SettleDetector | None = None
+        self._settle_started = 0.0
+        self.journal: CaptureJournal | None = None  # 再開用のキャプチャ記録
+        self.pdf_stream: StreamingPdfWriter | None = None  # 撮影しながら作るPDF
+        self.prebuilt_pdf: Path | None = None  # 撮影完了時に出来上がった全ページのPDF
 
         self._init_ui()
         self._refresh_windows()
@@ -102,6 +150,23 @@ class MainWindow(QMainWindow):
         page_layout.addStretch()
         settings_layout.addLayout(page_layout)
 
+        self.auto_stop_check = QCheckBox("最後のページを検出したら自動で停止する")
+        self.auto_stop_check.setChecked(True)
+        self.auto_stop_check.setToolTip(
+            f"同じページが{END_OF_BOOK_REPEATS}回続いたら本の最後とみなして停止し、"
+            "重複したページを取り除きます。\nページ数は上限として使われます。"
+        )
+        settings_layout.addWidget(self.auto_stop_check)
+
+        self.verify_turn_check = QCheckBox("ページ送りを確認し、失敗したら送り直す")
+        self.verify_turn_check.setChecked(True)
+        self.verify_turn_check.setToolTip(
+            "ページ送り後も同じページが写っていたら、キーを送り直して撮り直します"
+            f"（最大{MAX_TURN_RETRIES}回）。\n"
+            "キー入力の取りこぼしによるページ抜けと重複を防ぎます。"
+        )
+        settings_layout.addWidget(self.verify_turn_check)
+
         # ページ送り方向
         direction_layout = QHBoxLayout()
         direction_layout.addWidget(QLabel("ページ送り方向:"))
@@ -134,6 +199,14 @@ class MainWindow(QMainWindow):
         interval_layout.addWidget(self.interval_label)
         settings_layout.addLayout(interval_layout)
 
+        # ページの切り替わりを検出して撮影（間隔は上限として使う）
+        self.adaptive_check = QCheckBox("ページの切り替わりを検出して撮影する")
+        self.adaptive_check.setToolTip(
+            "ページ送り後、画面が次のページで落ち着いた時点ですぐ撮影します。\n"
+            "キャプチャ間隔は待ち時間の上限になります。"
+        )
+        settings_layout.addWidget(self.adaptive_check)
+
         layout.addWidget(settings_group)
 
         # 出力設定
@@ -144,6 +217,13 @@ class MainWindow(QMainWindow):
         self.keep_images_check.setChecked(True)
         output_layout.addWidget(self.keep_images_check)
 
+        self.stream_pdf_check = QCheckBox("撮影しながらPDFを作る（OCR付き）")
+        self.stream_pdf_check.setToolTip(
+            "保存したページから順にOCRしてPDFにしていきます。\n"
+            "撮影が終わった時点でPDFがほぼ出来上がっているので、出力の待ち時間が短くなります。"
+        )
+        output_layout.addWidget(self.stream_pdf_check)
+
         path_layout = QHBoxLayout()
         path_layout.addWidget(QLabel("保存先:"))
         self.path_edit = QLineEdit(str(Path.home() / "Desktop" / "captures"))
@@ -161,6 +241,10 @@ class MainWindow(QMainWindow):
         pdf_split_btn = QPushButton("既存PDFを分割...")
         pdf_split_btn.clicked.connect(self._open_pdf_split)
         tool_layout.addWidget(pdf_split_btn)
+        self.resume_btn = QPushButton("中断したキャプチャを再開...")
+        self.resume_btn.setToolTip("キャプチャの記録（session.jsonl）から、続きのページを撮ります")
+        self.resume_btn.clicked.connect(self._resume_capture)
+        tool_layout.addWidget(self.resume_btn)
         layout.addWidget(tool_group)
 
         # ボタン
@@ -281,31 +365,158 @@ class MainWindow(QMainWindow):
         if self.window_area_radio.isChecked() and idx < 0:
             return
 
-        self.is_capturing = True
         self.current_page = 0
         self.total_pages = self.page_spin.value()
         self.captured_images = []
+        self.capture_stats = CaptureStats()
+        self._last_fingerprint = None
+        self._trailing_duplicates = []
+        self._turn_retries = 0
 
         # 方向を設定
         self.page_navigator.set_direction(self._get_selected_direction())
 
-        # 出力ディレクトリを作成
+        # 出力ディレクトリを作成し、撮影設定を記録する
         self.file_manager.base_path = Path(self.path_edit.text())
         self.output_dir = self.file_manager.create_output_directory("kindle_capture")
+        self.journal = self.file_manager.open_journal(self.output_dir, self._session_settings())
+
+        self._begin_capture()
+
+        # 少し待ってからキャプチャ開始
+        QTimer.singleShot(500, self._capture_page)
+
+    def _begin_capture(self):
+        """撮影中の画面にして、書き出しスレッドと対象ウィンドウを準備する"""
+        self.is_capturing = True
+        self.prebuilt_pdf = None
+        self.pdf_stream = self._create_pdf_stream() if self.stream_pdf_check.isChecked() else None
 
         # UI更新
         self.start_btn.setEnabled(False)
+        self.resume_btn.setEnabled(False)
         self.finish_btn.setEnabled(True)
         self.progress_bar.setRange(0, self.total_pages)
         self.progress_bar.setValue(0)
         self.progress_bar.setVisible(True)
         self.warning_label.setVisible(True)
 
+        # PNG の保存は背景スレッドで行う
+        self.image_writer.start()
+
         # 対象ウィンドウをフォアグラウンドに
         self._bring_target_to_front()
 
-        # 少し待ってからキャプチャ開始
-        QTimer.singleShot(500, self._capture_page)
+    def _create_pdf_stream(self) -> StreamingPdfWriter:
+        """撮影しながらPDFを作る書き出し役を用意する"""
+        stream = StreamingPdfWriter(
+            self.file_manager.get_stream_pages_dir(self.output_dir),
+            ocr_cache=OcrCache(self.file_manager.get_ocr_cache_path(self.output_dir)),
+        )
+        stream.start()
+        return stream
+
+    def _on_page_saved(self, page: int, fingerprint: bytes, path: Path):
+        """ページ画像の保存が終わった（ImageWriter のスレッドから呼ばれる）"""
+        if self.journal is not None:
+            self.journal.record_page(page, path, fingerprint)
+        if self.pdf_stream is not None:
+            self.pdf_stream.add_page(path)
+
+    def _session_settings(self) -> dict:
+        """記録に残す撮影設定（再開時にこの通りに戻す）"""
+        window = None
+        if self.window_area_radio.isChecked():
+            window = self.windows[self.window_combo.currentIndex()]
+        return {
+            "area_mode": "window" if window is not None else "custom",
+            "region": list(self._capture_region()),
+            "window_owner": window["owner"] if window is not None else None,
+            "window_name": window["name"] if window is not None else None,
+            "direction": self._get_selected_direction().value,
+            "interval": self.interval_slider.value(),
+            "adaptive": self.adaptive_check.isChecked(),
+            "auto_stop": self.auto_stop_check.isChecked(),
+            "verify_turn": self.verify_turn_check.isChecked(),
+            "keep_images": self.keep_images_check.isChecked(),
+            "stream_pdf": self.stream_pdf_check.isChecked(),
+            "total_pages": self.total_pages,
+        }
+
+    def _restore_settings(self, settings: dict):
+        """記録の撮影設定を画面に戻す"""
+        radios = {
+            Direction.RIGHT: self.right_radio,
+            Direction.LEFT: self.left_radio,
+            Direction.UP: self.up_radio,
+            Direction.DOWN: self.down_radio,
+        }
+        radios[Direction(settings.get("direction", Direction.RIGHT.value))].setChecked(True)
+        self.interval_slider.setValue(settings.get("interval", self.interval_slider.value()))
+        self.adaptive_check.setChecked(settings.get("adaptive", False))
+        self.auto_stop_check.setChecked(settings.get("auto_stop", True))
+        self.verify_turn_check.setChecked(settings.get("verify_turn", True))
+        self.keep_images_check.setChecked(settings.get("keep_images", self.keep_images_check.isChecked()))
+        self.stream_pdf_check.setChecked(settings.get("stream_pdf", False))
+        self.page_spin.setValue(settings.get("total_pages", self.page_spin.value()))
+
+        # 同じウィンドウが見つかればそれを、無ければ記録した領域をそのまま撮る
+        if settings.get("area_mode") == "window":
+            self._refresh_windows()
+            for i, w in enumerate(self.windows):
+                if (w["owner"], w["name"]) == (settings.get("window_owner"), settings.get("window_name")):
+                    self.window_area_radio.setChecked(True)
+                    self.window_combo.setCurrentIndex(i)
+                    return
+        x, y, width, height = settings["region"]
+        self.custom_area_radio.setChecked(True)
+        self._on_region_selected(QRect(x, y, width, height))
+
+    def _resume_capture(self):
+        """中断したキャプチャのフォルダを選んで再開"""
+        directory = QFileDialog.getExistingDirectory(
+            self, "再開するキャプチャのフォルダを選択", self.path_edit.text()
+        )
+        if directory:
+            self._resume_from(Path(directory))
+
+    def _resume_from(self, output_dir: Path):
+        """記録から設定と撮影済みページを戻し、次のページから撮影を続ける"""
+        session = self.file_manager.load_journal(output_dir)
+        if session is None:
+            QMessageBox.warning(self, "エラー", "このフォルダには再開できるキャプチャの記録がありません")
+            return
+        if session.finished:
+            QMessageBox.information(self, "再開", "このキャプチャは完了しています")
+            return
+
+        self._restore_settings(session.settings)
+        self.current_page = len(session.pages)
+        self.total_pages = self.page_spin.value()
+        self.captured_images = [p.path for p in session.pages]
+        self.capture_stats = CaptureStats()
+        self._last_fingerprint = session.pages[-1].fingerprint if session.pages else None
+        self._trailing_duplicates = []
+        self._turn_retries = 0
+        self.page_navigator.set_direction(self._get_selected_direction())
+        self.output_dir = output_dir
+        self.journal = self.file_manager.open_journal(output_dir)
+        logger.info("キャプチャを %d ページ目から再開: %s", session.next_page, output_dir)
+
+        self._begin_capture()
+        self.progress_bar.setValue(self.current_page)
+        QTimer.singleShot(500, self._resume_first_page)
+
+    def _resume_first_page(self):
+        """再開直後の1枚。画面が最後に保存したページのままなら送ってから撮る"""
+        if not self.is_capturing:
+            return
+        if self._last_fingerprint is not None and self.current_page < self.total_pages:
+            probe = page_fingerprint(self.screenshot.capture_region(*self._capture_region()))
+            if is_same_page(probe, self._last_fingerprint):
+                self._navigate_and_schedule_next()
+                return
+        self._capture_page()
 
     def _capture_page(self):
         """1ページをキャプチャ"""
@@ -313,35 +524,60 @@ class MainWindow(QMainWindow):
             self._finish_capture()
             return
 
-        # キャプチャ領域を決定
-        if self.custom_area_radio.isChecked() and self.custom_region:
-            # カスタム領域を使用
-            x = self.custom_region.x()
-            y = self.custom_region.y()
-            width = self.custom_region.width()
-            height = self.custom_region.height()
-        else:
-            # ウィンドウのコンテンツ領域を使用
-            idx = self.window_combo.currentIndex()
-            window = self.windows[idx]
-            bounds = self.window_manager.get_content_bounds(window["bounds"])
-            x = bounds["x"]
-            y = bounds["y"]
-            width = bounds["width"]
-            height = bounds["height"]
-
         # スクリーンショット撮影
-        image = self.screenshot.capture_region(x, y, width, height)
+        started = time.perf_counter()
+        image = self.screenshot.capture_region(*self._capture_region())
+        grabbed = time.perf_counter()
+        fingerprint = page_fingerprint(image)
+        self.capture_stats.record("grab", grabbed - started)
+        self.capture_stats.record("fingerprint", time.perf_counter() - grabbed)
+        is_duplicate = (
+            self._last_fingerprint is not None
+            and is_same_page(fingerprint, self._last_fingerprint)
+        )
+        if (
+            is_duplicate
+            and self.verify_turn_check.isChecked()
+            and self._turn_retries < MAX_TURN_RETRIES
+        ):
+            # キー入力が取りこぼされてページが変わっていない。送り直して撮り直す
+            self._turn_retries += 1
+            self.capture_stats.turn_retries += 1
+            self._bring_target_to_front()
+            QTimer.singleShot(200, self._navigate_and_schedule_next)
+            return
+        self._turn_retries = 0
+        self._last_fingerprint = fingerprint
 
-        # 保存
+        # 保存（エンコードと書き込みは背景スレッド。詰まっていればここで待つ）
         path = self.file_manager.get_image_path(self.output_dir, self.current_page + 1)
-        self.screenshot.save_image(image, path)
+        # 画像が fsync されてから記録する（記録にあるページは必ず残っている）
+        on_saved = functools.partial(self._on_page_saved, self.current_page + 1, fingerprint)
+        started = time.perf_counter()
+        try:
+            self.image_writer.submit(image, path, on_saved)
+        except Exception:
+            # 以前のページの保存に失敗している。完了処理でエラーを伝える
+            self._finish_capture()
+            return
+        self.capture_stats.record("submit", time.perf_counter() - started)
         self.captured_images.append(path)
+        if is_duplicate:
+            self._trailing_duplicates.append(path)
+        else:
+            self._trailing_duplicates = []
 
         self.current_page += 1
         self.progress_bar.setValue(self.current_page)
 
-        if self.current_page < self.total_pages:
+        if (
+            self.auto_stop_check.isChecked()
+            and len(self._trailing_duplicates) >= END_OF_BOOK_REPEATS
+        ):
+            # ページ送りしても変わらない＝本の最後まで来た
+            self.capture_stats.stopped_at_end = True
+            self._finish_capture()
+        elif self.current_page < self.total_pages:
             # 対象ウィンドウをフォアグラウンドに戻す
             self._bring_target_to_front()
             # フォーカス移動を待ってからページ送り
@@ -349,6 +585,22 @@ class MainWindow(QMainWindow):
         else:
             self._finish_capture()
 
+    def _capture_region(self) -> tuple[int, int, int, int]:
+        """キャプチャ領域 (x, y, width, height) を決定"""
+        if self.custom_area_radio.isChecked() and self.custom_region:
+            # カスタム領域を使用
+            return (
+                self.custom_region.x(),
+                self.custom_region.y(),
+                self.custom_region.width(),
+                self.custom_region.height(),
+            )
+        # ウィンドウのコンテンツ領域を使用
+        idx = self.window_combo.currentIndex()
+        window = self.windows[idx]
+        bounds = self.window_manager.get_content_bounds(window["bounds"])
+        return bounds["x"], bounds["y"], bounds["width"], bounds["height"]
+
     def _bring_target_to_front(self):
         """対象ウィンドウをフォアグラウンドに移動"""
         idx = self.window_combo.currentIndex()
@@ -359,35 +611,124 @@ class MainWindow(QMainWindow):
         """ページ送りして次のキャプチャをスケジュール"""
         if not self.is_capturing:
             return
+        started = time.perf_counter()
         self.page_navigator.next_page()
+        self.capture_stats.record("turn", time.perf_counter() - started)
         interval_ms = self.interval_slider.value() * 100
-        QTimer.singleShot(interval_ms, self._capture_page)
+        if self.adaptive_check.isChecked():
+            # 画面が次のページで落ち着くまで確認フレームを撮り続ける
+            self._settle = SettleDetector(self._last_fingerprint)
+            self._settle_started = time.monotonic()
+            QTimer.singleShot(_SETTLE_PROBE_MS, self._probe_settle)
+        else:
+            QTimer.singleShot(interval_ms, self._capture_page)
+
+    def _probe_settle(self):
+        """確認フレームを撮り、落ち着いていれば（または上限に達したら）撮影する"""
+        if not self.is_capturing:
+            return
+        elapsed = time.monotonic() - self._settle_started
+        probe = page_fingerprint(self.screenshot.capture_region(*self._capture_region()))
+        ceiling = self.interval_slider.value() / 10
+        if self._settle.feed(probe) or elapsed >= ceiling:
+            self.capture_stats.settle_times.append(elapsed)
+            self._capture_page()
+        else:
+            QTimer.singleShot(_SETTLE_PROBE_MS, self._probe_settle)
 
     def _finish_capture(self):
         """キャプチャ完了処理"""
         self.is_capturing = False
         self.start_btn.setEnabled(True)
+        self.resume_btn.setEnabled(True)
         self.finish_btn.setEnabled(False)
         self.warning_label.setVisible(False)
         self.progress_bar.setVisible(False)
 
+        # 書き出し待ちの画像がすべて保存されてから次に進む
+        try:
+            self.image_writer.close()
+        except Exception as e:
+            # 記録は完了扱いにせず閉じる（原因を取り除けば続きから再開できる）
+            if self.journal is not None:
+                self.journal.close()
+                self.journal = None
+            if self.pdf_stream is not None:
+                self.pdf_stream.close()
+                self.pdf_stream = None
+            QMessageBox.critical(
+                self, "エラー",
+                f"画像の保存に失敗しました:\n{e}\n\n"
+                "「中断したキャプチャを再開」で続きから撮影できます",
+            )
+            return
+        for seconds in self.image_writer.write_times:
+            self.capture_stats.record("save", seconds)
+
+        # 重複ページの画像を消す前に、PDF化の途中のページを描き終えておく
+        if self.pdf_stream is not None:
+            self.pdf_stream.close()
+        if self.auto_stop_check.isChecked():
+            self._drop_trailing_duplicates()
+        if self.journal is not None:
+            self.journal.finish(len(self.captured_images))
+            self.journal = None
+        if self.pdf_stream is not None:
+            self._finish_pdf_stream()
+
+        summary = self.capture_stats.summary()
+        if summary:
+            logger.info("キャプチャ統計: %s", summary)
+        logger.debug("工程ごとの平均: %s", self.capture_stats.stage_report())
+
         if self.captured_images:
             # デスクトップ通知
             from src.utils.notification import send_notification
-            send_notification(
-                "Kindle Page Capture",
-                f"キャプチャ完了: {len(self.captured_images)}ページ"
-            )
+            message = f"キャプチャ完了: {len(self.captured_images)}ページ"
+            if summary:
+                message += f"（{summary}）"
+            send_notification("Kindle Page Capture", message)
 
-            # 章分割ダイアログを表示
-            from src.ui.chapter_dialog import ChapterDialog
-            dialog = ChapterDialog(
-                self.captured_images,
-                self.output_dir,
-                self.keep_images_check.isChecked(),
-                self
+            self._show_chapter_dialog()
+
+    def _finish_pdf_stream(self):
+        """撮影中に作ったページをつなげて全ページのPDFにする"""
+        if not self.captured_images:
+            self.pdf_stream = None
+            return
+        try:
+            self.prebuilt_pdf = self.pdf_stream.finish(
+                self.captured_images, self.file_manager.get_stream_pdf_path(self.output_dir)
             )
-            dialog.exec()
+        except Exception:
+            # 出力時に画像から作り直せばよいので、撮影結果は失わない
+            logger.exception("撮影中のPDFをまとめられませんでした")
+            self.prebuilt_pdf = None
+        self.pdf_stream = None
+
+    def _show_chapter_dialog(self):
+        """章分割ダイアログを表示"""
+        from src.ui.chapter_dialog import ChapterDialog
+        dialog = ChapterDialog(
+            self.captured_images,
+            self.output_dir,
+            self.keep_images_check.isChecked(),
+            self,
+            prebuilt_pdf=self.prebuilt_pdf,
+        )
+        dialog.exec()
+
+    def _drop_trailing_duplicates(self):
+        """末尾で続いた同一ページ（最後のページの撮り直し）を取り除く"""
+        if not self._trailing_duplicates:
+            return
+        dropped = set(self._trailing_duplicates)
+        self.captured_images = [p for p in self.captured_images if p not in dropped]
+        for path in self._trailing_duplicates:
+            path.unlink(missing_ok=True)
+            discard_digest(path)
+        self.capture_stats.dropped_duplicates += len(self._trailing_duplicates)
+        self._trailing_duplicates = []
 
     def _finish_early(self):
         """キャプチャをここまでで完了"""
@@ -11,9 +11,11 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import Qt
 
+from src.ui.background_job import run_with_progress
 from src.ui.chapter_dialog import Chapter
 from src.export.pdf_splitter import PdfSplitter
 from src.export.toc_analyzer import ChapterRange
+from src.utils.workers import default_workers
 
 
 _SPLIT_HELP_TEXT = (
@@ -290,7 +292,10 @@ class PdfSplitDialog(QDialog):
     def _open_toc_analyze(self):
         """目次解析ダイアログを開き、確定したら章行を置換"""
         from src.ui.pdf_toc_analyze_dialog import PdfTocAnalyzeDialog
-        dialog = PdfTocAnalyzeDialog(self.pdf_path, self.page_count, parent=self)
+        # 同じ splitter を渡し、開いた文書（パース結果・抽出テキスト）を共有する
+        dialog = PdfTocAnalyzeDialog(
+            self.pdf_path, self.page_count, splitter=self.splitter, parent=self
+        )
         if dialog.exec() and dialog.selected_ranges:
             self._apply_toc_ranges(dialog.selected_ranges)
 
@@ -365,23 +370,44 @@ class PdfSplitDialog(QDialog):
             split_dir = self.splitter.file_manager.create_split_output_directory(
                 output_dir, self.pdf_path.stem
             )
-            output_paths = self.splitter.split(self.pdf_path, chapters, split_dir)
-
-            file_list = "\n".join(f"  - {p.name}" for p in output_paths)
-            QMessageBox.information(
-                self,
-                "完了",
-                f"PDFを分割しました。\n\n"
-                f"出力先: {split_dir}\n\n"
-                f"ファイル:\n{file_list}"
-            )
-
-            subprocess.Popen(["open", str(split_dir)])
-            self.accept()
+        except OSError as e:
+            QMessageBox.critical(self, "エラー", f"出力先を作成できません:\n{e}")
+            return
 
-        except Exception as e:
+        # 章ごとの書き出しはワーカースレッドで行い、進捗ダイアログで待つ
+        outcome = run_with_progress(
+            self, "PDF分割", "PDFを分割しています…",
+            lambda progress, is_cancelled: self.splitter.split(
+                self.pdf_path, chapters, split_dir,
+                progress=progress, is_cancelled=is_cancelled,
+                workers=default_workers(),
+            ),
+        )
+        if outcome.cancelled or outcome.error is not None:
+            # split が書いた章は消えているので、空のサブフォルダも残さない
+            try:
+                split_dir.rmdir()
+            except OSError:
+                pass
+        if outcome.cancelled:
+            return
+        if outcome.error is not None:
             QMessageBox.critical(
                 self,
                 "エラー",
-                f"PDF分割中にエラーが発生しました:\n{str(e)}"
+                f"PDF分割中にエラーが発生しました:\n{outcome.error}"
             )
+            return
+        output_paths = outcome.result
+
+        file_list = "\n".join(f"  - {p.name}" for p in output_paths)
+        QMessageBox.information(
+            self,
+            "完了",
+            f"PDFを分割しました。\n\n"
+            f"出力先: {split_dir}\n\n"
+            f"ファイル:\n{file_list}"
+        )
+
+        subprocess.Popen(["open", str(split_dir)])
+        self.accept()
@@ -14,7 +14,10 @@ from src.export.toc_analyzer import (
     ClaudeTocEngine, ChapterRange, TocEntry, compute_offset, entries_to_chapters, is_chapter,
 )
 from src.export.pdf_splitter import PdfSplitter
+from src.ui.background_job import run_with_progress
 
+# 「テキストから検出」の進捗を更新する間隔（ページ数）
+_TEXT_PROGRESS_EVERY = 16
 
 _TOC_HELP_TEXT = (
     "目次ページを読み取って、章の開始ページを自動入力する機能です。\n\n"
@@ -34,6 +37,10 @@ class _CoverDetectCancelled(Exception):
     """章扉検出のキャンセル"""
 
 
+class _TextDetectCancelled(Exception):
+    """テキストからの章検出のキャンセル"""
+
+
 class _CoverDetectWorker(QThread):
     """章扉検出をUIスレッドの外で実行する
 
@@ -291,13 +298,9 @@ class PdfTocAnalyzeDialog(QDialog):
 
     def _run_text_detect(self):
         """しおり・本文テキストから章を検出して表に出す"""
-        try:
-            result = self.splitter.detect_chapters_auto(self.pdf_path)
-        except Exception as e:
-            QMessageBox.critical(
-                self, "エラー",
-                f"テキストからの検出に失敗しました:\n{e}\n\n手動でページを入力してください。",
-            )
+        result = self._detect_text_with_progress()
+        if result is None:
+            # キャンセル・失敗は検出側で伝えている
             return
 
         if not result.has_text_layer:
@@ -345,6 +348,65 @@ class PdfTocAnalyzeDialog(QDialog):
             source_label=self._TEXT_SOURCE_LABELS.get(result.source, "テキスト"),
         )
 
+    def _detect_text_with_progress(self):
+        """ワーカースレッドで検出し、進捗ダイアログで待つ
+
+        待っている間も、本文見出しの暫定結果が出るたびに表を更新する。
+        キャンセル・失敗のときは None を返す。
+        """
+        outcome = run_with_progress(
+            self, "テキストから検出", "本文テキストから章を検出しています…",
+            self._detect_text, on_partial=self._show_partial_text_result,
+        )
+        if outcome.cancelled:
+            return None
+        if outcome.error is not None:
+            QMessageBox.critical(
+                self, "エラー",
+                f"テキストからの検出に失敗しました:\n{outcome.error}\n\n"
+                "手動でページを入力してください。",
+            )
+            return None
+        return outcome.result
+
+    def _detect_text(self, progress, is_cancelled, partial):
+        """しおり・本文テキストから章を検出する（ワーカースレッドで動く）
+
+        抽出と検出を並行させ、暫定の章が変わるたびに partial で知らせる。
+        キャンセルはページの区切りで効く（暫定の章が変わらなくても抽出を止める）。
+        """
+        def on_page(done: int, total: int):
+            if is_cancelled():
+                raise _TextDetectCancelled()
+            if done % _TEXT_PROGRESS_EVERY == 0 or done == total:
+                progress(done, total)
+
+        results = self.splitter.iter_chapters_auto(self.pdf_path, on_page=on_page)
+        try:
+            final = None
+            for result in results:
+                if is_cancelled():
+                    return None
+                if result.provisional:
+                    partial(result)
+                else:
+                    final = result
+            return final
+        finally:
+            # 途中でやめたときは抽出も止める
+            results.close()
+
+    def _show_partial_text_result(self, result):
+        """検出途中の本文見出しを表に出す（目次の印字ページは確定後にだけ使う）"""
+        if result.source != "heading":
+            return
+        chapters = self._validate_covers(result.chapters)
+        if chapters:
+            self._apply_detected_pages(
+                chapters, mode="text",
+                source_label=self._TEXT_SOURCE_LABELS[result.source],
+            )
+
     # --- 章扉から検出（目次にページ番号が無い本向け） -----------------------
 
     def _detect_chapter_covers(self) -> list[tuple[str, int]]:
@@ -0,0 +1,302 @@
+"""ページサムネイルの横一列表示（章分割ダイアログ用）
+
+ページごとにウィジェットを作ると、数百ページの本ではクリックのたびに
+全部を作り直すことになる。QListView + モデル + デリゲートで描き、
+サムネイルは画面に見えたページの分だけ読み込む。章の開始ページが
+変わったときは、変わったページだけ描き直す。
+
+読み込みはスレッドプールで行い、終わるまでは灰色の枠（プレースホルダー）を
+描く。後から要求されたページ（いま見えているページ）を先に読むので、
+スクロールしても GUI スレッドは待たされない。スクロールで見えなくなった
+ページの読み込みは、順番が来ても読まずに捨てる。
+"""
+
+import logging
+from pathlib import Path
+from typing import Callable
+
+from PyQt6.QtCore import (
+    QAbstractListModel, QCoreApplication, QModelIndex, QObject, QPoint, QRect, QRunnable, QSize,
+    Qt, QThread, QThreadPool, pyqtSignal,
+)
+from PyQt6.QtGui import QColor, QImage, QPainter, QPen, QPixmap
+from PyQt6.QtWidgets import QListView, QStyle, QStyledItemDelegate, QStyleOptionViewItem
+
+# サムネイルの表示サイズ
+THUMB_WIDTH = 100
+THUMB_HEIGHT = 140
+# 枠の内側の余白とページ番号の高さ
+_PADDING = 4
+_LABEL_HEIGHT = 16
+# サムネイルを同時に読み込む数の上限
+MAX_LOAD_THREADS = 4
+# 見えている範囲の前後この行数までは、スクロールしても読み込みを捨てない
+KEEP_MARGIN_ROWS = 8
+
+# 章の開始ページかどうか（bool）
+ChapterStartRole = Qt.ItemDataRole.UserRole + 1
+
+logger = logging.getLogger(__name__)
+
+
+class _LoadSignals(QObject):
+    # (行, 縮小画像)。読めなかったときは null の QImage
+    loaded = pyqtSignal(int, QImage)
+    # 順番が来たときには見えなくなっていて、読まなかった行
+    skipped = pyqtSignal(int)
+
+
+class _ThumbnailTask(QRunnable):
+    """1ページ分のサムネイルをプールのスレッドで読み込む"""
+
+    def __init__(
+        self,
+        row: int,
+        path: Path,
+        load: Callable[[Path], QImage],
+        wanted: Callable[[int], bool],
+        signals: _LoadSignals,
+    ):
+        super().__init__()
+        self.row = row
+        self.path = path
+        self.load = load
+        self.wanted = wanted
+        self.signals = signals
+
+    def run(self) -> None:
+        if not self.wanted(self.row):
+            self.signals.skipped.emit(self.row)
+            return
+        try:
+            image = self.load(self.path)
+        except Exception:
+            logger.warning("サムネイルを読み込めませんでした: %s", self.path, exc_info=True)
+            image = QImage()
+        self.signals.loaded.emit(self.row, image)
+
+
+class PageThumbnailModel(QAbstractListModel):
+    """ページ画像の一覧。サムネイルは表示に必要になったときに背景で読み込む
+
+    load_thumbnail はプールのスレッドから呼ばれるので QImage を返す
+    （QPixmap は GUI スレッドでしか作れない）。読み終えたページは
+    GUI スレッドで QPixmap にして dataChanged で知らせる。
+    ビューは set_visible_rows で見えている行を知らせる。それより遠い行の
+    読み込みは、順番が来た時点で捨てる（また見えたら頼み直す）。
+    """
+
+    def __init__(
+        self,
+        image_paths: list[Path],
+        load_thumbnail: Callable[[Path], QImage],
+        parent=None,
+        thread_pool: QThreadPool | None = None,
+    ):
+        super().__init__(parent)
+        self.image_paths = image_paths
+        self._load_thumbnail = load_thumbnail
+        self._pixmaps: dict[int, QPixmap] = {}
+        self._pending: set[int] = set()
+        self._chapter_starts: set[int] = set()
+        # 読み込む行の範囲（両端を含む）。None なら全行
+        self._wanted_rows: tuple[int, int] | None = None
+        if thread_pool is None:
+            thread_pool = QThreadPool(self)
+            thread_pool.setMaxThreadCount(max(1, min(MAX_LOAD_THREADS, QThread.idealThreadCount())))
+        self._pool = thread_pool
+        # 要求のたびに大きくする。プールは優先度の高い順に取り出すので、新しい要求が先になる
+        self._priority = 0
+        self._signals = _LoadSignals()
+        self._signals.loaded.connect(self._on_loaded)
+        self._signals.skipped.connect(self._on_skipped)
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.image_paths)
+
+    def data(self, index: QModelIndex, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        if role == Qt.ItemDataRole.DisplayRole:
+            return f"p.{row + 1}"
+        if role == Qt.ItemDataRole.DecorationRole:
+            return self.thumbnail(row)
+        if role == ChapterStartRole:
+            return row in self._chapter_starts
+        return None
+
+    def thumbnail(self, row: int) -> QPixmap | None:
+        """row のサムネイル。まだ無ければ読み込みを頼んで None を返す"""
+        pixmap = self._pixmaps.get(row)
+        if pixmap is None:
+            self.request(row)
+        return pixmap
+
+    def request(self, row: int) -> None:
+        """row の読み込みを頼む（読み込み済み・依頼済みなら何もしない）"""
+        if row in self._pixmaps or row in self._pending:
+            return
+        self._pending.add(row)
+        self._priority += 1
+        task = _ThumbnailTask(
+            row, self.image_paths[row], self._load_thumbnail, self.is_wanted, self._signals
+        )
+        self._pool.start(task, self._priority)
+
+    def is_loaded(self, row: int) -> bool:
+        return row in self._pixmaps
+
+    def set_visible_rows(self, first: int, last: int) -> None:
+        """見えている行（両端を含む）。前後 KEEP_MARGIN_ROWS 行より遠い読み込みは捨てる"""
+        self._wanted_rows = (first - KEEP_MARGIN_ROWS, last + KEEP_MARGIN_ROWS)
+
+    def is_wanted(self, row: int) -> bool:
+        """row をいま読み込むべきか（プールのスレッドからも呼ばれる）"""
+        wanted = self._wanted_rows
+        return wanted is None or wanted[0] <= row <= wanted[1]
+
+    def cancel_pending(self) -> None:
+        """まだ始まっていない読み込みを取りやめる"""
+        self._pool.clear()
+        self._pending.clear()
+
+    def wait_for_pending(self, msecs: int = -1) -> bool:
+        """依頼済みの読み込みが終わるまで待ち、結果をモデルに反映する"""
+        done = self._pool.waitForDone(msecs)
+        # 読み込み結果は GUI スレッドへのキューに積まれているので、ここで受け取る
+        QCoreApplication.processEvents()
+        return done
+
+    def _on_skipped(self, row: int) -> None:
+        self._pending.discard(row)
+        # 捨てる判断をした後に、またスクロールして見えていることがある
+        if self.is_wanted(row):
+            self.request(row)
+
+    def _on_loaded(self, row: int, image: QImage) -> None:
+        self._pending.discard(row)
+        self._pixmaps[row] = QPixmap.fromImage(image)
+        index = self.index(row)
+        self.dataChanged.emit(index, index, [Qt.ItemDataRole.DecorationRole])
+
+    def set_chapter_starts(self, starts: set[int]) -> None:
+        """章の開始ページを差し替え、表示が変わるページだけ描き直させる"""
+        changed = starts ^ self._chapter_starts
+        self._chapter_starts = set(starts)
+        for row in sorted(changed):
+            if 0 <= row < len(self.image_paths):
+                index = self.index(row)
+                self.dataChanged.emit(index, index, [ChapterStartRole])
+
+
+class PageThumbnailDelegate(QStyledItemDelegate):
+    """サムネイル1枚（枠・画像・ページ番号）を描く"""
+
+    def sizeHint(self, option, index) -> QSize:
+        return QSize(
+            THUMB_WIDTH + _PADDING * 2,
+            THUMB_HEIGHT + _LABEL_HEIGHT + _PADDING * 2,
+        )
+
+    def paint(self, painter: QPainter, option: QStyleOptionViewItem, index: QModelIndex):
+        painter.save()
+        rect = option.rect
+        is_start = bool(index.data(ChapterStartRole))
+        hovered = bool(option.state & QStyle.StateFlag.State_MouseOver)
+
+        # 章の開始ページは青、それ以外は白（ホバーで薄いグレー）
+        if is_start:
+            background, border, width = QColor("#e3f2fd"), QColor("#1976d2"), 2
+        elif hovered:
+            background, border, width = QColor("#f5f5f5"), QColor("#999999"), 1
+        else:
+            background, border, width = QColor("#ffffff"), QColor("#cccccc"), 1
+        painter.fillRect(rect, background)
+        painter.setPen(QPen(border, width))
+        painter.drawRect(rect.adjusted(0, 0, -1, -1))
+
+        image_area = QRect(
+            rect.x() + _PADDING, rect.y() + _PADDING, THUMB_WIDTH, THUMB_HEIGHT
+        )
+        pixmap = index.data(Qt.ItemDataRole.DecorationRole)
+        if pixmap is None:
+            # 読み込み中のプレースホルダー
+            painter.fillRect(image_area, QColor("#eeeeee"))
+        elif not pixmap.isNull():
+            x = image_area.x() + (image_area.width() - pixmap.width()) // 2
+            y = image_area.y() + (image_area.height() - pixmap.height()) // 2
+            painter.drawPixmap(x, y, pixmap)
+
+        label_area = QRect(
+            rect.x(), rect.bottom() - _PADDING - _LABEL_HEIGHT, rect.width(), _LABEL_HEIGHT
+        )
+        font = painter.font()
+        font.setPixelSize(11)
+        painter.setFont(font)
+        painter.setPen(QColor("#000000"))
+        painter.drawText(label_area, Qt.AlignmentFlag.AlignCenter, index.data())
+        painter.restore()
+
+
+class ThumbnailStrip(QListView):
+    """サムネイルを横一列に並べるビュー。クリックしたページを page_clicked で知らせる"""
+
+    page_clicked = pyqtSignal(int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setFlow(QListView.Flow.LeftToRight)
+        self.setWrapping(False)
+        # 全ページ同じ大きさなので、見えていないページの大きさを問い合わせない
+        self.setUniformItemSizes(True)
+        self.setSpacing(4)
+        self.setMouseTracking(True)
+        self.setSelectionMode(QListView.SelectionMode.NoSelection)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOn)
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.setMinimumHeight(THUMB_HEIGHT + _LABEL_HEIGHT + _PADDING * 2 + 40)
+        self.setItemDelegate(PageThumbnailDelegate(self))
+        self.clicked.connect(lambda index: self.page_clicked.emit(index.row()))
+        self.horizontalScrollBar().valueChanged.connect(self._update_visible_rows)
+
+    def setModel(self, model) -> None:
+        super().setModel(model)
+        self._update_visible_rows()
+
+    def resizeEvent(self, event) -> None:
+        super().resizeEvent(event)
+        self._update_visible_rows()
+
+    def visible_rows(self) -> tuple[int, int] | None:
+        """いま見えている行の範囲（両端を含む）。行が無ければ None"""
+        model = self.model()
+        if model is None or model.rowCount() == 0:
+            return None
+        rect = self.viewport().rect()
+        first = self._row_near(rect.left(), rect.center().y(), 1)
+        last = self._row_near(rect.right(), rect.center().y(), -1)
+        return (
+            first if first is not None else 0,
+            last if last is not None else model.rowCount() - 1,
+        )
+
+    def _row_near(self, x: int, y: int, step: int) -> int | None:
+        """x から step 方向に、ページ間の隙間を越えた先にある行"""
+        for dx in range(0, self.spacing() * 2 + 2):
+            index = self.indexAt(QPoint(x + dx * step, y))
+            if index.isValid():
+                return index.row()
+        return None
+
+    def _update_visible_rows(self) -> None:
+        model = self.model()
+        rows = self.visible_rows()
+        if isinstance(model, PageThumbnailModel) and rows is not None:
+            model.set_visible_rows(*rows)
+
+    def scroll_to_page(self, row: int) -> None:
+        """row のサムネイルが見えるようにスクロールする"""
+        model = self.model()
+        if model is not None and 0 <= row < model.rowCount():
+            self.scrollTo(model.index(row, 0), QListView.ScrollHint.PositionAtCenter)
@@ -0,0 +1,125 @@
+"""アプリのキャッシュ置き場
+
+消えても作り直せるもの（抽出テキストなど）を置く。既定は macOS なら
+~/Library/Caches/auto-page-capture、それ以外は XDG_CACHE_HOME（無ければ
+~/.cache）の下。環境変数 AUTO_PAGE_CAPTURE_CACHE_DIR で差し替えられる。
+"""
+
+import os
+import sys
+import threading
+from pathlib import Path
+
+_APP_NAME = "auto-page-capture"
+CACHE_DIR_ENV = "AUTO_PAGE_CAPTURE_CACHE_DIR"
+
+# 上限を超えたら、上限のこの割合まで減らす（上限ぎりぎりで毎回消すことにならないよう）
+_EVICT_TARGET_RATIO = 0.9
+# この回数書くごとに合計を数え直す（他のプロセスが書いた分や消えた分のずれを直す）
+RESCAN_EVERY = 256
+
+_budgets: dict[tuple[Path, str], "SizeBudget"] = {}
+_budgets_lock = threading.Lock()
+
+
+def user_cache_dir(name: str) -> Path:
+    """用途 name ごとのキャッシュディレクトリ（無ければ作る）"""
+    override = os.environ.get(CACHE_DIR_ENV)
+    if override:
+        base = Path(override)
+    elif sys.platform == "darwin":
+        base = Path.home() / "Library" / "Caches" / _APP_NAME
+    else:
+        base = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / _APP_NAME
+    directory = base / name
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory
+
+
+def touch(path: Path) -> None:
+    """使ったことを記録する（evict_to_size は更新日時の古い順に消す）"""
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+
+def file_size(path: Path) -> int:
+    """ファイルの大きさ（無ければ0）"""
+    try:
+        return path.stat().st_size
+    except OSError:
+        return 0
+
+
+def evict_to_size(directory: Path, max_bytes: int, pattern: str = "*") -> int:
+    """合計が max_bytes 以下になるまで、長く使っていないファイルから消す
+
+    消したファイル数を返す。
+    """
+    return _evict(directory, max_bytes, pattern)[0]
+
+
+def _evict(directory: Path, max_bytes: int, pattern: str) -> tuple[int, int]:
+    """evict_to_size の本体。(消したファイル数, 残りの合計) を返す"""
+    entries = []
+    for path in directory.glob(pattern):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, path in sorted(entries, key=lambda e: e[0]):
+        if total <= max_bytes:
+            break
+        try:
+            path.unlink()
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+    return removed, total
+
+
+class SizeBudget:
+    """キャッシュディレクトリの合計サイズを数えておき、上限を超えたときだけ消す
+
+    evict_to_size はディレクトリ全体を stat するので、書くたびに呼ぶと
+    キャッシュが育つほど書き込みが遅くなる。合計は最初に1回だけ数え、
+    あとは書いたファイルの増減を足していく。同じディレクトリのキャッシュどうしで
+    共有するので、size_budget で取り出す。
+    """
+
+    def __init__(self, directory: Path, pattern: str = "*"):
+        self.directory = directory
+        self.pattern = pattern
+        self._total: int | None = None
+        self._writes = 0
+        self._lock = threading.Lock()
+
+    def replace(self, tmp_path: Path, path: Path, max_bytes: int) -> None:
+        """書き終えた tmp_path を path に置き換え、上限を超えていれば古いものから消す"""
+        old_size = file_size(path)
+        os.replace(tmp_path, path)
+        new_size = file_size(path)
+        with self._lock:
+            self._writes += 1
+            if self._total is None or self._writes % RESCAN_EVERY == 0:
+                self._total = _evict(self.directory, max_bytes, self.pattern)[1]
+            else:
+                self._total += new_size - old_size
+            if self._total > max_bytes:
+                target = int(max_bytes * _EVICT_TARGET_RATIO)
+                self._total = _evict(self.directory, target, self.pattern)[1]
+
+
+def size_budget(directory: Path, pattern: str = "*") -> SizeBudget:
+    """directory と pattern ごとに1つの SizeBudget"""
+    key = (directory.absolute(), pattern)
+    with _budgets_lock:
+        budget = _budgets.get(key)
+        if budget is None:
+            budget = _budgets[key] = SizeBudget(directory, pattern)
+        return budget
@@ -0,0 +1,78 @@
+"""ファイル内容のハッシュ"""
+
+import hashlib
+import threading
+from pathlib import Path
+
+# 読み込み単位（大きなPDFでもメモリに全体を載せない）
+_CHUNK_SIZE = 1024 * 1024
+# write_digest がファイルの隣に置く控えの拡張子
+DIGEST_SUFFIX = ".sha256"
+
+# パス → (大きさ, 更新日時 ns, ハッシュ)。このプロセスで一度求めた値
+_known_digests: dict[str, tuple[int, int, str]] = {}
+_known_digests_lock = threading.Lock()
+
+
+def file_sha256(path: Path) -> str:
+    """ファイル内容の SHA-256 を16進文字列で返す
+
+    キャッシュのキーに使う。パスや更新日時ではなく内容で引くので、
+    同じ画像・PDFを別の場所から開いても同じ結果を使い回せる。
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _digest_path(path: Path) -> Path:
+    return path.with_name(path.name + DIGEST_SUFFIX)
+
+
+def write_digest(path: Path, digest: str) -> None:
+    """書いたばかりの path の内容ハッシュを隣のファイルに控える
+
+    書いた側はハッシュを知っているので、あとで cached_file_sha256 が
+    ファイル全体を読み直さずに済む。
+    """
+    stat = path.stat()
+    _digest_path(path).write_text(f"{digest} {stat.st_size} {stat.st_mtime_ns}\n")
+    with _known_digests_lock:
+        _known_digests[str(path)] = (stat.st_size, stat.st_mtime_ns, digest)
+
+
+def discard_digest(path: Path) -> None:
+    """write_digest の控えを消す（ページを消すときに一緒に呼ぶ）"""
+    _digest_path(path).unlink(missing_ok=True)
+    with _known_digests_lock:
+        _known_digests.pop(str(path), None)
+
+
+def cached_file_sha256(path: Path) -> str:
+    """file_sha256 と同じ値。ファイルが変わっていなければ読み直さない
+
+    write_digest の控えか、このプロセスで前に求めた値を、大きさと更新日時が
+    今のファイルと同じときだけ使う。
+    """
+    stat = path.stat()
+    with _known_digests_lock:
+        known = _known_digests.get(str(path))
+    if known is not None and known[:2] == (stat.st_size, stat.st_mtime_ns):
+        return known[2]
+    digest = _read_digest(path, stat.st_size, stat.st_mtime_ns) or file_sha256(path)
+    with _known_digests_lock:
+        _known_digests[str(path)] = (stat.st_size, stat.st_mtime_ns, digest)
+    return digest
+
+
+def _read_digest(path: Path, size: int, mtime_ns: int) -> str | None:
+    """write_digest の控え。無いか、ファイルが書き換わっていれば None"""
+    try:
+        fields = _digest_path(path).read_text().split()
+    except (OSError, UnicodeDecodeError):
+        return None
+    if len(fields) != 3 or fields[1:] != [str(size), str(mtime_ns)]:
+        return None
+    return fields[0]
@@ -0,0 +1,11 @@
+"""並列処理の既定ワーカー数"""
+
+import os
+
+
+def default_workers() -> int:
+    """プロセスプールの既定ワーカー数（UIのために1コア残す）
+
+    OCR・テキスト抽出・章PDFの書き出しで共通に使う。
+    """
+    return max(1, (os.cpu_count() or 1) - 1)
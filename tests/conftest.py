@@ -41,6 +41,14 @@ def block_real_claude_cli(monkeypatch):
     monkeypatch.setattr(subprocess, "Popen", guarded_popen)
 
 
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(monkeypatch, tmp_path_factory):
+    """キャッシュをユーザーの実ディレクトリに書かせない"""
+    from src.utils.cache_dir import CACHE_DIR_ENV
+
+    monkeypatch.setenv(CACHE_DIR_ENV, str(tmp_path_factory.mktemp("cache")))
+
+
 @pytest.fixture(autouse=True)
 def block_modal_dialogs(monkeypatch):
     """未パッチのモーダルダイアログでテストが止まらないようにする
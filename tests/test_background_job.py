@@ -0,0 +1,107 @@
+# tests/test_background_job.py
+import sys
+import threading
+import time
+
+import pytest
+from PyQt6.QtCore import QTimer
+from PyQt6.QtWidgets import QApplication
+
+from src.ui.background_job import (
+    BackgroundJob, format_duration, format_rate, run_with_progress,
+)
+
+
+@pytest.fixture(scope="module")
+def qapp():
+    app = QApplication.instance() or QApplication(sys.argv)
+    yield app
+
+
+def test_format_duration():
+    assert format_duration(45) == "45秒"
+    assert format_duration(185) == "3分05秒"
+    assert format_duration(4320) == "1時間12分"
+
+
+def test_format_rate_shows_speed_and_eta():
+    assert format_rate(0, 400, 0.0) == "0/400 ページ"
+    assert format_rate(100, 400, 50.0) == "100/400 ページ ・ 2.0 ページ/秒 ・ 残り約2分30秒"
+    assert format_rate(400, 400, 100.0) == "400/400 ページ ・ 4.0 ページ/秒"
+
+
+def test_job_outcome_for_success_failure_and_cancel(qapp):
+    """成功・失敗・キャンセル後の例外を outcome に残す"""
+    job = BackgroundJob(lambda progress, is_cancelled: "ok")
+    job.run()
+    assert job.outcome.result == "ok" and job.outcome.error is None
+
+    def fail(progress, is_cancelled):
+        raise RuntimeError("壊れたPDF")
+
+    job = BackgroundJob(fail)
+    job.run()
+    assert job.outcome.error == "壊れたPDF"
+
+    job = BackgroundJob(fail)
+    job.cancel()
+    job.run()
+    assert job.outcome.cancelled and job.outcome.error is None
+
+
+def test_run_with_progress_runs_off_gui_thread(qapp):
+    """ワーカースレッドで実行し、進捗を受け取りながら結果を返す"""
+    threads = []
+
+    def work(progress, is_cancelled):
+        threads.append(threading.current_thread())
+        for done in range(1, 4):
+            progress(done, 3)
+        return "done"
+
+    outcome = run_with_progress(None, "テスト", "処理しています…", work)
+    assert outcome.result == "done"
+    assert threads and threads[0] is not threading.main_thread()
+
+
+def test_cancel_button_stops_work_and_waits_for_it(qapp):
+    """キャンセルを押すと work に伝わり、work が戻ってから返る"""
+    cleaned = []
+
+    def work(progress, is_cancelled):
+        for _ in range(500):
+            if is_cancelled():
+                cleaned.append(True)
+                raise RuntimeError("中止")
+            time.sleep(0.01)
+        return "finished"
+
+    def press_cancel():
+        dialog = QApplication.activeModalWidget()
+        if dialog is None:
+            QTimer.singleShot(20, press_cancel)
+            return
+        dialog.cancel()
+
+    QTimer.singleShot(50, press_cancel)
+    outcome = run_with_progress(None, "テスト", "処理しています…", work)
+    assert outcome.cancelled
+    assert cleaned == [True]
+
+
+def test_partial_results_arrive_on_gui_thread_before_return(qapp):
+    """途中結果は GUI スレッドに届き、成功時は閉じるときの canceled で中止扱いにならない"""
+    received = []
+
+    def work(progress, is_cancelled, partial):
+        for step in range(3):
+            partial(step)
+        return "done"
+
+    def on_partial(result):
+        received.append((result, threading.current_thread()))
+
+    outcome = run_with_progress(None, "テスト", "処理しています…", work, on_partial=on_partial)
+    assert outcome.result == "done" and not outcome.cancelled
+    assert [result for result, _ in received] == [0, 1, 2]
+    assert all(thread is threading.main_thread() for _, thread in received)
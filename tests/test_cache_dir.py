@@ -0,0 +1,57 @@
+# tests/test_cache_dir.py
+import os
+
+from src.utils import cache_dir
+from src.utils.cache_dir import CACHE_DIR_ENV, evict_to_size, size_budget, user_cache_dir
+
+
+def test_env_override_and_subdirectory_is_created(tmp_path, monkeypatch):
+    """環境変数の場所の下に用途別のディレクトリを作る"""
+    monkeypatch.setenv(CACHE_DIR_ENV, str(tmp_path))
+    directory = user_cache_dir("page_texts")
+    assert directory == tmp_path / "page_texts"
+    assert directory.is_dir()
+
+
+def test_evict_removes_oldest_until_under_limit(tmp_path):
+    """更新日時の古い順に、合計が上限以下になるまで消す"""
+    for i, name in enumerate(["a", "b", "c"]):
+        path = tmp_path / name
+        path.write_bytes(b"x" * 100)
+        os.utime(path, (i, i))
+    assert evict_to_size(tmp_path, 150) == 2
+    assert [p.name for p in tmp_path.iterdir()] == ["c"]
+    assert evict_to_size(tmp_path, 150) == 0
+
+
+def _write(budget, directory, name, size, max_bytes):
+    tmp_path = directory / f"{name}.tmp"
+    tmp_path.write_bytes(b"x" * size)
+    budget.replace(tmp_path, directory / f"{name}.bin", max_bytes)
+
+
+def test_budget_scans_directory_only_when_over_limit(tmp_path, monkeypatch):
+    """合計は最初に1回だけ数え、上限を超えるまではディレクトリを見ない"""
+    scans = []
+    real_evict = cache_dir._evict
+    monkeypatch.setattr(
+        cache_dir, "_evict", lambda *args: scans.append(args) or real_evict(*args)
+    )
+    budget = size_budget(tmp_path, "*.bin")
+    for i in range(5):
+        _write(budget, tmp_path, f"f{i}", 100, 1000)
+    assert len(scans) == 1
+
+    _write(budget, tmp_path, "f0", 100, 1000)  # 同じ名前の上書きは増えない
+    assert len(scans) == 1
+
+    for i in range(5, 11):
+        _write(budget, tmp_path, f"f{i}", 100, 1000)
+    assert len(scans) == 2
+    assert sum(p.stat().st_size for p in tmp_path.glob("*.bin")) <= 900
+
+
+def test_budget_is_shared_per_directory(tmp_path):
+    """同じディレクトリとパターンなら同じ SizeBudget を使う"""
+    assert size_budget(tmp_path, "*.bin") is size_budget(tmp_path, "*.bin")
+    assert size_budget(tmp_path, "*.bin") is not size_budget(tmp_path, "*.png")
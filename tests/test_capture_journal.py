@@ -0,0 +1,81 @@
+# tests/test_capture_journal.py
+import json
+
+from src.export.capture_journal import CaptureJournal, load_journal
+
+
+def _images(tmp_path, count):
+    images_dir = tmp_path / "images"
+    images_dir.mkdir()
+    paths = []
+    for i in range(1, count + 1):
+        path = images_dir / f"page_{i:03d}.png"
+        path.write_bytes(b"png")
+        paths.append(path)
+    return images_dir, paths
+
+
+def test_round_trip_restores_settings_and_pages(tmp_path):
+    """撮影設定と保存済みページ（指紋つき）を読み戻せる"""
+    images_dir, paths = _images(tmp_path, 2)
+    journal = CaptureJournal(tmp_path / "session.jsonl")
+    journal.write_session({"direction": "left", "total_pages": 300})
+    journal.record_page(1, paths[0], b"\x01\x02")
+    journal.record_page(2, paths[1], None)
+    journal.close()
+
+    session = load_journal(tmp_path / "session.jsonl", images_dir)
+    assert session.settings == {"direction": "left", "total_pages": 300}
+    assert [p.path for p in session.pages] == paths
+    assert session.pages[0].fingerprint == b"\x01\x02"
+    assert session.pages[1].fingerprint is None
+    assert session.next_page == 3
+    assert session.finished is False
+
+
+def test_finish_marks_session_complete(tmp_path):
+    """完了の記録があれば finished になる"""
+    images_dir, paths = _images(tmp_path, 1)
+    journal = CaptureJournal(tmp_path / "session.jsonl")
+    journal.write_session({})
+    journal.record_page(1, paths[0], None)
+    journal.finish(1)
+    assert load_journal(tmp_path / "session.jsonl", images_dir).finished is True
+
+
+def test_torn_last_line_and_missing_images_are_ignored(tmp_path):
+    """書きかけの行は読み飛ばし、画像が欠けたところから先は採らない"""
+    images_dir, paths = _images(tmp_path, 3)
+    journal = CaptureJournal(tmp_path / "session.jsonl")
+    journal.write_session({})
+    for i, path in enumerate(paths, start=1):
+        journal.record_page(i, path, None)
+    journal.close()
+    paths[1].unlink()
+    with open(tmp_path / "session.jsonl", "a", encoding="utf-8") as f:
+        f.write('{"type": "page", "page": 4, "fi')
+
+    session = load_journal(tmp_path / "session.jsonl", images_dir)
+    assert [p.page for p in session.pages] == [1]
+
+
+def test_sync_is_batched(tmp_path, monkeypatch):
+    """ページの記録は sync_every 件ごとにまとめて fsync する"""
+    synced = []
+    monkeypatch.setattr("src.export.capture_journal.os.fsync", synced.append)
+    images_dir, paths = _images(tmp_path, 1)
+    journal = CaptureJournal(tmp_path / "session.jsonl", sync_every=4)
+    journal.write_session({})
+    for i in range(1, 9):
+        journal.record_page(i, paths[0], None)
+    assert len(synced) == 3  # 設定行 + 4件ごとに2回
+    journal.close()
+
+
+def test_missing_or_unknown_version_is_not_resumable(tmp_path):
+    """記録が無い・形式が違うときは None"""
+    assert load_journal(tmp_path / "session.jsonl", tmp_path) is None
+    (tmp_path / "session.jsonl").write_text(
+        json.dumps({"type": "session", "version": 999}) + "\n", encoding="utf-8"
+    )
+    assert load_journal(tmp_path / "session.jsonl", tmp_path) is None
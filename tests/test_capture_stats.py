@@ -0,0 +1,40 @@
+# tests/test_capture_stats.py
+from src.capture.capture_stats import CaptureStats
+
+
+def test_average_settle_time():
+    """待ち時間の平均を秒で返し、要約に含める"""
+    stats = CaptureStats(settle_times=[0.2, 0.4])
+    assert abs(stats.average_settle - 0.3) < 1e-9
+    assert "0.30秒" in stats.summary()
+
+
+def test_empty_stats_have_no_summary():
+    """何も測っていなければ要約は空"""
+    stats = CaptureStats()
+    assert stats.average_settle is None
+    assert stats.summary() == ""
+
+
+def test_summary_reports_end_of_book_and_dropped_pages():
+    """自動停止と重複削除を要約に含める"""
+    stats = CaptureStats(stopped_at_end=True, dropped_duplicates=3)
+    summary = stats.summary()
+    assert "最後のページ" in summary
+    assert "3ページ" in summary
+
+
+def test_summary_reports_turn_retries():
+    """ページ送りの再試行回数を要約に含める"""
+    assert "再試行 2回" in CaptureStats(turn_retries=2).summary()
+
+
+def test_stage_report_averages_in_milliseconds():
+    """工程ごとの平均をミリ秒で並べ、記録の無い工程は出さない"""
+    stats = CaptureStats()
+    stats.record("grab", 0.010)
+    stats.record("grab", 0.030)
+    stats.record("save", 0.005)
+    assert abs(stats.stage_average("grab") - 0.02) < 1e-9
+    assert stats.stage_average("turn") is None
+    assert stats.stage_report() == "撮影 20.0ms / PNG保存 5.0ms"
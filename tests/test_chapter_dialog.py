@@ -36,7 +36,8 @@ def test_ocr_checkbox_default_on_and_forwarded(qapp, image_paths, monkeypatch):
         monkeypatch.setattr(
             dialog.pdf_generator,
             "generate",
-            lambda paths, out, ocr=False, ocr_engine=None: calls.append(ocr),
+            lambda paths, out, ocr=False, ocr_engine=None, **kwargs:
+            calls.append(ocr) or out.write_bytes(b"%PDF"),
         )
         dialog.merge_check.setChecked(True)
         dialog.chapter_pdf_check.setChecked(False)
@@ -60,6 +61,37 @@ def test_ocr_checkbox_default_on_and_forwarded(qapp, image_paths, monkeypatch):
         assert popen_args[0][0] == "open"
 
 
+def test_output_options_are_read_on_gui_thread(qapp, image_paths, monkeypatch):
+    """出力の選択は GUI スレッドで読み、書き出しスレッドではウィジェットに触れない"""
+    import threading
+
+    with tempfile.TemporaryDirectory() as outdir:
+        dialog = ChapterDialog(image_paths, Path(outdir), keep_images=True)
+        dialog.merge_check.setChecked(True)
+        dialog.chapter_pdf_check.setChecked(False)
+        readers = []
+        for check in (dialog.ocr_check, dialog.merge_check, dialog.chapter_pdf_check):
+            monkeypatch.setattr(
+                check, "isChecked",
+                lambda checked=check.isChecked(): readers.append(threading.current_thread())
+                or checked,
+            )
+        generated = []
+        monkeypatch.setattr(
+            dialog.pdf_generator, "generate",
+            lambda paths, out, ocr=False, **kwargs:
+            generated.append(ocr) or out.write_bytes(b"%PDF"),
+        )
+        monkeypatch.setattr("src.ui.chapter_dialog.QMessageBox.information", lambda *a, **k: None)
+        monkeypatch.setattr("src.utils.notification.send_notification", lambda *a, **k: None)
+        monkeypatch.setattr("src.ui.chapter_dialog.subprocess.Popen", lambda *a, **k: None)
+        monkeypatch.setattr(dialog, "accept", lambda: None)
+
+        dialog._export_pdfs()
+        assert generated == [True]
+        assert readers and all(t is threading.main_thread() for t in readers)
+
+
 from src.export.toc_analyzer import ChapterRange
 
 
@@ -78,3 +110,266 @@ def test_apply_toc_ranges_replaces_chapters(qapp, image_paths):
         assert dialog.chapters[1].start == 1 and dialog.chapters[1].end == 1
         # 章リスト表示も更新される
         assert dialog.chapter_list.count() == 2
+
+
+def test_chapter_pdfs_are_sliced_from_merged(qapp, image_paths, monkeypatch):
+    """結合と章別の両方を出力するとき、画像からの生成は結合PDFの1回だけ"""
+    from pypdf import PdfReader
+
+    with tempfile.TemporaryDirectory() as outdir:
+        dialog = ChapterDialog(image_paths, Path(outdir), keep_images=True)
+        dialog._apply_toc_ranges([ChapterRange("前半", 0, 0), ChapterRange("後半", 1, 1)])
+
+        generated = []
+        real_generate = dialog.pdf_generator.generate
+
+        def spy_generate(paths, out, ocr=False, ocr_engine=None, **kwargs):
+            generated.append(out.name)
+            real_generate(paths, out, ocr=ocr, ocr_engine=ocr_engine, **kwargs)
+
+        monkeypatch.setattr(dialog.pdf_generator, "generate", spy_generate)
+        monkeypatch.setattr("src.utils.notification.send_notification", lambda *a, **k: None)
+        monkeypatch.setattr("src.ui.chapter_dialog.subprocess.Popen", lambda *a, **k: None)
+        monkeypatch.setattr(dialog, "accept", lambda: None)
+        dialog.merge_check.setChecked(True)
+        dialog.chapter_pdf_check.setChecked(True)
+        dialog.ocr_check.setChecked(False)
+
+        dialog._export_pdfs()
+
+        # 結合PDFは一時ファイルに作り、章PDFを切り出し終えてから置き換える
+        assert generated == ["merged.pdf.part"]
+        assert (Path(outdir) / "merged.pdf").exists()
+        chapter_pdfs = sorted(Path(outdir).glob("chapter_*.pdf"))
+        assert [p.name for p in chapter_pdfs] == ["chapter_01_前半.pdf", "chapter_02_後半.pdf"]
+        assert [len(PdfReader(str(p)).pages) for p in chapter_pdfs] == [1, 1]
+
+
+def test_prebuilt_pdf_is_used_instead_of_regenerating(qapp, image_paths, monkeypatch):
+    """撮影中に作ったPDFがあれば、画像からは作らずに結合PDFとして使い、章はそこから切り出す"""
+    from pypdf import PdfReader, PdfWriter
+
+    with tempfile.TemporaryDirectory() as outdir:
+        prebuilt = Path(outdir) / "images" / "stream.pdf"
+        prebuilt.parent.mkdir()
+        writer = PdfWriter()
+        for _ in image_paths:
+            writer.add_blank_page(width=50, height=50)
+        with open(prebuilt, "wb") as f:
+            writer.write(f)
+
+        dialog = ChapterDialog(image_paths, Path(outdir), keep_images=True, prebuilt_pdf=prebuilt)
+        dialog._apply_toc_ranges([ChapterRange("前半", 0, 0), ChapterRange("後半", 1, 1)])
+        generated = []
+        monkeypatch.setattr(dialog.pdf_generator, "generate", lambda *a, **k: generated.append(a))
+        monkeypatch.setattr("src.utils.notification.send_notification", lambda *a, **k: None)
+        monkeypatch.setattr("src.ui.chapter_dialog.subprocess.Popen", lambda *a, **k: None)
+        monkeypatch.setattr(dialog, "accept", lambda: None)
+        dialog.merge_check.setChecked(True)
+        dialog.chapter_pdf_check.setChecked(True)
+
+        dialog._export_pdfs()
+
+        assert generated == []
+        assert len(PdfReader(str(Path(outdir) / "merged.pdf")).pages) == 2
+        assert len(sorted(Path(outdir).glob("chapter_*.pdf"))) == 2
+        assert not prebuilt.exists()
+
+
+def test_prebuilt_pdf_is_ignored_without_ocr(qapp, image_paths, monkeypatch):
+    """OCRしない出力では、OCR付きの撮影中PDFは使わずに画像から作る"""
+    with tempfile.TemporaryDirectory() as outdir:
+        prebuilt = Path(outdir) / "stream.pdf"
+        prebuilt.write_bytes(b"%PDF")
+        dialog = ChapterDialog(image_paths, Path(outdir), keep_images=True, prebuilt_pdf=prebuilt)
+        generated = []
+        monkeypatch.setattr(
+            dialog.pdf_generator, "generate",
+            lambda paths, out, ocr=False, ocr_engine=None, **kwargs:
+            generated.append(out.name) or out.write_bytes(b"%PDF"),
+        )
+        monkeypatch.setattr("src.utils.notification.send_notification", lambda *a, **k: None)
+        monkeypatch.setattr("src.ui.chapter_dialog.subprocess.Popen", lambda *a, **k: None)
+        monkeypatch.setattr(dialog, "accept", lambda: None)
+        dialog.merge_check.setChecked(True)
+        dialog.chapter_pdf_check.setChecked(False)
+        dialog.ocr_check.setChecked(False)
+
+        dialog._export_pdfs()
+
+        assert generated == ["merged.pdf.part"]
+        assert prebuilt.exists()
+
+
+def test_reopening_dialog_reads_thumbnails_from_disk_cache(qapp, image_paths, monkeypatch):
+    """同じ撮影フォルダを開き直したら、サムネイルを縮小し直さない"""
+    from PyQt6.QtGui import QImage
+
+    with tempfile.TemporaryDirectory() as outdir:
+        first = ChapterDialog(image_paths, Path(outdir), keep_images=True)
+        for row in range(len(image_paths)):
+            first.thumbnail_model.request(row)
+        first.thumbnail_model.wait_for_pending()
+
+        def fail_scale(*args, **kwargs):
+            raise AssertionError("縮小し直した")
+
+        monkeypatch.setattr(QImage, "scaled", fail_scale)
+        dialog = ChapterDialog(image_paths, Path(outdir), keep_images=True)
+        for row in range(len(image_paths)):
+            dialog.thumbnail_model.request(row)
+        dialog.thumbnail_model.wait_for_pending()
+        for row in range(len(image_paths)):
+            assert not dialog.thumbnail_model.thumbnail(row).isNull()
+
+
+def test_thumbnails_load_without_cache_dir(qapp, image_paths, monkeypatch, tmp_path):
+    """キャッシュ置き場を作れなくても、ダイアログを開いてサムネイルを出せる"""
+    from src.utils.cache_dir import CACHE_DIR_ENV
+
+    blocker = tmp_path / "blocker"
+    blocker.write_text("")
+    monkeypatch.setenv(CACHE_DIR_ENV, str(blocker / "cache"))
+    dialog = ChapterDialog(image_paths, tmp_path / "out", keep_images=True)
+    assert dialog.thumbnail_cache is None
+    for row in range(len(image_paths)):
+        dialog.thumbnail_model.request(row)
+    dialog.thumbnail_model.wait_for_pending()
+    for row in range(len(image_paths)):
+        assert not dialog.thumbnail_model.thumbnail(row).isNull()
+
+
+def test_thumbnail_click_toggles_chapter_and_repaints_only_that_page(qapp, monkeypatch):
+    """サムネイルのクリックで章を分け、描き直すのはそのページだけ"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        paths = []
+        for i in range(30):
+            p = Path(tmpdir) / f"page_{i}.png"
+            Image.new("RGB", (60, 80), "white").save(p, "PNG")
+            paths.append(p)
+        dialog = ChapterDialog(paths, Path(tmpdir), keep_images=True)
+        changed = []
+        dialog.thumbnail_model.dataChanged.connect(
+            lambda top, bottom, roles: changed.append((top.row(), bottom.row()))
+        )
+
+        dialog.thumbnail_strip.page_clicked.emit(12)
+        assert [(c.start, c.end) for c in dialog.chapters] == [(0, 11), (12, 29)]
+        assert changed == [(12, 12)]
+
+        changed.clear()
+        dialog.thumbnail_strip.page_clicked.emit(12)
+        assert [(c.start, c.end) for c in dialog.chapters] == [(0, 29)]
+        assert changed == [(12, 12)]
+
+
+def test_thumbnails_load_off_gui_thread_for_visible_pages(qapp, monkeypatch):
+    """1000ページでも開いてすぐ使え、サムネイルは見えている分だけ背景で読む"""
+    import threading
+
+    from PyQt6.QtGui import QImage
+
+    from src.export.thumbnail_cache import ThumbnailCache
+
+    threads = []
+
+    def fake_thumbnail(self, path, width, height):
+        threads.append(threading.current_thread())
+        image = QImage(width, height, QImage.Format.Format_RGB32)
+        image.fill(0xFFFFFF)
+        return image
+
+    monkeypatch.setattr(ThumbnailCache, "image_thumbnail", fake_thumbnail)
+    paths = [Path(f"/book/page_{i:04d}.png") for i in range(1000)]
+    with tempfile.TemporaryDirectory() as outdir:
+        dialog = ChapterDialog(paths, Path(outdir), keep_images=True)
+        dialog.show()
+        qapp.processEvents()
+        dialog.grab()
+        dialog.thumbnail_model.wait_for_pending()
+        assert 0 < len(threads) < 50
+        assert threading.main_thread() not in threads
+        dialog.close()
+
+
+def test_cancelled_export_leaves_no_files(qapp, monkeypatch):
+    """出力を途中で中止したら、作りかけの結合PDF・章PDFを残さない"""
+    from src.ui import chapter_dialog
+    from src.ui.background_job import BackgroundJob
+
+    def run_cancelling_after_first_chapter(parent, title, label, work):
+        # ワーカーを同じスレッドで走らせ、章PDFを1つ書いたところで中止を押す
+        job = BackgroundJob(work)
+        job.progress.connect(lambda done, total: done >= 2 and job.cancel())
+        job.run()
+        return job.outcome
+
+    monkeypatch.setattr(chapter_dialog, "run_with_progress", run_cancelling_after_first_chapter)
+    monkeypatch.setattr(chapter_dialog.QMessageBox, "critical", lambda *a, **k: pytest.fail("エラー表示"))
+    with tempfile.TemporaryDirectory() as tmpdir:
+        paths = []
+        for i in range(4):
+            p = Path(tmpdir) / "images" / f"page_{i}.png"
+            p.parent.mkdir(exist_ok=True)
+            Image.new("RGB", (40, 40), "white").save(p, "PNG")
+            paths.append(p)
+        outdir = Path(tmpdir) / "out"
+        dialog = ChapterDialog(paths, outdir, keep_images=True)
+        dialog._apply_toc_ranges([ChapterRange("前半", 0, 1), ChapterRange("後半", 2, 3)])
+        dialog.merge_check.setChecked(False)
+        dialog.chapter_pdf_check.setChecked(True)
+        dialog.ocr_check.setChecked(False)
+        accepted = []
+        monkeypatch.setattr(dialog, "accept", lambda: accepted.append(True))
+
+        dialog._export_pdfs()
+
+        assert accepted == []
+        assert outdir.is_dir()
+        assert list(outdir.glob("*.pdf*")) == []
+
+
+@pytest.mark.parametrize("merge", [False, True])
+def test_cancelled_reexport_keeps_previous_output(qapp, monkeypatch, tmp_path, merge):
+    """同じフォルダに出力し直して中止しても、前回の結合PDF・章PDFはそのまま残る"""
+    from src.ui import chapter_dialog
+    from src.ui.background_job import BackgroundJob
+
+    cancel_at = []
+
+    def run_in_place(parent, title, label, work):
+        # ワーカーを同じスレッドで走らせ、cancel_at のページ数まで進んだら中止を押す
+        job = BackgroundJob(work)
+        job.progress.connect(lambda done, total: cancel_at and done >= cancel_at[0] and job.cancel())
+        job.run()
+        return job.outcome
+
+    monkeypatch.setattr(chapter_dialog, "run_with_progress", run_in_place)
+    monkeypatch.setattr(chapter_dialog.QMessageBox, "critical", lambda *a, **k: pytest.fail("エラー表示"))
+    monkeypatch.setattr("src.utils.notification.send_notification", lambda *a, **k: None)
+    monkeypatch.setattr("src.ui.chapter_dialog.subprocess.Popen", lambda *a, **k: None)
+    paths = []
+    for i in range(4):
+        p = tmp_path / "images" / f"page_{i}.png"
+        p.parent.mkdir(exist_ok=True)
+        Image.new("RGB", (40, 40), "white").save(p, "PNG")
+        paths.append(p)
+    outdir = tmp_path / "out"
+    dialog = ChapterDialog(paths, outdir, keep_images=True)
+    dialog._apply_toc_ranges([ChapterRange("前半", 0, 1), ChapterRange("後半", 2, 3)])
+    dialog.merge_check.setChecked(merge)
+    dialog.chapter_pdf_check.setChecked(True)
+    dialog.ocr_check.setChecked(False)
+    accepted = []
+    monkeypatch.setattr(dialog, "accept", lambda: accepted.append(True))
+
+    dialog._export_pdfs()
+    assert accepted == [True]
+    before = {path: path.read_bytes() for path in outdir.glob("*.pdf*")}
+    assert len(before) == (3 if merge else 2)
+
+    # 章PDFを1つ書いたところ（結合PDFがあればその後）で中止する
+    cancel_at.append(6 if merge else 2)
+    dialog._export_pdfs()
+    assert accepted == [True]
+    assert {path: path.read_bytes() for path in outdir.glob("*.pdf*")} == before
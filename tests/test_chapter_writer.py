@@ -0,0 +1,82 @@
+# tests/test_chapter_writer.py
+
+import pytest
+from pypdf import PdfReader
+from reportlab.pdfgen import canvas
+
+from src.export.chapter_writer import SplitCancelled, write_chapters_parallel
+
+
+def _write_pdf(path, pages):
+    c = canvas.Canvas(str(path))
+    for i in range(pages):
+        c.drawString(72, 720, f"Page {i + 1}")
+        c.showPage()
+    c.save()
+    return path
+
+
+def _texts(path):
+    return [page.extract_text().strip() for page in PdfReader(str(path)).pages]
+
+
+def test_parallel_chapters_have_their_page_ranges(tmp_path):
+    """各ワーカーが自分の章のページ範囲だけを書き、出力先を章の順に返す"""
+    pdf = _write_pdf(tmp_path / "book.pdf", 7)
+    jobs = [(0, 1, tmp_path / "c1.pdf"), (2, 5, tmp_path / "c2.pdf"), (6, 6, tmp_path / "c3.pdf")]
+    reported = []
+    paths = write_chapters_parallel(
+        pdf, jobs, workers=2, progress=lambda done, total: reported.append((done, total))
+    )
+    assert paths == [tmp_path / "c1.pdf", tmp_path / "c2.pdf", tmp_path / "c3.pdf"]
+    assert _texts(paths[0]) == ["Page 1", "Page 2"]
+    assert _texts(paths[1]) == ["Page 3", "Page 4", "Page 5", "Page 6"]
+    assert _texts(paths[2]) == ["Page 7"]
+    assert sorted(reported)[-1] == (7, 7)
+    assert len(reported) == 3
+
+
+def test_cancelled_parallel_write_leaves_no_files(tmp_path):
+    """中止したら、書き終えた章も一時ファイルも残さない"""
+    pdf = _write_pdf(tmp_path / "book.pdf", 4)
+    out_dir = tmp_path / "out"
+    out_dir.mkdir()
+    jobs = [(i, i, out_dir / f"c{i}.pdf") for i in range(4)]
+    reported = []
+    with pytest.raises(SplitCancelled):
+        write_chapters_parallel(
+            pdf, jobs, workers=2,
+            progress=lambda done, total: reported.append(done),
+            is_cancelled=lambda: bool(reported),
+        )
+    assert list(out_dir.iterdir()) == []
+
+
+def test_failed_chapter_removes_the_others(tmp_path):
+    """1章でも失敗したら例外を上げ、他の章も消す"""
+    pdf = _write_pdf(tmp_path / "book.pdf", 3)
+    out_dir = tmp_path / "out"
+    out_dir.mkdir()
+    # 存在しないページを含む章
+    jobs = [(0, 0, out_dir / "c1.pdf"), (1, 9, out_dir / "c2.pdf"), (2, 2, out_dir / "c3.pdf")]
+    with pytest.raises(IndexError):
+        write_chapters_parallel(pdf, jobs, workers=2)
+    assert list(out_dir.iterdir()) == []
+
+
+def test_cancelled_rewrite_keeps_previous_output(tmp_path):
+    """同じ出力先に書き直して中止しても、前回書いた章はそのまま残る"""
+    pdf = _write_pdf(tmp_path / "book.pdf", 4)
+    out_dir = tmp_path / "out"
+    out_dir.mkdir()
+    jobs = [(i, i, out_dir / f"c{i}.pdf") for i in range(4)]
+    write_chapters_parallel(pdf, jobs, workers=2)
+    reported = []
+    with pytest.raises(SplitCancelled):
+        write_chapters_parallel(
+            pdf, jobs, workers=2,
+            progress=lambda done, total: reported.append(done),
+            is_cancelled=lambda: bool(reported),
+        )
+    assert sorted(out_dir.iterdir()) == [path for _, _, path in jobs]
+    assert [_texts(path) for _, _, path in jobs] == [[f"Page {i + 1}"] for i in range(4)]
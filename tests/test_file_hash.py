@@ -0,0 +1,40 @@
+# tests/test_file_hash.py
+import os
+
+from src.utils import file_hash
+from src.utils.file_hash import DIGEST_SUFFIX, cached_file_sha256, file_sha256, write_digest
+
+
+def test_cached_hash_matches_file_hash_and_is_remembered(tmp_path, monkeypatch):
+    """一度求めたハッシュは、ファイルが変わらなければ読み直さない"""
+    path = tmp_path / "page.png"
+    path.write_bytes(b"page one")
+    expected = file_sha256(path)
+    assert cached_file_sha256(path) == expected
+
+    monkeypatch.setattr(file_hash, "file_sha256", lambda p: "読み直した")
+    assert cached_file_sha256(path) == expected
+
+
+def test_written_digest_is_used_without_reading_file(tmp_path, monkeypatch):
+    """write_digest の控えがあれば、別のプロセスでもファイルを読まない"""
+    path = tmp_path / "page.png"
+    path.write_bytes(b"page one")
+    expected = file_sha256(path)
+    write_digest(path, expected)
+    assert (tmp_path / f"page.png{DIGEST_SUFFIX}").exists()
+
+    monkeypatch.setattr(file_hash, "_known_digests", {})
+    monkeypatch.setattr(file_hash, "file_sha256", lambda p: "読み直した")
+    assert cached_file_sha256(path) == expected
+
+
+def test_rewritten_file_is_hashed_again(tmp_path):
+    """書き換わったファイルには古い控えを使わない"""
+    path = tmp_path / "page.png"
+    path.write_bytes(b"page one")
+    write_digest(path, file_sha256(path))
+
+    path.write_bytes(b"retaken page")
+    os.utime(path, ns=(0, path.stat().st_mtime_ns + 1_000_000_000))
+    assert cached_file_sha256(path) == file_sha256(path)
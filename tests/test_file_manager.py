@@ -35,6 +35,23 @@ def test_get_image_path():
         assert path.name == "page_005.png"
 
 
+def test_ocr_cache_path_is_under_images():
+    """OCRキャッシュは images/ に置かれ、画像の削除と一緒に消える"""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        fm = FileManager(base_path=Path(tmpdir))
+        output_dir = fm.create_output_directory("test")
+        path = fm.get_ocr_cache_path(output_dir)
+        assert path.parent == output_dir / "images"
+
+
+def test_stream_pdf_paths_are_under_images():
+    """撮影中に作るPDFは画像と一緒に削除される場所に置く"""
+    fm = FileManager()
+    output_dir = Path("/tmp/out")
+    assert fm.get_stream_pages_dir(output_dir).parent == output_dir / "images"
+    assert fm.get_stream_pdf_path(output_dir).parent == output_dir / "images"
+
+
 def test_cleanup_images():
     """画像ファイルが削除される"""
     with tempfile.TemporaryDirectory() as tmpdir:
@@ -91,3 +108,20 @@ def test_create_split_output_directory_creates_unique_dirs_per_call():
         sub2 = fm.create_split_output_directory(parent, "sample")
         assert sub1 != sub2
         assert sub1.exists() and sub2.exists()
+
+
+def test_journal_is_written_and_loaded_in_output_directory(tmp_path):
+    """キャプチャ記録を出力ディレクトリに書き、再開時に読み戻せる"""
+    fm = FileManager(base_path=tmp_path)
+    output_dir = fm.create_output_directory("capture")
+    journal = fm.open_journal(output_dir, {"interval": 10})
+    path = fm.get_image_path(output_dir, 1)
+    path.write_bytes(b"png")
+    journal.record_page(1, path, None)
+    journal.close()
+
+    assert fm.get_journal_path(output_dir) == output_dir / "session.jsonl"
+    session = fm.load_journal(output_dir)
+    assert session.settings == {"interval": 10}
+    assert [p.path for p in session.pages] == [path]
+    assert fm.load_journal(tmp_path) is None
@@ -0,0 +1,146 @@
+# tests/test_image_writer.py
+import threading
+
+import pytest
+from PIL import Image
+
+from src.capture.image_writer import ImageWriter
+
+
+def _image(color="white"):
+    return Image.new("RGB", (30, 40), color=color)
+
+
+def test_submitted_images_are_saved_after_close(tmp_path):
+    """submit した画像が close 後にすべて PNG として読める"""
+    writer = ImageWriter()
+    writer.start()
+    saved = []
+    paths = [tmp_path / "images" / f"page_{i:03d}.png" for i in range(1, 6)]
+    for path in paths:
+        writer.submit(_image(), path, on_saved=saved.append)
+    writer.close()
+
+    assert saved == paths
+    assert len(writer.write_times) == len(paths)
+    for path in paths:
+        with Image.open(path) as im:
+            assert im.size == (30, 40)
+
+
+def test_submit_blocks_when_queue_is_full(tmp_path, monkeypatch):
+    """書き出しが詰まると submit が待たされる（バックプレッシャー）"""
+    release = threading.Event()
+    real_write = ImageWriter._write
+
+    def slow_write(image, path):
+        release.wait(5)
+        real_write(image, path)
+
+    monkeypatch.setattr(ImageWriter, "_write", staticmethod(slow_write))
+    writer = ImageWriter(max_pending=1)
+    writer.start()
+    writer.submit(_image(), tmp_path / "p1.png")  # スレッドが取り出して書き込み中
+    writer.submit(_image(), tmp_path / "p2.png")  # キューで待機
+
+    third_done = threading.Event()
+
+    def submit_third():
+        writer.submit(_image(), tmp_path / "p3.png")
+        third_done.set()
+
+    thread = threading.Thread(target=submit_third)
+    thread.start()
+    assert not third_done.wait(0.3), "キューが満杯なのに submit が戻った"
+
+    release.set()
+    thread.join(5)
+    assert third_done.is_set()
+    writer.close()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["p1.png", "p2.png", "p3.png"]
+
+
+def test_write_failure_is_raised_on_close_and_next_submit(tmp_path):
+    """保存に失敗したら close と次の submit で例外になる"""
+    blocker = tmp_path / "not_a_dir"
+    blocker.write_text("file")
+    writer = ImageWriter()
+    writer.start()
+    writer.submit(_image(), blocker / "page_001.png")
+    with pytest.raises(OSError):
+        writer.close()
+
+    # 新しいセッションを start すると失敗はリセットされる
+    writer.start()
+    writer.submit(_image(), tmp_path / "ok.png")
+    writer.close()
+    assert (tmp_path / "ok.png").exists()
+
+
+def test_thumbnails_are_made_while_saving(tmp_path):
+    """thumbnail_cache を渡すと、保存した PNG のサムネイルも作っておく"""
+    from src.export.thumbnail_cache import ThumbnailCache
+    from src.utils.file_hash import file_sha256
+
+    cache = ThumbnailCache(tmp_path / "thumbs")
+    writer = ImageWriter(thumbnail_cache=cache, thumbnail_size=(10, 14))
+    path = tmp_path / "page_001.png"
+    writer.submit(Image.new("RGB", (300, 400), "red"), path)
+    writer.close()
+
+    thumb = cache.get(file_sha256(path), 0, 10, 14)
+    assert (thumb.width(), thumb.height()) == (10, 14)
+
+
+def test_thumbnail_failure_does_not_stop_capture(tmp_path, monkeypatch):
+    """サムネイルが作れなくても画像の保存は続ける"""
+    from src.export.thumbnail_cache import ThumbnailCache
+
+    cache = ThumbnailCache(tmp_path / "thumbs")
+
+    def fail_put(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(cache, "put_image_thumbnail", fail_put)
+    writer = ImageWriter(thumbnail_cache=cache)
+    writer.submit(_image(), tmp_path / "p1.png")
+    writer.submit(_image(), tmp_path / "p2.png")
+    writer.close()
+    assert (tmp_path / "p1.png").exists() and (tmp_path / "p2.png").exists()
+
+
+def test_digest_is_kept_next_to_page_for_thumbnail_lookup(tmp_path, monkeypatch):
+    """サムネイルを作るときは PNG の隣にハッシュを控え、引くときに PNG を読み直さない"""
+    from src.export.thumbnail_cache import ThumbnailCache
+    from src.utils import file_hash
+
+    cache = ThumbnailCache(tmp_path / "thumbs")
+    writer = ImageWriter(thumbnail_cache=cache, thumbnail_size=(10, 14))
+    path = tmp_path / "page_001.png"
+    writer.submit(Image.new("RGB", (300, 400), "red"), path)
+    writer.close()
+    assert (tmp_path / "page_001.png.sha256").exists()
+
+    monkeypatch.setattr(file_hash, "_known_digests", {})
+    monkeypatch.setattr(
+        file_hash, "file_sha256", lambda p: pytest.fail("PNG 全体を読んだ")
+    )
+    thumb = cache.image_thumbnail(path, 10, 14)
+    assert (thumb.width(), thumb.height()) == (10, 14)
+
+
+def test_unexpected_thumbnail_error_does_not_stop_capture(tmp_path, monkeypatch):
+    """OSError 以外の失敗でも撮影は続ける"""
+    from src.export.thumbnail_cache import ThumbnailCache
+
+    cache = ThumbnailCache(tmp_path / "thumbs")
+
+    def fail_put(*args, **kwargs):
+        raise ValueError("bad image mode")
+
+    monkeypatch.setattr(cache, "put_image_thumbnail", fail_put)
+    writer = ImageWriter(thumbnail_cache=cache)
+    writer.submit(_image(), tmp_path / "p1.png")
+    writer.submit(_image(), tmp_path / "p2.png")
+    writer.close()
+    assert (tmp_path / "p1.png").exists() and (tmp_path / "p2.png").exists()
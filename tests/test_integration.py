@@ -47,6 +47,7 @@ def test_full_workflow():
 
 def test_window_manager_integration():
     """WindowManagerが実際のウィンドウ一覧を取得できる"""
+    pytest.importorskip("Quartz", reason="macOS Quartz not available")
     wm = WindowManager()
     windows = wm.get_window_list()
     # macOSで実行すれば少なくとも1つはウィンドウがあるはず
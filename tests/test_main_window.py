@@ -81,3 +81,250 @@ def test_custom_region_mode_brings_target_window_to_front(mock_wm):
     window._bring_target_to_front()
     mock_wm_instance.bring_to_front.assert_called_once_with(12345)
     window.close()
+
+
+@patch("src.ui.main_window.WindowManager")
+def test_adaptive_mode_captures_once_page_settles(mock_wm):
+    """自動検出モードでは、次のページで画面が落ち着いた時点で撮影する"""
+    from PIL import Image
+    mock_wm.return_value.get_window_list.return_value = []
+    from src.ui.main_window import MainWindow
+
+    window = MainWindow()
+    window.custom_area_radio.setChecked(True)
+    window.custom_region = MagicMock(x=lambda: 0, y=lambda: 0, width=lambda: 40, height=lambda: 40)
+    window.adaptive_check.setChecked(True)
+    window.is_capturing = True
+    window.page_navigator = MagicMock()
+    old, new = Image.new("RGB", (40, 40), "white"), Image.new("RGB", (40, 40), "black")
+    frames = iter([new, new])
+    window.screenshot = MagicMock()
+    window.screenshot.capture_region.side_effect = lambda *a: next(frames)
+
+    from src.capture.page_hash import page_fingerprint
+    window._last_fingerprint = page_fingerprint(old)
+    captured = []
+    window._capture_page = lambda: captured.append(True)
+
+    with patch("src.ui.main_window.QTimer.singleShot", lambda ms, fn: fn()):
+        window._navigate_and_schedule_next()
+
+    window.page_navigator.next_page.assert_called_once()
+    assert captured == [True]
+    assert len(window.capture_stats.settle_times) == 1
+    window.close()
+
+
+def _capturing_window(frames, output_dir, total_pages=10):
+    """撮影画像を差し替えた、キャプチャ中のメインウィンドウを作る"""
+    from src.ui.main_window import MainWindow
+
+    window = MainWindow()
+    window.custom_area_radio.setChecked(True)
+    window.custom_region = MagicMock(x=lambda: 0, y=lambda: 0, width=lambda: 40, height=lambda: 40)
+    window.screenshot = MagicMock()
+    frame_iter = iter(frames)
+    window.screenshot.capture_region.side_effect = lambda *a: next(frame_iter)
+    window.page_navigator = MagicMock()
+    window.output_dir = output_dir
+    window.is_capturing = True
+    window.total_pages = total_pages
+    window.image_writer.start()
+    return window
+
+
+def _page(lines):
+    from PIL import Image, ImageDraw
+    img = Image.new("RGB", (40, 40), "white")
+    draw = ImageDraw.Draw(img)
+    for y in lines:
+        draw.rectangle((2, y, 37, y + 2), fill="black")
+    return img
+
+
+@patch("src.ui.chapter_dialog.ChapterDialog")
+@patch("src.utils.notification.send_notification")
+@patch("src.ui.main_window.WindowManager")
+def test_stops_at_end_of_book_and_drops_trailing_duplicates(mock_wm, _notify, mock_dialog, tmp_path):
+    """同じページが続いたら自動で停止し、末尾の重複ページを取り除く"""
+    from src.ui.main_window import END_OF_BOOK_REPEATS, MAX_TURN_RETRIES
+    mock_wm.return_value.get_window_list.return_value = []
+    last = _page([30])
+    # 重複1枚ごとに、送り直しで撮り直した分も同じページが写る
+    frames = [_page([5]), _page([15]), last] + [last] * (END_OF_BOOK_REPEATS * (1 + MAX_TURN_RETRIES))
+    window = _capturing_window(frames, tmp_path, total_pages=10)
+
+    with patch("src.ui.main_window.QTimer.singleShot", lambda ms, fn: fn()):
+        window._capture_page()
+
+    assert window.is_capturing is False
+    assert [p.name for p in window.captured_images] == ["page_001.png", "page_002.png", "page_003.png"]
+    assert sorted(p.name for p in (tmp_path / "images").glob("*.png")) == [
+        "page_001.png", "page_002.png", "page_003.png",
+    ]
+    # 消したページのハッシュの控えも残さない
+    assert sorted(p.name for p in (tmp_path / "images").glob("*.sha256")) == [
+        "page_001.png.sha256", "page_002.png.sha256", "page_003.png.sha256",
+    ]
+    assert window.capture_stats.stopped_at_end is True
+    assert window.capture_stats.dropped_duplicates == 3
+    mock_dialog.assert_called_once()
+    window.close()
+
+
+@patch("src.ui.chapter_dialog.ChapterDialog")
+@patch("src.utils.notification.send_notification")
+@patch("src.ui.main_window.WindowManager")
+def test_missed_page_turn_is_resent_and_recaptured(mock_wm, _notify, _dialog, tmp_path):
+    """ページが変わっていなければキーを送り直し、重複を保存しない"""
+    mock_wm.return_value.get_window_list.return_value = []
+    p1, p2, p3 = _page([5]), _page([15]), _page([25])
+    # 2ページ目の前で1回キーが取りこぼされた
+    window = _capturing_window([p1, p1, p2, p3], tmp_path, total_pages=3)
+
+    with patch("src.ui.main_window.QTimer.singleShot", lambda ms, fn: fn()):
+        window._capture_page()
+
+    assert [p.name for p in window.captured_images] == ["page_001.png", "page_002.png", "page_003.png"]
+    assert window.capture_stats.turn_retries == 1
+    # 初回2回 + 送り直し1回
+    assert window.page_navigator.next_page.call_count == 3
+    window.close()
+
+
+@patch("src.ui.chapter_dialog.ChapterDialog")
+@patch("src.utils.notification.send_notification")
+@patch("src.ui.main_window.WindowManager")
+def test_turn_retries_are_bounded(mock_wm, _notify, _dialog, tmp_path):
+    """送り直しは上限までで、それでも同じなら重複として撮影を進める"""
+    from src.ui.main_window import MAX_TURN_RETRIES
+    mock_wm.return_value.get_window_list.return_value = []
+    same = _page([5])
+    window = _capturing_window([same] * (2 + MAX_TURN_RETRIES), tmp_path, total_pages=2)
+    window.auto_stop_check.setChecked(False)
+
+    with patch("src.ui.main_window.QTimer.singleShot", lambda ms, fn: fn()):
+        window._capture_page()
+
+    assert len(window.captured_images) == 2
+    assert window.capture_stats.turn_retries == MAX_TURN_RETRIES
+    window.close()
+
+
+@patch("src.utils.notification.send_notification")
+def test_resume_continues_from_next_page(_notify, tmp_path):
+    """記録から設定を戻し、保存済みページは撮り直さずに続きから撮る"""
+    from PIL import Image
+    from src.capture.page_hash import page_fingerprint
+    from src.capture.replay import ReplayBook, ReplayNavigator, ReplaySource, ReplayWindowManager
+    from src.export.file_manager import FileManager
+    from src.ui.main_window import MainWindow
+
+    book_dir = tmp_path / "book"
+    book_dir.mkdir()
+    for i in range(5):
+        _page([5 + i * 6]).save(book_dir / f"p{i}.png")
+    book = ReplayBook.from_directory(book_dir)
+
+    # 2ページ保存したところで落ちた状態（画面には2ページ目が出ている）
+    output_dir = tmp_path / "out"
+    output_dir.mkdir()
+    fm = FileManager()
+    journal = fm.open_journal(output_dir, {
+        "area_mode": "custom", "region": [0, 0, 40, 40], "direction": "left",
+        "interval": 5, "total_pages": 50,
+    })
+    for n in (1, 2):
+        image = Image.open(book.pages[n - 1])
+        path = fm.get_image_path(output_dir, n)
+        image.save(path)
+        journal.record_page(n, path, page_fingerprint(image))
+    journal.close()
+    book.turn()
+    saved_before = (output_dir / "images" / "page_001.png").stat().st_mtime_ns
+
+    window = MainWindow(
+        window_manager=ReplayWindowManager(book),
+        screenshot=ReplaySource(book),
+        page_navigator=ReplayNavigator(book),
+    )
+    shown = []
+    window._show_chapter_dialog = lambda: shown.append(list(window.captured_images))
+    with patch("src.ui.main_window.QTimer.singleShot", lambda ms, fn: fn()):
+        window._resume_from(output_dir)
+
+    assert window.left_radio.isChecked()
+    assert window.interval_slider.value() == 5
+    assert window.custom_region.width() == 40
+    assert [p.name for p in shown[0]] == [f"page_{n:03d}.png" for n in range(1, 6)]
+    assert (output_dir / "images" / "page_001.png").stat().st_mtime_ns == saved_before
+    assert fm.load_journal(output_dir).finished is True
+    window.close()
+
+
+@patch("src.ui.main_window.QMessageBox")
+@patch("src.ui.main_window.WindowManager")
+def test_resume_without_journal_warns(mock_wm, mock_box, tmp_path):
+    """記録の無いフォルダは再開しない"""
+    mock_wm.return_value.get_window_list.return_value = []
+    from src.ui.main_window import MainWindow
+
+    window = MainWindow()
+    window._resume_from(tmp_path)
+    mock_box.warning.assert_called_once()
+    assert window.is_capturing is False
+    window.close()
+
+
+@patch("src.utils.notification.send_notification")
+def test_stream_pdf_is_ready_when_capture_finishes(_notify, tmp_path):
+    """撮影しながらPDFを作ると、完了時には重複を除いた全ページのPDFが出来ている"""
+    from pathlib import Path
+    from pypdf import PdfReader
+    from src.capture.replay import ReplayBook, ReplayNavigator, ReplaySource, ReplayWindowManager
+    from src.export.ocr_engine import TextBox
+    from src.ui.main_window import MainWindow
+
+    class StemOcrEngine:
+        def recognize(self, image_path):
+            return [TextBox(Path(image_path).stem, 0.1, 0.1, 0.5, 0.1, 0.99)]
+
+    book_dir = tmp_path / "book"
+    book_dir.mkdir()
+    for i in range(3):
+        _page([5 + i * 6]).save(book_dir / f"p{i}.png")
+    book = ReplayBook.from_directory(book_dir)
+    window = MainWindow(
+        window_manager=ReplayWindowManager(book),
+        screenshot=ReplaySource(book),
+        page_navigator=ReplayNavigator(book),
+    )
+    window.path_edit.setText(str(tmp_path / "out"))
+    window.page_spin.setValue(50)
+    window.stream_pdf_check.setChecked(True)
+    dialogs = []
+    window._show_chapter_dialog = lambda: dialogs.append(window.prebuilt_pdf)
+
+    with patch("src.export.ocr_engine.VisionOcrEngine", StemOcrEngine), \
+            patch("src.ui.main_window.QTimer.singleShot", lambda ms, fn: fn()):
+        window._start_capture()
+
+    texts = [page.extract_text() for page in PdfReader(str(dialogs[0])).pages]
+    assert texts == ["page_001", "page_002", "page_003"]
+    window.close()
+
+
+@patch("src.ui.main_window.WindowManager")
+def test_window_opens_without_cache_dir(mock_wm, tmp_path, monkeypatch):
+    """キャッシュ置き場を作れなくても、サムネイルなしで画面を開ける"""
+    from src.utils.cache_dir import CACHE_DIR_ENV
+    from src.ui.main_window import MainWindow
+
+    blocker = tmp_path / "blocker"
+    blocker.write_text("")
+    monkeypatch.setenv(CACHE_DIR_ENV, str(blocker / "cache"))
+    mock_wm.return_value.get_window_list.return_value = []
+
+    window = MainWindow()
+    assert window.image_writer.thumbnail_cache is None
+    window.close()
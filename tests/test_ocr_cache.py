@@ -0,0 +1,102 @@
+# tests/test_ocr_cache.py
+from pathlib import Path
+
+from PIL import Image
+
+from src.export.ocr_cache import OcrCache
+from src.export.ocr_engine import TextBox
+
+
+class FakeOcrEngine:
+    """呼び出しを記録するテスト用エンジン"""
+
+    def __init__(self):
+        self.calls = []
+
+    def recognize(self, image_path):
+        self.calls.append(image_path)
+        return [TextBox(f"text-{Path(image_path).stem}", 0.1, 0.2, 0.3, 0.04, 0.9)]
+
+
+def _save_image(path: Path, color) -> Path:
+    Image.new("RGB", (40, 40), color=color).save(path, "PNG")
+    return path
+
+
+def test_second_lookup_hits_without_calling_engine(tmp_path):
+    """同じ画像の2回目はエンジンを呼ばずにキャッシュから返す"""
+    image = _save_image(tmp_path / "page_001.png", "white")
+    engine = FakeOcrEngine()
+    cache = OcrCache()
+
+    first = cache.recognize(image, engine)
+    second = cache.recognize(image, engine)
+
+    assert first == second
+    assert len(engine.calls) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_key_is_content_not_path(tmp_path):
+    """内容が同じならパスが違ってもヒットし、内容が違えばミスになる"""
+    a = _save_image(tmp_path / "a.png", "white")
+    b = _save_image(tmp_path / "b.png", "white")
+    c = _save_image(tmp_path / "c.png", "black")
+    engine = FakeOcrEngine()
+    cache = OcrCache()
+
+    cache.recognize(a, engine)
+    cache.recognize(b, engine)
+    cache.recognize(c, engine)
+
+    assert len(engine.calls) == 2
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_sidecar_round_trip(tmp_path):
+    """save したサイドカーを次のキャッシュが読み込み、エンジンを呼ばない"""
+    image = _save_image(tmp_path / "page_001.png", "white")
+    sidecar = tmp_path / "images" / "ocr_cache.json"
+
+    cache = OcrCache(sidecar)
+    boxes = cache.recognize(image, FakeOcrEngine())
+    cache.save()
+    assert sidecar.exists()
+
+    engine = FakeOcrEngine()
+    reloaded = OcrCache(sidecar)
+    assert len(reloaded) == 1
+    assert reloaded.recognize(image, engine) == boxes
+    assert engine.calls == []
+    assert reloaded.hits == 1
+
+
+def test_broken_sidecar_is_ignored(tmp_path):
+    """壊れたサイドカーは読み捨てて空のキャッシュで始める"""
+    sidecar = tmp_path / "ocr_cache.json"
+    sidecar.write_text("{not json", encoding="utf-8")
+    cache = OcrCache(sidecar)
+    assert len(cache) == 0
+
+
+def test_save_without_sidecar_is_noop(tmp_path):
+    """sidecar_path 無しの save はファイルを作らない"""
+    cache = OcrCache()
+    cache.save()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_recognize_many_only_sends_misses_to_engine(tmp_path):
+    """キャッシュ済みと同内容のページは認識せず、結果はページ順に返る"""
+    white = _save_image(tmp_path / "p1.png", "white")
+    black = _save_image(tmp_path / "p2.png", "black")
+    white_again = _save_image(tmp_path / "p3.png", "white")
+    engine = FakeOcrEngine()
+    cache = OcrCache()
+    cache.recognize(white, engine)
+
+    results = list(cache.recognize_many([white, black, white_again], engine))
+
+    assert [r[0].text for r in results] == ["text-p1", "text-p2", "text-p1"]
+    assert engine.calls == [white, black]
+    assert (cache.hits, cache.misses) == (2, 2)
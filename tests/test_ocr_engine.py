@@ -1,14 +1,18 @@
-# tests/test_ocr_engine.py
+import os
 import tempfile
 from pathlib import Path
 
 import pytest
 from PIL import Image, ImageDraw
 
-from src.export.ocr_engine import TextBox
+from src.export.ocr_engine import TextBox, recognize_many
 
-vision = pytest.importorskip("Vision", reason="macOS Vision framework not available")
-from src.export.ocr_engine import VisionOcrEngine
+
+class PidOcrEngine:
+    """ファイル名と処理したプロセスIDを返すテスト用エンジン（pickle 可能）"""
+
+    def recognize(self, image_path):
+        return [TextBox(Path(image_path).stem, 0.0, 0.0, 1.0, 0.1, float(os.getpid()))]
 
 
 def _make_text_image(path: Path, text: str):
@@ -19,6 +23,9 @@ def _make_text_image(path: Path, text: str):
 
 
 def test_recognizes_latin_text():
+    pytest.importorskip("Vision", reason="macOS Vision framework not available")
+    from src.export.ocr_engine import VisionOcrEngine
+
     engine = VisionOcrEngine()
     with tempfile.TemporaryDirectory() as tmpdir:
         path = Path(tmpdir) / "hello.png"
@@ -27,3 +34,19 @@ def test_recognizes_latin_text():
         assert all(isinstance(b, TextBox) for b in boxes)
         joined = "".join(b.text for b in boxes).upper().replace(" ", "")
         assert "HELLO123" in joined
+
+
+def test_recognize_many_sequential_keeps_page_order():
+    """workers=1 では同じプロセスでページ順に認識する"""
+    paths = [Path(f"page_{i:03d}.png") for i in range(5)]
+    results = list(recognize_many(PidOcrEngine(), paths, workers=1))
+    assert [r[0].text for r in results] == [p.stem for p in paths]
+    assert {r[0].confidence for r in results} == {float(os.getpid())}
+
+
+def test_recognize_many_parallel_keeps_page_order():
+    """workers>=2 ではワーカープロセスで認識し、結果はページ順で返る"""
+    paths = [Path(f"page_{i:03d}.png") for i in range(12)]
+    results = list(recognize_many(PidOcrEngine(), paths, workers=3))
+    assert [r[0].text for r in results] == [p.stem for p in paths]
+    assert float(os.getpid()) not in {r[0].confidence for r in results}
@@ -0,0 +1,49 @@
+# tests/test_page_hash.py
+from PIL import Image, ImageDraw
+
+from src.capture.page_hash import (
+    FINGERPRINT_SIZE, fingerprint_distance, is_same_page, page_fingerprint,
+)
+
+
+def _text_page(lines: list[int]) -> Image.Image:
+    """指定した行位置に黒い「文字行」を描いたページ画像"""
+    img = Image.new("RGB", (600, 800), "white")
+    draw = ImageDraw.Draw(img)
+    for y in lines:
+        draw.rectangle((40, y, 560, y + 12), fill="black")
+    return img
+
+
+def test_fingerprint_is_small_grayscale():
+    """指紋は縮小したグレースケール画素列"""
+    fp = page_fingerprint(_text_page([100, 200]))
+    assert len(fp) == FINGERPRINT_SIZE * FINGERPRINT_SIZE
+
+
+def test_same_page_recaptured_is_same():
+    """同じ画面を撮り直した画像は同じページと判定する"""
+    a = page_fingerprint(_text_page([100, 200, 300]))
+    b = page_fingerprint(_text_page([100, 200, 300]))
+    assert fingerprint_distance(a, b) == 0
+    assert is_same_page(a, b)
+
+
+def test_small_overlay_change_is_still_same_page():
+    """進捗表示程度の小さな変化は同じページとみなす"""
+    base = _text_page([100, 200, 300])
+    changed = base.copy()
+    ImageDraw.Draw(changed).rectangle((500, 780, 520, 790), fill="black")
+    assert is_same_page(page_fingerprint(base), page_fingerprint(changed))
+
+
+def test_turned_page_is_different():
+    """本文の配置が変われば別ページと判定する"""
+    a = page_fingerprint(_text_page(list(range(60, 760, 40))))
+    b = page_fingerprint(_text_page(list(range(80, 760, 40))))
+    assert not is_same_page(a, b)
+
+
+def test_different_sizes_are_different_pages():
+    """長さの違う指紋は比較できないので別ページ扱い"""
+    assert not is_same_page(b"\x00" * 4, b"\x00" * 8)
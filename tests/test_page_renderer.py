@@ -0,0 +1,99 @@
+# tests/test_page_renderer.py
+import pytest
+from pypdf import PdfWriter
+
+from src.export.page_renderer import PageRenderer, PillowRenderBackend, fit_size
+from src.export.pdf_document import PdfDocument
+
+
+def _blank_pdf(path, sizes):
+    writer = PdfWriter()
+    for width, height in sizes:
+        writer.add_blank_page(width=width, height=height)
+    with open(path, "wb") as f:
+        writer.write(f)
+    return path
+
+
+class _CountingBackend(PillowRenderBackend):
+    """描いた回数を数える"""
+
+    def __init__(self, document):
+        super().__init__(document)
+        self.rendered = []
+
+    def render(self, page_index, width, height):
+        self.rendered.append((page_index, width, height))
+        return super().render(page_index, width, height)
+
+
+@pytest.fixture
+def backend(tmp_path):
+    pdf = _blank_pdf(tmp_path / "book.pdf", [(600, 800), (800, 600), (600, 800)])
+    return _CountingBackend(PdfDocument.open(pdf))
+
+
+def test_fit_size_keeps_aspect_ratio():
+    """縦横比を保って枠に収める（指定の無い辺は制限しない）"""
+    assert fit_size(600, 800, max_height=140) == (105, 140)
+    assert fit_size(800, 600, max_width=200, max_height=200) == (200, 150)
+    assert fit_size(600, 800) == (600, 800)
+    with pytest.raises(ValueError):
+        fit_size(0, 800, max_height=140)
+
+
+def test_same_page_and_size_is_rendered_once(backend):
+    """同じページ・大きさは覚えた画像を返し、大きさが違えば描き直す"""
+    renderer = PageRenderer(backend)
+    first = renderer.render(0, max_height=140)
+    assert renderer.render(0, max_height=140) is first
+    assert (first.width(), first.height()) == (105, 140)
+    renderer.render(0, max_height=280)
+    renderer.render(1, max_height=140)
+    assert backend.rendered == [(0, 105, 140), (0, 210, 280), (1, 186, 140)]
+    assert (renderer.hits, renderer.misses) == (1, 3)
+
+
+def test_cache_is_bounded_and_evicts_least_recently_used(backend):
+    """容量を超えたら長く使っていないページから捨てる"""
+    one_page = 105 * 140 * 4
+    renderer = PageRenderer(backend, max_bytes=one_page * 2)
+    renderer.render(0, max_height=140)
+    renderer.render(2, max_height=140)
+    renderer.render(0, max_height=140)  # 0 を使い直す → 2 が一番古い
+    renderer.render(1, max_height=105)
+    backend.rendered.clear()
+    renderer.render(0, max_height=140)
+    renderer.render(2, max_height=140)
+    assert backend.rendered == [(2, 105, 140)]
+
+
+def test_stand_in_backend_is_deterministic(backend):
+    """代わりの描画は同じページ・大きさなら同じ画像になる"""
+    a = PageRenderer(backend).render(2, max_height=200)
+    b = PageRenderer(backend).render(2, max_height=200)
+    assert a == b
+    assert a != PageRenderer(backend).render(0, max_height=200)
+
+
+def test_out_of_range_page_is_an_error(backend):
+    with pytest.raises(IndexError):
+        PageRenderer(backend).render(3, max_height=140)
+
+
+def test_thumbnails_survive_on_disk_for_the_next_renderer(backend, tmp_path):
+    """サムネイルの大きさならディスクに残し、次に開いたときは描かない"""
+    from src.export.thumbnail_cache import ThumbnailCache
+
+    disk = ThumbnailCache(tmp_path / "thumbs")
+    first = PageRenderer(backend, disk_cache=disk, source_hash=lambda: "book")
+    image = first.render(1, max_height=140)
+    first.render(1, max_height=1600)  # 大きな描画はディスクに残さない
+    assert len(list((tmp_path / "thumbs").glob("*.png"))) == 1
+
+    backend.rendered.clear()
+    second = PageRenderer(backend, disk_cache=disk, source_hash=lambda: "book")
+    again = second.render(1, max_height=140)
+    assert backend.rendered == []
+    assert second.disk_hits == 1
+    assert (again.width(), again.height()) == (image.width(), image.height())
@@ -1,14 +1,24 @@
 # tests/test_page_sheet.py
 """コンタクトシートのページ割りのテスト"""
 
+import importlib.util
+
+import pytest
+
 from src.export.page_sheet import sheet_ranges
 
+# 既定の描画は Quartz（macOS のみ）
+needs_quartz = pytest.mark.skipif(
+    importlib.util.find_spec("Quartz") is None, reason="macOS Quartz not available"
+)
+
 
 def test_sheet_ranges_splits_pages_into_sheets():
     """ページを1枚あたりの上限で区切る（1-indexed、端数も1枚に収める）"""
     assert sheet_ranges(10, per_sheet=4) == [[1, 2, 3, 4], [5, 6, 7, 8], [9, 10]]
 
 
+@needs_quartz
 def test_build_contact_sheet_writes_png(tmp_path):
     """指定ページをサムネイル格子にしてPNGを書き出す"""
     import tempfile
@@ -29,6 +39,7 @@ def test_build_contact_sheet_writes_png(tmp_path):
     assert out.exists() and out.stat().st_size > 0
 
 
+@needs_quartz
 def test_build_contact_sheet_accepts_layout_overrides(tmp_path):
     """列数とサムネイルサイズを指定できる（章名を読ませるための拡大用）"""
     from pathlib import Path
@@ -63,6 +74,7 @@ def test_default_thumbnail_is_large_enough_to_read_chapter_layout():
     assert page_sheet.COLUMNS <= 6
 
 
+@needs_quartz
 def test_build_contact_sheet_rejects_unreadable_pdf(tmp_path):
     """読めないPDFは明確なエラーにする（壊れた画像でClaudeを呼ばない）"""
     import pytest
@@ -74,6 +86,7 @@ def test_build_contact_sheet_rejects_unreadable_pdf(tmp_path):
         build_contact_sheet(broken, [1], tmp_path / "out.png")
 
 
+@needs_quartz
 def test_build_contact_sheet_rejects_out_of_range_page(tmp_path):
     """存在しないページ番号は明確なエラーにする"""
     import pytest
@@ -102,6 +115,7 @@ def test_sheet_ranges_edge_cases():
         sheet_ranges(10, per_sheet=-3)
 
 
+@needs_quartz
 def test_build_contact_sheet_stops_when_cancelled(tmp_path):
     """描画中でもページ単位でキャンセルできる（GUIを長く待たせない）"""
     import pytest
@@ -127,3 +141,57 @@ def test_build_contact_sheet_stops_when_cancelled(tmp_path):
             is_cancelled=cancel_after_three,
         )
     assert len(drawn) <= 5, "キャンセル後すぐ止まる"
+
+
+def _blank_pdf(path, count, width=612, height=792):
+    from pypdf import PdfWriter
+
+    writer = PdfWriter()
+    for _ in range(count):
+        writer.add_blank_page(width=width, height=height)
+    with open(path, "wb") as f:
+        writer.write(f)
+    return path
+
+
+def _pillow_renderer(pdf_path):
+    from src.export.page_renderer import PageRenderer, PillowRenderBackend
+    from src.export.pdf_document import PdfDocument
+
+    return PageRenderer(PillowRenderBackend(PdfDocument.open(pdf_path)))
+
+
+def test_build_contact_sheet_with_stand_in_renderer(tmp_path):
+    """描画を差し替えても格子の大きさ・ページの置き場所は同じ"""
+    from PyQt6.QtGui import QImage
+    from src.export.page_sheet import build_contact_sheet
+
+    pdf_path = _blank_pdf(tmp_path / "sample.pdf", 3)
+    renderer = _pillow_renderer(pdf_path)
+    out = tmp_path / "sheet.png"
+    build_contact_sheet(
+        pdf_path, [1, 2, 3], out, columns=2, thumb_width=600, thumb_height=800,
+        renderer=renderer,
+    )
+    image = QImage(str(out))
+    assert (image.width(), image.height()) == (1200, 1600)
+    # ページは白、セルの余白は背景のグレー
+    assert image.pixelColor(300, 400).name() == "#ffffff"
+    assert image.pixelColor(1, 1).name() == "#d9d9d9"
+    # 同じページ・大きさでもう1枚作っても描き直さない
+    build_contact_sheet(
+        pdf_path, [1, 2, 3], tmp_path / "again.png", columns=2,
+        thumb_width=600, thumb_height=800, renderer=renderer,
+    )
+    assert (renderer.misses, renderer.hits) == (3, 3)
+
+
+def test_build_contact_sheet_stand_in_rejects_out_of_range_page(tmp_path):
+    """存在しないページ番号は、描画を差し替えても明確なエラーにする"""
+    from src.export.page_sheet import build_contact_sheet
+
+    pdf_path = _blank_pdf(tmp_path / "sample.pdf", 1)
+    with pytest.raises(RuntimeError, match="ページ 5"):
+        build_contact_sheet(
+            pdf_path, [5], tmp_path / "out.png", renderer=_pillow_renderer(pdf_path)
+        )
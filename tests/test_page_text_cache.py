@@ -0,0 +1,52 @@
+# tests/test_page_text_cache.py
+import os
+import zlib
+
+from src.export.page_text_cache import PageTextCache
+
+
+def test_round_trip_keeps_every_page(tmp_path):
+    """空ページや日本語を含めてページ順に読み戻せる"""
+    cache = PageTextCache(tmp_path)
+    texts = ["第1章 はじめに", "", "本文\n二行目"]
+    cache.put("abc", texts)
+    assert cache.get("abc") == texts
+
+
+def test_get_page_reads_only_that_page(tmp_path, monkeypatch):
+    """1ページだけ読むときは他のページを展開しない"""
+    cache = PageTextCache(tmp_path)
+    cache.put("abc", [f"page {i}" for i in range(50)])
+    calls = []
+    real_decompress = zlib.decompress
+    monkeypatch.setattr(
+        "src.export.page_text_cache.zlib.decompress",
+        lambda data: calls.append(data) or real_decompress(data),
+    )
+    assert cache.get_page("abc", 37) == "page 37"
+    assert len(calls) == 1
+    assert cache.get_page("abc", 50) is None
+
+
+def test_missing_or_corrupt_entries_read_as_none(tmp_path):
+    """無いキー・壊れたファイルは None"""
+    cache = PageTextCache(tmp_path)
+    assert cache.get("nothing") is None
+    (tmp_path / "broken.ptxt").write_bytes(b"PTXT\x01")
+    assert cache.get("broken") is None
+    assert cache.get_page("broken", 0) is None
+
+
+def test_least_recently_used_books_are_evicted(tmp_path):
+    """上限を超えたら、長く使っていない本から消す"""
+    cache = PageTextCache(tmp_path, max_bytes=10**9)
+    body = [os.urandom(2000).hex()]
+    for i, key in enumerate(["old", "used", "new"]):
+        cache.put(key, body)
+        os.utime(tmp_path / f"{key}.ptxt", (1000 + i, 1000 + i))
+    cache.get("used")  # 読むと最近使ったことになる
+
+    # 4冊で上限を超え、その9割（2冊と少し）まで減らす
+    cache.max_bytes = int((tmp_path / "new.ptxt").stat().st_size * 2.5)
+    cache.put("newest", body)
+    assert sorted(p.stem for p in tmp_path.glob("*.ptxt")) == ["newest", "used"]
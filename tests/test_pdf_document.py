@@ -0,0 +1,178 @@
+# tests/test_pdf_document.py
+import os
+from dataclasses import dataclass
+
+import pytest
+from pypdf import PdfWriter
+from reportlab.pdfgen import canvas
+
+from src.export import pdf_document
+from src.export.pdf_document import PdfDocument
+from src.export.pdf_splitter import PdfSplitter
+
+
+@dataclass
+class _Chapter:
+    name: str
+    start: int
+    end: int
+
+
+def _write_pdf(path, texts):
+    c = canvas.Canvas(str(path))
+    for text in texts:
+        c.drawString(72, 720, text)
+        c.showPage()
+    c.save()
+    return path
+
+
+@pytest.fixture
+def count_parses(monkeypatch):
+    """PdfReader が作られた回数を数える"""
+    parses = []
+    real_reader = pdf_document.PdfReader
+
+    def counting_reader(*args, **kwargs):
+        parses.append(args[0])
+        return real_reader(*args, **kwargs)
+
+    monkeypatch.setattr(pdf_document, "PdfReader", counting_reader)
+    return parses
+
+
+def test_same_file_is_opened_once(tmp_path):
+    """同じファイルなら同じ文書を返す"""
+    pdf = _write_pdf(tmp_path / "a.pdf", ["one"])
+    assert PdfDocument.open(pdf) is PdfDocument.open(tmp_path / "." / "a.pdf")
+
+
+def test_changed_file_is_reopened(tmp_path):
+    """更新日時やサイズが変わったら開き直す"""
+    pdf = _write_pdf(tmp_path / "a.pdf", ["one"])
+    first = PdfDocument.open(pdf)
+    _write_pdf(pdf, ["one", "two"])
+    os.utime(pdf, ns=(1, 1))
+    second = PdfDocument.open(pdf)
+    assert second is not first
+    assert second.page_count == 2
+
+
+def test_page_texts_are_extracted_once(tmp_path, count_parses):
+    """テキストは初回だけ抽出し、以降は覚えた結果を返す"""
+    pdf = _write_pdf(tmp_path / "a.pdf", ["alpha", "beta"])
+    document = PdfDocument.open(pdf)
+    texts = document.page_texts()
+    assert [t.strip() for t in texts] == ["alpha", "beta"]
+    assert document.page_texts() is texts
+    assert len(count_parses) == 1
+
+
+def test_splitter_calls_share_one_parse(tmp_path, count_parses):
+    """ページ数・しおり・テキスト・分割を続けて呼んでもパースは1回"""
+    pdf = _write_pdf(tmp_path / "book.pdf", ["p1", "p2", "p3"])
+    splitter = PdfSplitter()
+    assert splitter.get_page_count(pdf) == 3
+    assert splitter.detect_bookmark_chapters(pdf) == []
+    splitter.detect_chapters_auto(pdf)
+    out_dir = tmp_path / "out"
+    out_dir.mkdir()
+    paths = splitter.split(pdf, [_Chapter("前半", 0, 1), _Chapter("後半", 2, 2)], out_dir)
+    assert len(paths) == 2
+    assert len(count_parses) == 1
+
+
+def test_outline_chapters_are_sorted_by_page(tmp_path):
+    """しおりのトップレベル項目をページ順に返す"""
+    pdf = _write_pdf(tmp_path / "src.pdf", ["a", "b", "c"])
+    writer = PdfWriter(clone_from=str(pdf))
+    writer.add_outline_item("後", 2)
+    writer.add_outline_item("前", 0)
+    with open(tmp_path / "marked.pdf", "wb") as f:
+        writer.write(f)
+    assert PdfDocument.open(tmp_path / "marked.pdf").outline_chapters() == [("前", 1), ("後", 3)]
+
+
+def test_page_texts_come_from_disk_cache_for_same_content(tmp_path, monkeypatch):
+    """同じ内容のPDFなら、別の場所から開いても抽出し直さない"""
+    from src.export.page_text_cache import PageTextCache
+
+    cache = PageTextCache(tmp_path / "cache")
+    first = _write_pdf(tmp_path / "a.pdf", ["alpha", "beta"])
+    texts = PdfDocument.open(first).page_texts(cache)
+
+    copy = tmp_path / "copy.pdf"
+    copy.write_bytes(first.read_bytes())
+
+    def fail_extract(self, workers=1):
+        raise AssertionError("抽出し直した")
+
+    monkeypatch.setattr(PdfDocument, "_extract_page_texts", fail_extract)
+    assert PdfDocument.open(copy).page_texts(cache) == texts
+
+
+def test_page_texts_work_without_cache_dir(tmp_path, monkeypatch):
+    """キャッシュ置き場を作れなくても、キャッシュなしで抽出する"""
+    def unwritable(*args, **kwargs):
+        raise PermissionError("read-only")
+
+    monkeypatch.setattr(pdf_document, "PageTextCache", unwritable)
+    pdf = _write_pdf(tmp_path / "a.pdf", ["alpha", "beta"])
+    texts = PdfDocument.open(pdf).page_texts()
+    assert [text.strip() for text in texts] == ["alpha", "beta"]
+
+
+def test_renderer_works_without_cache_dir(tmp_path, monkeypatch):
+    """キャッシュ置き場を作れなくても、ディスクキャッシュなしで描画を作る"""
+    from src.export import page_renderer
+    from src.utils.cache_dir import CACHE_DIR_ENV
+
+    blocker = tmp_path / "blocker"
+    blocker.write_text("")
+    monkeypatch.setenv(CACHE_DIR_ENV, str(blocker / "cache"))
+    monkeypatch.setattr(page_renderer, "QuartzRenderBackend", lambda document: object())
+    pdf = _write_pdf(tmp_path / "a.pdf", ["alpha"])
+    assert PdfDocument.open(pdf).renderer().disk_cache is None
+
+
+def test_page_texts_with_workers_use_process_extraction(tmp_path, monkeypatch):
+    """workers>=2 ならページ範囲ごとの並列抽出に任せる"""
+    pdf = _write_pdf(tmp_path / "a.pdf", ["alpha", "beta"])
+    calls = []
+
+    def fake_extract(path, page_count, workers=1):
+        calls.append((path, page_count, workers))
+        return iter(["x", "y"])
+
+    monkeypatch.setattr(pdf_document, "iter_page_texts", fake_extract)
+    assert PdfDocument.open(pdf).page_texts(workers=3) == ["x", "y"]
+    assert calls == [(pdf, 2, 3)]
+
+
+def test_page_text_reads_single_page_without_full_extraction(tmp_path, monkeypatch):
+    """1ページだけ読むときは全ページ抽出もハッシュ計算もしない"""
+    pdf = _write_pdf(tmp_path / "a.pdf", ["alpha", "beta", "gamma"])
+
+    def fail_extract(self, workers=1):
+        raise AssertionError("全ページを抽出した")
+
+    monkeypatch.setattr(PdfDocument, "_extract_page_texts", fail_extract)
+    document = PdfDocument.open(pdf)
+    assert document.page_text(1).strip() == "beta"
+    assert document._content_hash is None
+
+
+def test_iter_page_texts_remembers_only_complete_extraction(tmp_path, count_parses):
+    """途中でやめた抽出は覚えず、読み切ったら page_texts で使い回す"""
+    pdf = _write_pdf(tmp_path / "a.pdf", ["alpha", "beta", "gamma"])
+    document = PdfDocument.open(pdf)
+
+    partial = document.iter_page_texts()
+    assert next(partial).strip() == "alpha"
+    partial.close()
+    assert document._page_texts is None
+
+    texts = list(document.iter_page_texts())
+    assert [t.strip() for t in texts] == ["alpha", "beta", "gamma"]
+    assert document.page_texts() == texts
+    assert len(count_parses) == 1
@@ -98,3 +98,71 @@ def test_generate_without_ocr_matches_img2pdf_bytes(saved_image_paths):
         gen.generate(saved_image_paths, output)
         actual = output.read_bytes()
         assert actual == expected
+
+
+def test_same_generator_reuses_ocr_results(saved_image_paths):
+    """同じ生成器で結合PDFと章別PDFを作っても、各ページのOCRは1回だけ"""
+    engine = FakeOcrEngine([TextBox("テスト本文", 0.1, 0.1, 0.5, 0.1, 0.99)])
+    gen = PdfGenerator()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        gen.generate(saved_image_paths, Path(tmpdir) / "merged.pdf", ocr=True, ocr_engine=engine)
+        gen.generate(saved_image_paths[:1], Path(tmpdir) / "ch1.pdf", ocr=True, ocr_engine=engine)
+        gen.generate(saved_image_paths[1:], Path(tmpdir) / "ch2.pdf", ocr=True, ocr_engine=engine)
+        assert len(engine.calls) == len(saved_image_paths)
+        assert gen.ocr_cache.misses == len(saved_image_paths)
+        assert gen.ocr_cache.hits == len(saved_image_paths)
+
+
+class StemOcrEngine:
+    """ファイル名をそのまま本文として返す（プロセス間で pickle できる）"""
+
+    def recognize(self, image_path):
+        return [TextBox(f"本文{Path(image_path).stem}", 0.1, 0.1, 0.5, 0.1, 0.99)]
+
+
+def test_parallel_ocr_writes_text_in_page_order(saved_image_paths):
+    """ocr_workers>=2 でも各ページに自分のOCR結果が埋め込まれる"""
+    gen = PdfGenerator(ocr_workers=2)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        output = Path(tmpdir) / "parallel.pdf"
+        gen.generate(saved_image_paths, output, ocr=True, ocr_engine=StemOcrEngine())
+        reader = PdfReader(str(output))
+        texts = [page.extract_text() for page in reader.pages]
+        for path, text in zip(saved_image_paths, texts):
+            assert f"本文{path.stem}" in text
+
+
+@pytest.mark.parametrize("ocr", [False, True])
+def test_generate_reports_progress_per_page(saved_image_paths, ocr):
+    """ページごとに (済んだページ数, 全ページ数) を知らせる"""
+    engine = FakeOcrEngine([])
+    reported = []
+    with tempfile.TemporaryDirectory() as tmpdir:
+        output = Path(tmpdir) / "out.pdf"
+        PdfGenerator().generate(
+            saved_image_paths, output, ocr=ocr, ocr_engine=engine,
+            progress=lambda done, total: reported.append((done, total)),
+        )
+        assert output.exists()
+    assert reported == [(1, 3), (2, 3), (3, 3)]
+
+
+@pytest.mark.parametrize("ocr", [False, True])
+def test_cancelled_generation_leaves_no_file(saved_image_paths, ocr):
+    """中止したら GenerationCancelled を上げ、書きかけも前の出力も壊さない"""
+    from src.export.pdf_generator import GenerationCancelled
+
+    engine = FakeOcrEngine([])
+    reported = []
+    with tempfile.TemporaryDirectory() as tmpdir:
+        output = Path(tmpdir) / "out.pdf"
+        output.write_bytes(b"previous")
+        with pytest.raises(GenerationCancelled):
+            PdfGenerator().generate(
+                saved_image_paths, output, ocr=ocr, ocr_engine=engine,
+                progress=lambda done, total: reported.append(done),
+                is_cancelled=lambda: len(reported) >= 2,
+            )
+        assert sorted(p.name for p in Path(tmpdir).iterdir()) == ["out.pdf"]
+        assert output.read_bytes() == b"previous"
+    assert reported == [1, 2]
@@ -161,3 +161,29 @@ def test_editing_start_does_not_cause_overlap(qapp, pdf_path, monkeypatch):
     chapters.sort(key=lambda c: c.start)
     # 章範囲が重複しない（前章 end < 次章 start）
     assert chapters[0].end < chapters[1].start
+
+
+def test_cancelled_split_leaves_no_output_folder(qapp, pdf_path, monkeypatch):
+    """分割を中止したら、章PDFもタイムスタンプ付きフォルダも残さない"""
+    from src.ui import pdf_split_dialog
+    from src.ui.background_job import BackgroundJob
+
+    def run_cancelling_after_first_chapter(parent, title, label, work):
+        job = BackgroundJob(work)
+        job.progress.connect(lambda done, total: job.cancel())
+        job.run()
+        return job.outcome
+
+    monkeypatch.setattr(pdf_split_dialog, "run_with_progress", run_cancelling_after_first_chapter)
+    monkeypatch.setattr(pdf_split_dialog.QMessageBox, "critical", lambda *a, **k: pytest.fail("エラー表示"))
+    dialog = PdfSplitDialog(pdf_path)
+    dialog._apply_toc_ranges([ChapterRange("1章", 0, 4), ChapterRange("2章", 5, 9)])
+    out_dir = pdf_path.parent / "split_out"
+    dialog.output_edit.setText(str(out_dir))
+    accepted = []
+    monkeypatch.setattr(dialog, "accept", lambda: accepted.append(True))
+
+    dialog._do_split()
+
+    assert accepted == []
+    assert list(out_dir.iterdir()) == []
@@ -4,8 +4,6 @@ from pathlib import Path
 
 import pytest
 
-Quartz = pytest.importorskip("Quartz", reason="macOS Quartz not available")
-
 from PyQt6.QtWidgets import QApplication
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import letter
@@ -107,6 +105,106 @@ def test_split_file_names_have_chapter_number(splitter, sample_pdf):
         assert "chapter_02_" in paths[1].name
 
 
+
+def test_split_reports_progress_per_chapter(splitter, sample_pdf):
+    """章を書き終えるたびに (書いたページ数, 全ページ数) を知らせる"""
+    chapters = [_Chapter("前半", 0, 2), _Chapter("後半", 3, 4)]
+    reported = []
+    with tempfile.TemporaryDirectory() as tmpdir:
+        splitter.split(
+            sample_pdf, chapters, Path(tmpdir),
+            progress=lambda done, total: reported.append((done, total)),
+        )
+    assert reported == [(3, 5), (5, 5)]
+
+
+def test_cancelled_split_leaves_no_files(splitter, sample_pdf):
+    """中止したら SplitCancelled を上げ、書いた章も一時ファイルも残さない"""
+    from src.export.pdf_splitter import SplitCancelled
+
+    chapters = [_Chapter("前半", 0, 2), _Chapter("後半", 3, 4)]
+    reported = []
+    with tempfile.TemporaryDirectory() as tmpdir:
+        with pytest.raises(SplitCancelled):
+            splitter.split(
+                sample_pdf, chapters, Path(tmpdir),
+                progress=lambda done, total: reported.append(done),
+                is_cancelled=lambda: bool(reported),
+            )
+        assert reported == [3]
+        assert list(Path(tmpdir).iterdir()) == []
+
+
+def test_split_cancels_within_a_chapter(splitter, sample_pdf, monkeypatch):
+    """1章の途中でもページの区切りで中止し、その章を書き出さない"""
+    from src.export.pdf_splitter import SplitCancelled
+
+    added = []
+    real_add_page = PdfWriter.add_page
+    monkeypatch.setattr(
+        PdfWriter, "add_page", lambda self, page: added.append(page) or real_add_page(self, page)
+    )
+    chapters = [_Chapter("全部", 0, 4)]
+    with tempfile.TemporaryDirectory() as tmpdir:
+        with pytest.raises(SplitCancelled):
+            splitter.split(
+                sample_pdf, chapters, Path(tmpdir), is_cancelled=lambda: len(added) >= 2
+            )
+        assert len(added) == 2
+        assert list(Path(tmpdir).iterdir()) == []
+
+
+def test_failed_chapter_write_removes_earlier_chapters(splitter, sample_pdf, monkeypatch):
+    """途中の章で書き込みに失敗したら、先に書いた章も消す"""
+    writes = []
+    real_write = PdfWriter.write
+
+    def failing_write(self, stream):
+        writes.append(stream)
+        if len(writes) == 2:
+            raise OSError("disk full")
+        return real_write(self, stream)
+
+    monkeypatch.setattr(PdfWriter, "write", failing_write)
+    chapters = [_Chapter("前半", 0, 2), _Chapter("後半", 3, 4)]
+    with tempfile.TemporaryDirectory() as tmpdir:
+        with pytest.raises(OSError):
+            splitter.split(sample_pdf, chapters, Path(tmpdir))
+        assert list(Path(tmpdir).iterdir()) == []
+
+
+@pytest.mark.parametrize("fail", ["cancel", "error"])
+def test_failed_resplit_keeps_previous_output(splitter, sample_pdf, monkeypatch, fail):
+    """同じ名前で分割し直して中止・失敗しても、前回の章PDFはそのまま残る"""
+    from src.export.pdf_splitter import SplitCancelled
+
+    chapters = [_Chapter("前半", 0, 2), _Chapter("後半", 3, 4)]
+    with tempfile.TemporaryDirectory() as tmpdir:
+        previous = splitter.split(sample_pdf, chapters, Path(tmpdir))
+        before = {path: path.read_bytes() for path in previous}
+
+        reported = []
+        kwargs = {"progress": lambda done, total: reported.append(done)}
+        if fail == "cancel":
+            kwargs["is_cancelled"] = lambda: bool(reported)
+            expected = SplitCancelled
+        else:
+            real_write = PdfWriter.write
+
+            def failing_write(self, stream):
+                if reported:
+                    raise OSError("disk full")
+                return real_write(self, stream)
+
+            monkeypatch.setattr(PdfWriter, "write", failing_write)
+            expected = OSError
+        with pytest.raises(expected):
+            splitter.split(sample_pdf, chapters, Path(tmpdir), **kwargs)
+        assert reported == [3]
+        assert sorted(Path(tmpdir).iterdir()) == sorted(previous)
+        assert {path: path.read_bytes() for path in previous} == before
+
+
 def _make_pdf(path: Path, pages: int = 3):
     c = canvas.Canvas(str(path), pagesize=letter)
     for i in range(pages):
@@ -139,6 +237,7 @@ def test_enhance_for_ocr_darkens_faint_text():
 
 
 def test_render_page_image_writes_readable_png(qapp):
+    pytest.importorskip("Quartz", reason="macOS Quartz not available")
     with tempfile.TemporaryDirectory() as tmp:
         tmp = Path(tmp)
         pdf = tmp / "sample.pdf"
@@ -157,6 +256,21 @@ def test_render_page_image_writes_readable_png(qapp):
             assert img.mode == "L"
 
 
+def test_render_page_image_reuses_the_document_renderer(qapp, splitter, sample_pdf, tmp_path, monkeypatch):
+    """同じページを2回書き出しても描くのは1回（文書ごとの描画を使い回す）"""
+    from PIL import Image
+    from src.export.page_renderer import PageRenderer, PillowRenderBackend
+    from src.export.pdf_document import PdfDocument
+
+    renderer = PageRenderer(PillowRenderBackend(PdfDocument.open(sample_pdf)))
+    monkeypatch.setattr(PdfDocument, "renderer", lambda self: renderer)
+
+    for name in ("a.png", "b.png"):
+        out = splitter.render_page_image(sample_pdf, 1, tmp_path / name, max_height=1600)
+        with Image.open(out) as img:
+            assert img.height == 1600 and img.mode == "L"
+    assert (renderer.misses, renderer.hits) == (1, 1)
+
 def test_detect_chapters_auto_prefers_bookmarks_then_text(splitter, sample_pdf, monkeypatch):
     """claude を使わない検出: ブックマーク優先、無ければ本文テキスト"""
     monkeypatch.setattr(
@@ -167,16 +281,94 @@ def test_detect_chapters_auto_prefers_bookmarks_then_text(splitter, sample_pdf,
     assert result.chapters == [("第1章", 1), ("第2章", 3)]
     assert result.has_text_layer is True
 
+    def use_texts(texts):
+        # 全ページ抽出と1ページずつの取得（テキスト層の判定）の両方を差し替える
+        monkeypatch.setattr(splitter, "extract_page_texts", lambda path: texts)
+        monkeypatch.setattr(splitter, "extract_page_text", lambda path, i: texts[i])
+
     monkeypatch.setattr(splitter, "detect_bookmark_chapters", lambda path: [])
-    monkeypatch.setattr(
-        splitter, "extract_page_texts",
-        lambda path: ["表紙", "第1章 はじめに", "本文" * 50, "第2章 設計", "本文" * 50],
-    )
+    use_texts(["表紙", "第1章 はじめに", "本文" * 50, "第2章 設計", "本文" * 50])
     text_result = splitter.detect_chapters_auto(sample_pdf)
     assert text_result.source == "heading"
     assert text_result.chapters == [("第1章 はじめに", 2), ("第2章 設計", 4)]
 
-    monkeypatch.setattr(splitter, "extract_page_texts", lambda path: ["", "", "", "", ""])
+    use_texts(["", "", "", "", ""])
     scanned = splitter.detect_chapters_auto(sample_pdf)
     assert scanned.has_text_layer is False
     assert scanned.source == "none"
+
+
+def test_scanned_pdf_is_classified_from_sampled_pages(splitter, tmp_path, monkeypatch):
+    """スキャン PDF は全ページを抽出せず、等間隔に選んだページだけで判定する"""
+    from src.export.toc_detector import TEXT_PROBE_SAMPLES
+
+    pdf_path = tmp_path / "scanned.pdf"
+    writer = PdfWriter()
+    for _ in range(300):
+        writer.add_blank_page(width=100, height=100)
+    with open(pdf_path, "wb") as f:
+        writer.write(f)
+
+    touched = []
+    real_page_text = splitter.extract_page_text
+
+    def spy_page_text(path, index):
+        touched.append(index)
+        return real_page_text(path, index)
+
+    def fail_full_extract(path):
+        raise AssertionError("全ページを抽出した")
+
+    monkeypatch.setattr(splitter, "detect_bookmark_chapters", lambda path: [])
+    monkeypatch.setattr(splitter, "extract_page_text", spy_page_text)
+    monkeypatch.setattr(splitter, "extract_page_texts", fail_full_extract)
+
+    result = splitter.detect_chapters_auto(pdf_path)
+    assert result.has_text_layer is False
+    assert len(touched) == TEXT_PROBE_SAMPLES
+    assert touched[0] == 0 and touched[-1] == 299
+
+
+def test_iter_chapters_auto_streams_provisional_results(splitter, tmp_path, monkeypatch):
+    """抽出しながら暫定の章を返し、最後に確定結果を1つ返す"""
+    texts = ["表紙", "第1章 はじめに", "本文" * 50, "第2章 設計", "本文" * 50]
+    monkeypatch.setattr(splitter, "detect_bookmark_chapters", lambda path: [])
+    monkeypatch.setattr(splitter, "get_page_count", lambda path: len(texts))
+    monkeypatch.setattr(splitter, "extract_page_text", lambda path, i: texts[i])
+    monkeypatch.setattr(splitter, "iter_page_texts", lambda path: iter(texts))
+    monkeypatch.setattr(splitter, "extract_page_texts", lambda path: texts)
+
+    pages = []
+    results = list(splitter.iter_chapters_auto(
+        tmp_path / "book.pdf", on_page=lambda done, total: pages.append((done, total))
+    ))
+    assert [(r.chapters, r.provisional) for r in results] == [
+        ([("第1章 はじめに", 2)], True),
+        ([("第1章 はじめに", 2), ("第2章 設計", 4)], True),
+        ([("第1章 はじめに", 2), ("第2章 設計", 4)], False),
+    ]
+    assert results[-1] == splitter.detect_chapters_auto(tmp_path / "book.pdf")
+    assert pages[-1] == (5, 5)
+
+
+def test_split_with_workers_writes_chapters_in_processes(splitter, sample_pdf, monkeypatch):
+    """workers>=2 で十分なページ数があれば、章を並列の書き出しに任せる"""
+    from src.export import pdf_splitter
+
+    calls = []
+
+    def fake_parallel(pdf_path, jobs, workers, progress=None, is_cancelled=None, commit=True):
+        calls.append(([(start, end) for start, end, _ in jobs], workers))
+        return [out for _, _, out in jobs]
+
+    monkeypatch.setattr(pdf_splitter, "write_chapters_parallel", fake_parallel)
+    chapters = [_Chapter("前半", 0, 2), _Chapter("後半", 3, 4)]
+    with tempfile.TemporaryDirectory() as tmpdir:
+        # 小さなPDFはプロセスを起こさずに書く
+        splitter.split(sample_pdf, chapters, Path(tmpdir), workers=4)
+        assert calls == []
+
+        monkeypatch.setattr(pdf_splitter, "MIN_PARALLEL_PAGES", 5)
+        paths = splitter.split(sample_pdf, chapters, Path(tmpdir), workers=4)
+    assert calls == [([(0, 2), (3, 4)], 4)]
+    assert [p.name for p in paths] == ["chapter_01_前半.pdf", "chapter_02_後半.pdf"]
@@ -389,9 +389,8 @@ def test_text_detect_button_fills_ranges_without_claude(qapp, monkeypatch):
     d, _, _ = _dialog([], page_count=100)
     assert hasattr(d, "text_btn"), "テキスト検出ボタンが無い"
     monkeypatch.setattr(
-        d.splitter, "detect_chapters_auto",
-        lambda path: DetectionResult([("第1章", 10), ("第2章", 40)], "heading", True),
-        raising=False,
+        d, "_detect_text_with_progress",
+        lambda: DetectionResult([("第1章", 10), ("第2章", 40)], "heading", True),
     )
     d._run_text_detect()
 
@@ -410,9 +409,8 @@ def test_text_detect_printed_toc_pages_go_through_anchor(qapp, monkeypatch):
     d.anchor_printed_spin.setValue(1)
     d.anchor_pdf_spin.setValue(11)  # 印刷 p.1 = PDF 11ページ目（offset +10）
     monkeypatch.setattr(
-        d.splitter, "detect_chapters_auto",
-        lambda path: DetectionResult([("第1章", 1), ("第2章", 30)], "toc", True),
-        raising=False,
+        d, "_detect_text_with_progress",
+        lambda: DetectionResult([("第1章", 1), ("第2章", 30)], "toc", True),
     )
     d._run_text_detect()
 
@@ -607,3 +605,103 @@ def test_cover_detect_failure_shows_single_message(qapp, monkeypatch):
     d._run_cover_detect()
 
     assert [kind for kind, _ in shown] == ["critical"], shown
+
+
+def test_text_detect_fills_table_progressively(qapp):
+    """本文見出しの暫定結果は検出の途中から表に出て、確定結果で終わる
+
+    ダイアログもワーカースレッドも本物を使う（閉じるときの canceled で
+    成功が中止扱いにならないことも確かめる）。
+    """
+    import threading
+    from src.export.pdf_splitter import DetectionResult
+
+    threads = []
+
+    def fake_iter(path, on_page=None):
+        threads.append(threading.current_thread())
+        yield DetectionResult([("第1章", 10)], "heading", True, provisional=True)
+        yield DetectionResult([("第1章", 10), ("第2章", 40)], "heading", True, provisional=True)
+        yield DetectionResult([("第1章", 10), ("第2章", 40)], "heading", True)
+
+    d, _, _ = _dialog([], page_count=100)
+    d.splitter.iter_chapters_auto = fake_iter
+    rows_seen = []
+    show_partial = d._show_partial_text_result
+
+    def record_partial(result):
+        show_partial(result)
+        rows_seen.append(d.table.rowCount())
+
+    d._show_partial_text_result = record_partial
+
+    d._run_text_detect()
+    assert threads and threads[0] is not threading.main_thread()
+    assert rows_seen == [1, 2]
+    assert [(c.name, c.start, c.end) for c in d.result_ranges] == [
+        ("第1章", 9, 38),
+        ("第2章", 39, 99),
+    ]
+
+
+def test_text_detect_cancel_stops_iteration(qapp, monkeypatch):
+    """キャンセルしたら検出を打ち切り、表もメッセージも出さない"""
+    import threading
+    from PyQt6.QtWidgets import QProgressDialog, QPushButton
+    from src.export.pdf_splitter import DetectionResult
+
+    messages = []
+    closed = []
+    pressed = threading.Event()
+
+    def fake_iter(path, on_page=None):
+        try:
+            yield DetectionResult([("第1章", 10)], "heading", True, provisional=True)
+            pressed.wait(5)
+            yield DetectionResult([("第1章", 10), ("第2章", 40)], "heading", True)
+        finally:
+            closed.append(True)
+
+    d, _, _ = _dialog([], page_count=100)
+    d.splitter.iter_chapters_auto = fake_iter
+
+    def press_cancel(_result):
+        # 最初の暫定結果が届いたところで進捗ダイアログのキャンセルを押す
+        d.findChild(QProgressDialog).findChild(QPushButton).click()
+        pressed.set()
+
+    d._show_partial_text_result = press_cancel
+    monkeypatch.setattr(QMessageBox, "information", lambda *a, **kw: messages.append(a))
+    monkeypatch.setattr(QMessageBox, "critical", lambda *a, **kw: messages.append(a))
+
+    d._run_text_detect()
+    assert closed == [True]
+    assert messages == []
+    assert d.result_ranges == []
+
+
+def test_text_detect_cancel_stops_extraction_between_pages(qapp, tmp_path, monkeypatch):
+    """暫定の章が変わらない本でも、キャンセルしたらページの区切りで抽出をやめる"""
+    from reportlab.pdfgen import canvas
+    from src.export import pdf_document
+    from src.export.pdf_splitter import PdfSplitter
+    from src.ui.pdf_toc_analyze_dialog import _TextDetectCancelled
+
+    pdf = tmp_path / "no_headings.pdf"
+    c = canvas.Canvas(str(pdf))
+    for i in range(300):
+        c.drawString(72, 720, f"plain body text on page {i + 1} without any heading")
+        c.showPage()
+    c.save()
+
+    extracted = []
+    real_page_text = pdf_document.page_text
+    monkeypatch.setattr(
+        pdf_document, "page_text", lambda page: extracted.append(page) or real_page_text(page)
+    )
+    d = PdfTocAnalyzeDialog(pdf, 300, engine=_FakeEngine([]), splitter=PdfSplitter(text_workers=1))
+
+    # テキスト層の確認を含め、40ページ読んだところでキャンセルが押されている
+    with pytest.raises(_TextDetectCancelled):
+        d._detect_text(lambda done, total: None, lambda: len(extracted) >= 40, lambda r: None)
+    assert 40 <= len(extracted) < 50
@@ -0,0 +1,109 @@
+# tests/test_replay.py
+from unittest.mock import patch
+
+import pytest
+from PIL import Image, ImageDraw
+from PyQt6.QtWidgets import QApplication
+
+from src.capture.page_hash import is_same_page, page_fingerprint
+from src.capture.replay import ReplayBook, ReplayNavigator, ReplaySource, ReplayWindowManager
+
+app = QApplication.instance() or QApplication([])
+
+
+def _write_pages(directory, count):
+    """ページごとに横線の位置が違う画像を書き出す"""
+    directory.mkdir(parents=True, exist_ok=True)
+    for i in range(count):
+        img = Image.new("RGB", (60, 80), "white")
+        ImageDraw.Draw(img).rectangle((5, 5 + i * 6, 55, 8 + i * 6), fill="black")
+        img.save(directory / f"page_{i + 1:03d}.png")
+    return directory
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_from_directory_orders_pages_and_ignores_other_files(tmp_path):
+    """画像だけをファイル名順に並べる"""
+    pages = _write_pages(tmp_path / "book", 3)
+    (pages / "notes.txt").write_text("x")
+    book = ReplayBook.from_directory(pages)
+    assert [p.name for p in book.pages] == ["page_001.png", "page_002.png", "page_003.png"]
+
+
+def test_empty_book_is_rejected():
+    """ページが無ければ作れない"""
+    with pytest.raises(ValueError):
+        ReplayBook([])
+
+
+def test_turn_shows_previous_page_until_latency_elapses(tmp_path):
+    """ターン遅延の間は前のページが写り、最後のページからは進まない"""
+    clock = _Clock()
+    book = ReplayBook.from_directory(_write_pages(tmp_path / "book", 2), turn_latency=0.3, clock=clock)
+    nav = ReplayNavigator(book)
+
+    nav.next_page()
+    clock.now = 0.1
+    assert book.displayed_index == 0
+    clock.now = 0.3
+    assert book.displayed_index == 1
+
+    nav.next_page()
+    clock.now = 1.0
+    assert book.displayed_index == 1
+    assert book.turns == 2
+
+
+def test_source_crops_the_displayed_page(tmp_path):
+    """撮影は表示中ページの指定領域を切り出す"""
+    book = ReplayBook.from_directory(_write_pages(tmp_path / "book", 2))
+    source = ReplaySource(book)
+    first = source.capture_region(0, 0, 60, 80)
+    assert first.size == (60, 80)
+    assert source.capture_region(10, 20, 30, 40).size == (30, 40)
+
+    book.turn()
+    second = source.capture_region(0, 0, 60, 80)
+    assert not is_same_page(page_fingerprint(first), page_fingerprint(second))
+
+
+def test_window_manager_content_bounds_cover_the_page(tmp_path):
+    """ウィンドウのコンテンツ領域がページ画像とぴったり重なる"""
+    book = ReplayBook.from_directory(_write_pages(tmp_path / "book", 1))
+    wm = ReplayWindowManager(book)
+    (window,) = wm.get_window_list()
+    assert wm.get_content_bounds(window["bounds"]) == {"x": 0, "y": 0, "width": 60, "height": 80}
+    assert wm.bring_to_front(window["pid"]) is True
+
+
+@patch("src.utils.notification.send_notification")
+def test_main_window_captures_whole_book_from_replay(_notify, tmp_path):
+    """再生用の実装でキャプチャの状態遷移を最後まで動かせる"""
+    from src.ui.main_window import MainWindow
+
+    book = ReplayBook.from_directory(_write_pages(tmp_path / "book", 4))
+    window = MainWindow(
+        window_manager=ReplayWindowManager(book),
+        screenshot=ReplaySource(book),
+        page_navigator=ReplayNavigator(book),
+    )
+    window.path_edit.setText(str(tmp_path / "out"))
+    window.page_spin.setValue(100)
+    shown = []
+    window._show_chapter_dialog = lambda: shown.append(list(window.captured_images))
+
+    with patch("src.ui.main_window.QTimer.singleShot", lambda ms, fn: fn()):
+        window._start_capture()
+
+    assert window.capture_stats.stopped_at_end is True
+    assert [p.name for p in shown[0]] == ["page_001.png", "page_002.png", "page_003.png", "page_004.png"]
+    assert window.capture_stats.stage_average("grab") is not None
+    assert len(window.capture_stats.stage_times["save"]) == 4 + window.capture_stats.dropped_duplicates
+    window.close()
@@ -4,8 +4,12 @@ import tempfile
 import os
 from pathlib import Path
 from PIL import Image
+from src.capture import screenshot
 from src.capture.screenshot import Screenshot
 
+if screenshot.pyautogui is None:
+    pytest.skip("pyautogui needs a display", allow_module_level=True)
+
 
 def test_capture_region_returns_image():
     """指定領域のスクリーンショットがPIL Imageで返される"""
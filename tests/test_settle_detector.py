@@ -0,0 +1,29 @@
+# tests/test_settle_detector.py
+from src.capture.settle_detector import SettleDetector
+
+OLD = bytes([200] * 16)
+TRANSITION = bytes([120] * 16)
+NEW = bytes([40] * 16)
+
+
+def test_settles_after_two_matching_probes_of_new_page():
+    """前ページと異なるフレームが2回続いたら落ち着いたと判定する"""
+    detector = SettleDetector(previous_page=OLD)
+    assert detector.feed(OLD) is False
+    assert detector.feed(TRANSITION) is False
+    assert detector.feed(NEW) is False
+    assert detector.feed(NEW) is True
+
+
+def test_does_not_settle_on_unchanged_page():
+    """ページが変わらないまま止まっていても撮影しない（上限待ちに任せる）"""
+    detector = SettleDetector(previous_page=OLD)
+    for _ in range(5):
+        assert detector.feed(OLD) is False
+
+
+def test_without_previous_page_two_matching_probes_are_enough():
+    """比較対象が無ければ連続一致だけで判定する"""
+    detector = SettleDetector(previous_page=None)
+    assert detector.feed(NEW) is False
+    assert detector.feed(NEW) is True
@@ -0,0 +1,64 @@
+# tests/test_streaming_pdf.py
+from pathlib import Path
+
+from PIL import Image
+from pypdf import PdfReader
+
+from src.export.ocr_engine import TextBox
+from src.export.streaming_pdf import StreamingPdfWriter
+
+
+class StemOcrEngine:
+    """ファイル名をそのまま本文として返す"""
+
+    def __init__(self, fail_on=()):
+        self.calls = []
+        self.fail_on = set(fail_on)
+
+    def recognize(self, image_path):
+        self.calls.append(Path(image_path).name)
+        if Path(image_path).name in self.fail_on:
+            self.fail_on.discard(Path(image_path).name)
+            raise RuntimeError("ocr failed")
+        return [TextBox(Path(image_path).stem, 0.1, 0.1, 0.5, 0.1, 0.99)]
+
+
+def _images(tmp_path, count):
+    paths = []
+    for i in range(1, count + 1):
+        path = tmp_path / "images" / f"page_{i:03d}.png"
+        path.parent.mkdir(exist_ok=True)
+        Image.new("RGB", (80, 100), color=(i * 40, i * 40, i * 40)).save(path)
+        paths.append(path)
+    return paths
+
+
+def test_pages_are_written_as_they_arrive_and_joined_in_order(tmp_path):
+    """届いたページを1ページPDFにしておき、最後にページ順でつなげる"""
+    paths = _images(tmp_path, 3)
+    writer = StreamingPdfWriter(tmp_path / "images" / "pdf_pages", ocr_engine=StemOcrEngine())
+    for path in paths:
+        writer.add_page(path)
+    writer.close()
+    assert sorted(p.name for p in (tmp_path / "images" / "pdf_pages").iterdir()) == [
+        "page_001.pdf", "page_002.pdf", "page_003.pdf",
+    ]
+
+    output = writer.finish(paths, tmp_path / "stream.pdf")
+    texts = [page.extract_text() for page in PdfReader(str(output)).pages]
+    assert texts == ["page_001", "page_002", "page_003"]
+
+
+def test_finish_uses_only_listed_pages_and_fills_gaps(tmp_path):
+    """捨てたページは含めず、描けなかったページは finish で描き直す"""
+    paths = _images(tmp_path, 4)
+    engine = StemOcrEngine(fail_on={"page_002.png"})
+    writer = StreamingPdfWriter(tmp_path / "images" / "pdf_pages", ocr_engine=engine)
+    for path in paths:
+        writer.add_page(path)
+
+    output = writer.finish(paths[:3], tmp_path / "stream.pdf")
+    texts = [page.extract_text() for page in PdfReader(str(output)).pages]
+    assert texts == ["page_001", "page_002", "page_003"]
+    assert engine.calls.count("page_002.png") == 2
+    assert not (tmp_path / "stream.pdf.tmp").exists()
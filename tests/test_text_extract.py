@@ -0,0 +1,45 @@
+# tests/test_text_extract.py
+from reportlab.pdfgen import canvas
+
+from src.export.text_extract import extract_page_texts, iter_page_texts, page_text
+
+
+def _write_pdf(path, count):
+    c = canvas.Canvas(str(path))
+    for i in range(count):
+        c.drawString(72, 720, f"page {i + 1}")
+        c.showPage()
+    c.save()
+    return path
+
+
+def test_parallel_extraction_matches_sequential_order(tmp_path):
+    """ワーカーに分けても、結果はページ順に並ぶ"""
+    pdf = _write_pdf(tmp_path / "book.pdf", 7)
+    sequential = extract_page_texts(pdf, 7, workers=1)
+    parallel = extract_page_texts(pdf, 7, workers=2, chunk_size=2)
+    assert parallel == sequential
+    assert [t.strip() for t in parallel] == [f"page {i}" for i in range(1, 8)]
+
+
+def test_page_text_is_empty_on_failure():
+    """抽出に失敗したページ・テキストの無いページは空文字"""
+
+    class BrokenPage:
+        def extract_text(self):
+            raise ValueError("broken")
+
+    class EmptyPage:
+        def extract_text(self):
+            return None
+
+    assert page_text(BrokenPage()) == ""
+    assert page_text(EmptyPage()) == ""
+
+
+def test_iter_page_texts_yields_in_page_order_and_can_stop_early(tmp_path):
+    """チャンクが終わったところからページ順に返し、途中でやめられる"""
+    pdf = _write_pdf(tmp_path / "book.pdf", 7)
+    texts = iter_page_texts(pdf, 7, workers=2, chunk_size=2)
+    assert [next(texts).strip() for _ in range(3)] == ["page 1", "page 2", "page 3"]
+    texts.close()
@@ -0,0 +1,129 @@
+# tests/test_thumbnail_cache.py
+import os
+
+from PIL import Image
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QColor, QImage
+
+from src.export.thumbnail_cache import ThumbnailCache
+
+
+def _image(path, size=(600, 800), color="red"):
+    Image.new("RGB", size, color).save(path)
+    return path
+
+
+def _qimage(width, height):
+    image = QImage(width, height, QImage.Format.Format_RGB32)
+    image.fill(QColor("blue"))
+    return image
+
+
+def test_round_trip_by_hash_page_and_size(tmp_path):
+    """内容ハッシュ・ページ・大きさごとに読み戻せる"""
+    cache = ThumbnailCache(tmp_path)
+    cache.put("abc", 3, 100, 140, _qimage(100, 75))
+    image = cache.get("abc", 3, 100, 140)
+    assert (image.width(), image.height()) == (100, 75)
+    assert cache.get("abc", 4, 100, 140) is None
+    assert cache.get("abc", 3, 200, 280) is None
+
+
+def test_image_thumbnail_scales_once_and_reuses_for_same_content(tmp_path, monkeypatch):
+    """同じ内容の画像なら、別の場所にあっても縮小し直さない"""
+    cache = ThumbnailCache(tmp_path / "cache")
+    first = _image(tmp_path / "a.png")
+    thumb = cache.image_thumbnail(first, 100, 140)
+    assert (thumb.width(), thumb.height()) == (100, 133)
+
+    copy = tmp_path / "copy.png"
+    copy.write_bytes(first.read_bytes())
+
+    def fail_scale(*args, **kwargs):
+        raise AssertionError("縮小し直した")
+
+    monkeypatch.setattr(QImage, "scaled", fail_scale)
+    again = cache.image_thumbnail(copy, 100, 140)
+    assert (again.width(), again.height()) == (100, 133)
+
+
+def test_corrupt_entry_reads_as_none(tmp_path):
+    """壊れたファイルは無いものとして扱う"""
+    cache = ThumbnailCache(tmp_path)
+    (tmp_path / "abc-0-100x140.png").write_bytes(b"not a png")
+    assert cache.get("abc", 0, 100, 140) is None
+
+
+def test_least_recently_used_thumbnails_are_evicted(tmp_path):
+    """上限を超えたら長く使っていないサムネイルから消す"""
+    cache = ThumbnailCache(tmp_path)
+    cache.put("old", 0, 100, 140, _qimage(100, 140))
+    one_file = (tmp_path / "old-0-100x140.png").stat().st_size
+    os.utime(tmp_path / "old-0-100x140.png", (1, 1))
+    cache.max_bytes = one_file * 1.5
+    cache.put("new", 0, 100, 140, _qimage(100, 140))
+    assert cache.get("old", 0, 100, 140) is None
+    assert cache.get("new", 0, 100, 140) is not None
+
+
+def test_image_thumbnail_is_decoded_at_thumbnail_size(tmp_path, monkeypatch):
+    """全画素を展開してから縮めず、読み込み時に縮小する"""
+    from src.export import thumbnail_cache
+
+    cache = ThumbnailCache(tmp_path / "cache")
+    jpeg = tmp_path / "page.jpg"
+    Image.new("RGB", (3000, 4000), "white").save(jpeg, "JPEG")
+
+    def fail_full_decode(*args, **kwargs):
+        raise AssertionError("元の大きさで展開した")
+
+    monkeypatch.setattr(QImage, "scaled", fail_full_decode)
+    read_sizes = []
+    real_read_scaled = thumbnail_cache.read_scaled
+
+    def recording_read_scaled(path, width, height):
+        image = real_read_scaled(path, width, height)
+        read_sizes.append((image.width(), image.height()))
+        return image
+
+    monkeypatch.setattr(thumbnail_cache, "read_scaled", recording_read_scaled)
+    thumb = cache.image_thumbnail(jpeg, 100, 140)
+    assert (thumb.width(), thumb.height()) == (100, 133)
+    assert read_sizes == [(100, 133)]
+
+
+def test_put_image_thumbnail_is_found_by_image_thumbnail(tmp_path, monkeypatch):
+    """展開済みの画像から作ったサムネイルを、元ファイルを読まずに返す"""
+    from src.export import thumbnail_cache
+    from src.utils.file_hash import file_sha256
+
+    cache = ThumbnailCache(tmp_path / "cache")
+    image = Image.new("RGB", (601, 997), "green")
+    path = tmp_path / "page.png"
+    image.save(path)
+    cache.put_image_thumbnail(file_sha256(path), image, 100, 140)
+
+    def fail_read(*args, **kwargs):
+        raise AssertionError("元の画像を読んだ")
+
+    monkeypatch.setattr(thumbnail_cache, "read_scaled", fail_read)
+    thumb = cache.image_thumbnail(path, 100, 140)
+    # Qt で縮小したときと同じ大きさになる
+    expected = QImage(str(path)).size().scaled(100, 140, Qt.AspectRatioMode.KeepAspectRatio)
+    assert (thumb.width(), thumb.height()) == (expected.width(), expected.height())
+
+
+def test_put_does_not_rescan_cache_directory(tmp_path, monkeypatch):
+    """保存のたびにキャッシュ全体を走査しない（上限を超えたときだけ消す）"""
+    from src.utils import cache_dir
+
+    cache = ThumbnailCache(tmp_path)
+    cache.put("first", 0, 100, 140, _qimage(100, 140))
+    scans = []
+    real_evict = cache_dir._evict
+    monkeypatch.setattr(
+        cache_dir, "_evict", lambda *args: scans.append(args) or real_evict(*args)
+    )
+    for i in range(20):
+        cache.put(f"page{i}", 0, 100, 140, _qimage(100, 140))
+    assert scans == []
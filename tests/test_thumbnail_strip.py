@@ -0,0 +1,164 @@
+# tests/test_thumbnail_strip.py
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+from PyQt6.QtCore import Qt, QThreadPool
+from PyQt6.QtGui import QImage
+from PyQt6.QtWidgets import QApplication
+
+from src.ui.thumbnail_strip import (
+    KEEP_MARGIN_ROWS, ChapterStartRole, PageThumbnailModel, ThumbnailStrip,
+)
+
+
+@pytest.fixture(scope="module")
+def qapp():
+    app = QApplication.instance() or QApplication(sys.argv)
+    yield app
+
+
+def _model(count, loaded, thread_pool=None, gate=None):
+    def load(path):
+        if gate is not None:
+            gate.wait(5)
+        loaded.append(path)
+        image = QImage(50, 70, QImage.Format.Format_RGB32)
+        image.fill(Qt.GlobalColor.white)
+        return image
+
+    paths = [Path(f"/book/page_{i:04d}.png") for i in range(count)]
+    return PageThumbnailModel(paths, load, thread_pool=thread_pool)
+
+
+def test_thumbnails_load_on_first_request_only(qapp):
+    """サムネイルは要求されたページだけ、1回だけ読み込む"""
+    loaded = []
+    model = _model(800, loaded)
+    assert model.rowCount() == 800
+    assert loaded == []
+    model.data(model.index(5), Qt.ItemDataRole.DecorationRole)
+    model.data(model.index(5), Qt.ItemDataRole.DecorationRole)
+    model.wait_for_pending()
+    model.data(model.index(5), Qt.ItemDataRole.DecorationRole)
+    assert loaded == [Path("/book/page_0005.png")]
+    assert model.data(model.index(5)) == "p.6"
+
+
+def test_thumbnail_is_loaded_in_background_with_placeholder(qapp):
+    """読み込み中は None（プレースホルダー）を返し、終わったら dataChanged で知らせる"""
+    gate = threading.Event()
+    model = _model(10, [], gate=gate)
+    changed = []
+    model.dataChanged.connect(lambda top, bottom, roles: changed.append(top.row()))
+
+    assert model.thumbnail(3) is None
+    assert not model.is_loaded(3)
+    gate.set()
+    model.wait_for_pending()
+    assert changed == [3]
+    pixmap = model.thumbnail(3)
+    assert (pixmap.width(), pixmap.height()) == (50, 70)
+
+
+def test_latest_requests_are_loaded_first(qapp):
+    """後から要求されたページ（いま見えているページ）から読み込む"""
+    pool = QThreadPool()
+    pool.setMaxThreadCount(1)
+    gate = threading.Event()
+    loaded = []
+    model = _model(10, loaded, thread_pool=pool, gate=gate)
+    for row in range(6):
+        model.request(row)
+    gate.set()
+    model.wait_for_pending()
+    # 0 は依頼した時点で読み込みが始まっている
+    assert [p.name for p in loaded] == [
+        "page_0000.png", "page_0005.png", "page_0004.png",
+        "page_0003.png", "page_0002.png", "page_0001.png",
+    ]
+
+
+def test_cancel_pending_drops_queued_loads(qapp):
+    """取りやめると、まだ始まっていない読み込みは行わない"""
+    pool = QThreadPool()
+    pool.setMaxThreadCount(1)
+    gate = threading.Event()
+    loaded = []
+    model = _model(10, loaded, thread_pool=pool, gate=gate)
+    for row in range(5):
+        model.request(row)
+    model.cancel_pending()
+    gate.set()
+    model.wait_for_pending()
+    assert len(loaded) == 1
+
+
+def test_loads_for_rows_scrolled_away_are_dropped(qapp):
+    """順番が来たときに見えなくなっている行は読まず、また見えたら頼み直せる"""
+    pool = QThreadPool()
+    pool.setMaxThreadCount(1)
+    gate = threading.Event()
+    loaded = []
+    model = _model(100, loaded, thread_pool=pool, gate=gate)
+    for row in range(30):
+        model.request(row)
+    # 0〜29 を頼んだあと、80 付近までスクロールした
+    model.set_visible_rows(80, 85)
+    gate.set()
+    model.wait_for_pending()
+    # 読んだとしても、頼んだ時点で始まっていた 0 だけ
+    assert {p.name for p in loaded} <= {"page_0000.png"}
+    assert not any(model.is_loaded(row) for row in range(1, 30))
+
+    model.set_visible_rows(25, 30)
+    assert model.thumbnail(29) is None
+    model.wait_for_pending()
+    assert model.is_loaded(29)
+
+
+def test_rows_near_visible_range_are_kept(qapp):
+    """見えている範囲の前後 KEEP_MARGIN_ROWS 行までは読み込む"""
+    model = _model(100, [])
+    model.set_visible_rows(40, 45)
+    assert model.is_wanted(40 - KEEP_MARGIN_ROWS)
+    assert model.is_wanted(45 + KEEP_MARGIN_ROWS)
+    assert not model.is_wanted(45 + KEEP_MARGIN_ROWS + 1)
+
+
+def test_chapter_start_change_signals_only_changed_rows(qapp):
+    """章開始の差し替えでは、印が変わった行だけ dataChanged を出す"""
+    model = _model(100, [])
+    model.set_chapter_starts({0, 40})
+    changed = []
+    model.dataChanged.connect(lambda top, bottom, roles: changed.append((top.row(), bottom.row())))
+    model.set_chapter_starts({0, 40, 70})
+    assert changed == [(70, 70)]
+    assert model.data(model.index(70), ChapterStartRole) is True
+    assert model.data(model.index(69), ChapterStartRole) is False
+
+
+def test_strip_paints_only_visible_thumbnails(qapp):
+    """ビューは画面に見えているページのサムネイルだけを読み込む"""
+    loaded = []
+    model = _model(800, loaded)
+    strip = ThumbnailStrip()
+    strip.setModel(model)
+    strip.resize(600, 220)
+    strip.show()
+    QApplication.processEvents()
+    strip.grab()
+    model.wait_for_pending()
+    assert 0 < len(loaded) < 20
+
+    strip.scroll_to_page(700)
+    QApplication.processEvents()
+    first, last = strip.visible_rows()
+    assert first <= 700 <= last and last - first < 20
+    assert not model.is_wanted(0)
+    strip.grab()
+    model.wait_for_pending()
+    assert Path("/book/page_0700.png") in loaded
+    assert len(loaded) < 40
+    strip.close()
@@ -1,7 +1,13 @@
 # tests/test_toc_detector.py
 """目次ページ・本文見出しからの章検出（純ロジック）のテスト"""
 
-from src.export.toc_detector import detect_chapters_from_text, has_text_layer
+import random
+
+from src.export import toc_detector
+from src.export.toc_detector import (
+    StreamingChapterDetector, detect_chapters_from_text, has_text_layer,
+    _enforce_invariants, iter_chapters_from_text, probe_text_layer, sample_page_indices,
+)
 
 
 def test_detects_chapter_headings_in_body():
@@ -269,3 +275,176 @@ def test_toc_search_is_limited_to_front_matter():
     page_texts.append("Contents Analysis\n第2章 B")
     result = detect_chapters_from_text(page_texts)
     assert result.chapters == [("第1章 A", 1), ("第2章 B", len(page_texts))]
+
+
+def test_sample_page_indices_spread_over_whole_document():
+    """先頭と末尾を含めて等間隔に選び、ページ数が少なければ全ページ"""
+    assert sample_page_indices(5, samples=8) == [0, 1, 2, 3, 4]
+    indices = sample_page_indices(900, samples=10)
+    assert indices[0] == 0 and indices[-1] == 899
+    assert len(indices) == 10
+    assert indices == sorted(set(indices))
+
+
+def test_probe_text_layer_stops_once_threshold_is_met():
+    """文字数が閾値に届いたらそれ以上ページを読まない"""
+    read = []
+
+    def page_text(i):
+        read.append(i)
+        return "本文" * 60
+
+    assert probe_text_layer(900, page_text) is True
+    assert read == [0]
+
+    read.clear()
+    assert probe_text_layer(900, lambda i: read.append(i) or "", samples=12) is False
+    assert len(read) == 12
+
+
+def test_lines_on_most_pages_are_not_headings():
+    """全ページに出てくるつめ見出し（章の一覧）は見出しにせず、本文の章扉を採る"""
+    tabs = "第1章\n第2章\n第3章"
+    page_texts = [f"本文\n{tabs}" for _ in range(60)]
+    for page, title in ((5, "第1章 基礎"), (25, "第2章 応用"), (45, "第3章 発展")):
+        page_texts[page - 1] = f"{title}\n本文\n{tabs}"
+    expected = [("第1章 基礎", 5), ("第2章 応用", 25), ("第3章 発展", 45)]
+
+    assert detect_chapters_from_text(page_texts).chapters == expected
+    results = list(iter_chapters_from_text(page_texts, page_count=len(page_texts)))
+    assert results[-1].chapters == expected
+
+
+def test_long_chapter_running_header_is_kept():
+    """章ごとの柱は、その章が本の半分を占めても見出しとして残す"""
+    page_texts = ["表紙"]
+    page_texts += ["第1章 基礎\n本文"] * 55
+    page_texts += ["第2章 応用\n本文"] * 44
+    assert detect_chapters_from_text(page_texts).chapters == [
+        ("第1章 基礎", 2), ("第2章 応用", 57),
+    ]
+
+
+def test_dominant_long_chapter_running_header_is_kept():
+    """柱が本の7割を占める章でも、次の章と一緒に両方の章を返す"""
+    page_texts = ["第1章 序論\n本文"] * 70 + ["第2章 本論\n本文"] * 30
+    expected = [("第1章 序論", 1), ("第2章 本論", 71)]
+
+    assert detect_chapters_from_text(page_texts).chapters == expected
+    results = list(iter_chapters_from_text(page_texts, page_count=len(page_texts)))
+    assert results[-1].chapters == expected
+
+
+def test_chapter_running_headers_are_kept_alongside_tabs():
+    """全ページのつめ見出しだけを除き、章ごとの長い柱は見出しとして残す"""
+    tabs = "第1章\n第2章\n第3章"
+    page_texts = [f"第1章 基礎\n本文\n{tabs}"] * 50
+    page_texts += [f"第2章 応用\n本文\n{tabs}"] * 30
+    page_texts += [f"第3章 発展\n本文\n{tabs}"] * 20
+    assert detect_chapters_from_text(page_texts).chapters == [
+        ("第1章 基礎", 1), ("第2章 応用", 51), ("第3章 発展", 81),
+    ]
+
+
+def test_streaming_detection_reports_chapters_as_pages_arrive():
+    """ページを渡すたびに暫定の章が増え、最後は一括検出と同じになる"""
+    page_texts = [
+        "目次\n第1章 はじめに ..... 1\n第2章 設計 ..... 3",
+        "第1章 はじめに\n本文",
+        "本文",
+        "第2章 設計\n本文",
+        "本文",
+    ]
+    results = list(iter_chapters_from_text(page_texts, page_count=len(page_texts)))
+    # 目次だけ読んだ時点では印字ページ、本文見出しが出たらそちらに切り替わる
+    assert [(r.source, r.chapters) for r in results] == [
+        ("toc", [("第1章 はじめに", 1), ("第2章 設計", 3)]),
+        ("heading", [("第1章 はじめに", 2)]),
+        ("heading", [("第1章 はじめに", 2), ("第2章 設計", 4)]),
+    ]
+    assert results[-1] == detect_chapters_from_text(page_texts)
+
+
+def test_streaming_detector_drops_outlier_once_later_chapters_arrive():
+    """前方の外れ値は、後続の章が揃った時点で最長列から外れる"""
+    detector = StreamingChapterDetector()
+    detector.feed("第10章 付録")
+    assert detector.result().chapters == [("第10章 付録", 1)]
+    for text in ["第1章 序論", "第2章 本論", "第3章 結論"]:
+        detector.feed(text)
+    assert [page for _, page in detector.result().chapters] == [2, 3, 4]
+
+
+def _quadratic_enforce_invariants(candidates):
+    """以前の二重ループ版（同値性の確認用）"""
+    best_length = [1] * len(candidates)
+    previous = [-1] * len(candidates)
+    for i, (page_i, number_i, _) in enumerate(candidates):
+        for j in range(i):
+            page_j, number_j, _ = candidates[j]
+            if number_j < number_i and page_j < page_i and best_length[j] + 1 > best_length[i]:
+                best_length[i] = best_length[j] + 1
+                previous[i] = j
+    if not candidates:
+        return []
+    end = max(range(len(candidates)), key=lambda i: (best_length[i], -i))
+    indices = []
+    while end != -1:
+        indices.append(end)
+        end = previous[end]
+    indices.reverse()
+    return [(candidates[i][2], candidates[i][0]) for i in indices]
+
+
+def test_enforce_invariants_matches_quadratic_version_on_random_input():
+    """同じページ・同じ章番号が重なる入力でも、最長列と同長時の選び方が以前と同じ"""
+    rng = random.Random(20240601)
+    for _ in range(2000):
+        count = rng.randint(0, 40)
+        max_page = rng.choice([3, 10, 60])
+        max_number = rng.choice([2, 8, 30, 5000])
+        candidates = sorted(
+            (rng.randint(1, max_page), rng.randint(0, max_number), f"t{i}")
+            for i in range(count)
+        )
+        assert _enforce_invariants(candidates) == _quadratic_enforce_invariants(candidates)
+
+
+def test_enforce_invariants_handles_many_candidates():
+    """柱の誤検出で候補が数千件あっても、最長の増加列を返す"""
+    import bisect
+
+    rng = random.Random(7)
+    numbers = rng.sample(range(20000), 5000)
+    candidates = [(page, number, f"第{number}章") for page, number in enumerate(numbers, start=1)]
+    chapters = _enforce_invariants(candidates)
+
+    tails: list[int] = []
+    for number in numbers:
+        position = bisect.bisect_left(tails, number)
+        tails[position:position + 1] = [number]
+    assert len(chapters) == len(tails)
+    pages = [page for _, page in chapters]
+    assert pages == sorted(set(pages))
+    chosen = [numbers[page - 1] for page in pages]
+    assert chosen == sorted(set(chosen))
+
+
+def test_running_header_lines_are_matched_only_once(monkeypatch):
+    """柱のように繰り返す行は初出のページだけ照合し、結果は変わらない"""
+    page_texts = ["表紙"]
+    for chapter in (1, 2):
+        page_texts.append(f"第{chapter}章 見出し\n本文")
+        page_texts += [f"第{chapter}章 見出し\n本文\n{page}" for page in range(200)]
+    expected = detect_chapters_from_text(page_texts)
+
+    matched = []
+    real_chapter_number = toc_detector._chapter_number
+    monkeypatch.setattr(
+        toc_detector, "_chapter_number",
+        lambda line: matched.append(line) or real_chapter_number(line),
+    )
+    assert detect_chapters_from_text(page_texts) == expected
+    assert expected.chapters == [("第1章 見出し", 2), ("第2章 見出し", 203)]
+    assert matched.count("第1章 見出し") == 1
+    assert matched.count("本文") == 1
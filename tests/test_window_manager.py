@@ -2,6 +2,8 @@
 import pytest
 from src.capture.window_manager import WindowManager
 
+pytest.importorskip("Quartz", reason="macOS Quartz not available")
+
 
 def test_get_window_list_returns_list():
     """ウィンドウ一覧がリストで返される"""
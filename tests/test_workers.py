@@ -0,0 +1,13 @@
+# tests/test_workers.py
+from src.utils import workers
+from src.utils.workers import default_workers
+
+
+def test_default_workers_leaves_one_core(monkeypatch):
+    """1コアは UI のために残し、1コアしか無くても1は使う"""
+    monkeypatch.setattr(workers.os, "cpu_count", lambda: 8)
+    assert default_workers() == 7
+    monkeypatch.setattr(workers.os, "cpu_count", lambda: 1)
+    assert default_workers() == 1
+    monkeypatch.setattr(workers.os, "cpu_count", lambda: None)
+    assert default_workers() == 1